@@ -1,92 +1,81 @@
 from os import listdir, path, mkdir
 from PyPDF2 import PdfReader, PdfWriter
 from tqdm import tqdm
+import csv
+import sys
 
-# Cria a pasta de destino dos documentos
-if not path.exists('Documentos'):
-    mkdir('Documentos')
+# As regras de cada tipo de documento são as mesmas da opção 1 do Manipulador de PDF, ao lado desta pasta, assim
+# como a extração de texto, que lê do cache de textos as páginas já extraídas (ver extract_functions).
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), '..', '_Manipulador de PDF'))
+from configs.utils.extract_functions import paginas, prepara
+from configs.utils.quarentena_functions import ERROS, descreve
+from configs.utils.regra_functions import ADMISSAO, TabelaTitulos
 
-for arq in [file for file in listdir() if '.pdf' in file]:
-    if not path.exists(f'Documentos\\{arq[:-4]}'):
-        mkdir(f'Documentos\\{arq[:-4]}')
-    with open(arq, 'rb') as file:
-        # Cria um objeto PdfFileReader para ler o conteúdo do arquivo PDF.
-        pdf_reader = PdfReader(file)
-        # Para cada página, identifica o tipo de documento e o nome do funcionário.
-        for pag in tqdm(pdf_reader.pages):
-            rows = pag.extract_text().split('\n')
-            # Encontra o título do documento.
-            idx = 0
-            while not rows[idx].strip():
-                idx += 1
-            titulo = rows[idx].strip()
-            # Remove espaços do títulos
-            titulo = ' '.join(titulo.split())
-            # Acessa o nome com base no tipo de documento.
-            if titulo == 'DECLARAÇÃO DE DEPENDENTES PARA FINS DE IMPOSTO DE RENDA':
-                nome = rows[2]
-            elif titulo == 'TERMO LDPD':
-                row = rows[3]
-                nome = row[35:row.find(',', 35)].replace('_', '')
-            elif titulo == 'R E C I B O D E E N T R E G A D A C A R T E I R A D E T R A B A L H O':
-                for row in rows:
-                    if '(Carimbo e visto da empresa)' in row:
-                        nome = row[28:-12]
-                        break
-            elif titulo == 'CTPS DIGITAL':
-                row = rows[3]
-                nome = row[row.find(' '):row.find(',', 4)]
-                # Remove espaços entre os nomes.
-                nome = ' '.join(nome.split())
-            elif titulo == 'TERMO DE COMPROMISSO DE VALE-TRANSPORTE':
-                for i, row in enumerate(rows):
-                    if 'SSPNome' in row:
-                        nome = rows[i+1]
-                        break
-            elif titulo == 'TERMO COLETIVO DE CESSÃO GRATUITA DE USO DE IMAGEM PARA DIVULGAÇÃO':
-                for row in rows:
-                    if 'Empregado: ' in row:
-                        nome = row[11:]
-                        break
-            elif titulo == 'REGISTRO DE EMPREGADONúmero:':
-                nome = rows[19][:-14]
-            elif titulo == 'Termo de Responsabilidade':
-                nome = rows[6][:-10]
-            elif titulo == 'Contrato de Experiência de Trabalho':
-                row = rows[2]
-                nome = row[row.rfind(',')+1:row.find(' p', row.rfind(','))].strip()
-                # Remove espaços entre os nomes
-                nome = ' '.join(nome.split())
-            elif titulo[:20] == 'A Controladora fica ':
-                nome = rows[30]
-            elif titulo == 'AUTODECLARAÇÃO ÉTNICO-RACIAL':
-                nome = rows[13]
-            # No Termo LGPD não tem o nome, fica na página seguinte, que começa com '" CLÁUSULA QUARTA:'
-            # Então a página atual precisa ser guardada.
-            elif titulo == 'TERMO LGPD':
-                row = rows[3]
-                nome = row[row.find(', eu')+4:row.find(',', row.find(', eu')+1)].strip()
-            elif titulo == '" CLÁUSULA TERCEIRA: COMPARTILHAMENTO DE DADOS.':
-                nome = rows[31]
-            elif titulo == '" CLÁUSULA QUARTA: RESPONSABILIDADE PELA SEGURANÇA DOS DADOS.':
-                nome = rows[29]
-            elif titulo == '" CLÁUSULA QUINTA: TÉRMINO DO TRATAMENTO DOS DADOS.':
-                nome = rows[23]
-            else:
-                print(f'Documento {[titulo]} não reconhecido!')
-                input()
-                continue
 
-            file_name = f'Documentos\\{arq[:-4]}\\{nome}.pdf'
-            pdf_writer = PdfWriter()
-            # Verifica se já existe um arquivo para este funcionário
-            if path.exists(file_name):
-                pdf_reader_temp = PdfReader(file_name)
-                # Copia todas as páginas do documento do funcionário para o writer
-                for page_num in range(len(pdf_reader_temp.pages)):
-                    pdf_writer.add_page(pdf_reader_temp.pages[page_num])
-            # Adiciona a página atual
-            pdf_writer.add_page(pag)
-            # Salva o arquivo
-            with open(file_name, "wb") as output_pdf:
-                pdf_writer.write(output_pdf)
+def main():
+    # Compara o título de cada página com todas as regras de uma vez.
+    tabela = TabelaTitulos(ADMISSAO)
+    # Páginas separadas em _Nao_Identificados: arquivo, página (1, 2, ...) e motivo, gravados em motivos.csv.
+    registros = []
+
+    # Cria a pasta de destino dos documentos
+    if not path.exists('Documentos'):
+        mkdir('Documentos')
+
+    files = [file for file in listdir() if '.pdf' in file]
+    # Inicia a extração de texto de todos os arquivos.
+    prepara(files)
+    for arq in files:
+        if not path.exists(f'Documentos\\{arq[:-4]}'):
+            mkdir(f'Documentos\\{arq[:-4]}')
+        with open(arq, 'rb') as file:
+            # Cria um objeto PdfFileReader para ler o conteúdo do arquivo PDF.
+            pdf_reader = PdfReader(file)
+            # Para cada página, identifica o tipo de documento e o nome do funcionário.
+            for i, (pag, rows) in enumerate(tqdm(paginas(arq, pdf_reader), total=len(pdf_reader.pages))):
+                # Identifica o tipo de documento pelo título e acessa o nome do funcionário.
+                try:
+                    regra, titulo, nome = tabela.classifica(rows)
+                    motivo = (f'Documento não reconhecido: {titulo}' if regra is None
+                              else f'Nome não encontrado: {titulo}' if nome is None else None)
+                except ERROS as erro:
+                    # Página com um layout diferente do esperado.
+                    nome, motivo = None, descreve(erro)
+                if motivo is not None:
+                    # A página é separada junto das demais não identificadas, sem interromper a execução.
+                    registros.append({'arquivo': arq, 'pagina': i + 1, 'motivo': motivo})
+                    nome = '_Nao_Identificados'
+
+                file_name = f'Documentos\\{arq[:-4]}\\{nome}.pdf'
+                pdf_writer = PdfWriter()
+                # Verifica se já existe um arquivo para este funcionário
+                if path.exists(file_name):
+                    pdf_reader_temp = PdfReader(file_name)
+                    # Copia todas as páginas do documento do funcionário para o writer
+                    for page_num in range(len(pdf_reader_temp.pages)):
+                        pdf_writer.add_page(pdf_reader_temp.pages[page_num])
+                # Adiciona a página atual
+                pdf_writer.add_page(pag)
+                # Salva o arquivo
+                with open(file_name, "wb") as output_pdf:
+                    pdf_writer.write(output_pdf)
+
+    # Motivo de cada página não identificada.
+    if registros:
+        with open('Documentos\\motivos.csv', 'w', newline='', encoding='utf-8-sig') as file:
+            writer = csv.DictWriter(file, fieldnames=['arquivo', 'pagina', 'motivo'], delimiter=';')
+            writer.writeheader()
+            writer.writerows(registros)
+        print(f'{len(registros)} página(s) não identificada(s), separadas em _Nao_Identificados '
+              f'(motivos em Documentos\\motivos.csv).')
+
+    # Páginas identificadas por cada tipo de documento e o tempo gasto na identificação.
+    resumo = tabela.resumo()
+    for titulo, n in resumo['acertos'].items():
+        if n:
+            print(f'{n:>6} {titulo}')
+    print(f'Identificação: {resumo["tempo"]:.3f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,11 @@ from PyPDF2 import PdfReader, PdfWriter
 import os
 from tqdm import tqdm
 import pandas as pd
+import sys
+
+# O índice da tabela de relação é o mesmo das opções do Manipulador de PDF, ao lado desta pasta.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '_Manipulador de PDF'))
+from configs.utils.tabela_functions import indexa, so_digitos
 
 
 def get_tabela() -> pd.DataFrame:
@@ -10,10 +15,13 @@ def get_tabela() -> pd.DataFrame:
         return pd.DataFrame()
     return pd.read_excel(files[0], header=2)
 
+
 def main() -> int:
     tot_pags = 0
-    df = get_tabela()
-    tem_relacao = len(df) > 0
+    # Índice centro de custo -> CNPJ/CEI do tomador, montado uma única vez.
+    centros = indexa(get_tabela(), 'Desc Moeda 1', 'CNPJ/CEI Tom')
+    centros.avisa('centros de custo')
+    tem_relacao = len(centros) > 0
     centro_custo = ''
     codigo = ''
     novo_centro_custo = '-'
@@ -37,9 +45,9 @@ def main() -> int:
                     if len(writer.pages) > 0:
                         cnpj = ''
                         if tem_relacao:
-                            result = df[df['Desc Moeda 1'] == centro_custo]['CNPJ/CEI Tom'].tolist()
-                            if len(result) == 1:
-                                cnpj = ''.join(char for char in str(result[0]) if char.isnumeric())
+                            result = centros.busca(centro_custo)
+                            if result is not None:
+                                cnpj = so_digitos(result)
                         # Salva o atual
                         with open(f'Arquivos/{codigo}-{centro_custo}-{cnpj}.pdf', 'wb') as output:
                             writer.write(output)
@@ -51,9 +59,9 @@ def main() -> int:
                     writer.add_page(page)
             cnpj = ''
             if tem_relacao:
-                result = df[df['Desc Moeda 1']==centro_custo]['CNPJ/CEI Tom'].tolist()
-                if len(result) == 1:
-                    cnpj = ''.join(char for char in result[0] if char.isnumeric())
+                result = centros.busca(centro_custo)
+                if result is not None:
+                    cnpj = so_digitos(result)
                     print(cnpj)
             # Salva o atual
             with open(f'Arquivos/{codigo}-{centro_custo}-{cnpj}.pdf', 'wb') as output:
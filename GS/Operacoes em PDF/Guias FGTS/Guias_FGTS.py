@@ -1,9 +1,16 @@
 from os import listdir, path, mkdir
 from PyPDF2 import PdfReader, PdfWriter
+from typing import Dict
 from tqdm import tqdm
 import pandas as pd
 import sys
 
+# O índice da tabela de relação é o mesmo da opção 7 do Manipulador de PDF, ao lado desta pasta, assim como a
+# extração de texto, que lê do cache de textos as páginas já extraídas (ver extract_functions).
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), '..', '_Manipulador de PDF'))
+from configs.utils.extract_functions import paginas, prepara
+from configs.utils.tabela_functions import Indice, so_digitos
+
 
 def get_de_para() -> pd.DataFrame:
     files = [file for file in listdir() if '.xls' in file]
@@ -18,44 +25,45 @@ def get_de_para() -> pd.DataFrame:
 
 def main():
     clientes: pd.DataFrame = get_de_para()
+    # Índice CNPJ -> nome do tomador.
+    nomes = Indice(zip(clientes['Inscrição'], clientes['Nome']), so_digitos)
+    nomes.avisa('CNPJs')
 
     # Cria a pasta de destino dos recibos
     if not path.exists('Guias'):
         mkdir('Guias')
 
-    for arq in [file for file in listdir() if '.pdf' in file]:
-        with open(arq, 'rb') as file:
-            # Cria um objeto PdfFileReader para ler o conteúdo do arquivo PDF
-            pdf_reader = PdfReader(file)
-
-            # Itera sobre todas as páginas do PDF
-            for page_pdf in tqdm(pdf_reader.pages):
-                page = page_pdf.extract_text().split('\n')
-
-                if 'Tomador: ' in page[10]:
-                    cnpj = page[10][page[10].find('Tomador: '):][9:]
-                    if cnpj == 'Sem Tomador':
-                        continue
-
-                    nome = clientes['Nome'][clientes['Inscrição']==cnpj].values
-                    if len(nome) == 1:
-                        nome = nome[0].replace('/', '') + '.pdf'
-                    else:
-                        nome = '_NaoEncontrados.pdf'
-
-                    pdf_writer = PdfWriter()
-                    # Adiciona a página atual ao objeto PdfWriter
-                    pdf_writer.add_page(page_pdf)
-
-                    # Verifica se o arquivo com este nome já existe, caso exista, junta-o com o novo arquivo
-                    if nome in listdir('Guias'):
-                        old_pdf = PdfReader(f'Guias/{nome}')
-                        for page in old_pdf.pages:
-                            pdf_writer.add_page(page)
-
-                    # Salva a página em um novo arquivo PDF
-                    with open(f'Guias/{nome}', 'wb') as output_file:
-                        pdf_writer.write(output_file)
+    # Acumula as páginas de cada tomador em memória, cada guia é salva uma única vez no final.
+    writers: Dict[str, PdfWriter] = {}
+    files = [file for file in listdir() if '.pdf' in file]
+    # Inicia a extração de texto de todos os arquivos.
+    prepara(files)
+    for arq in files:
+        # O PdfReader recebe o caminho para manter o conteúdo em memória até as guias serem salvas.
+        pdf_reader = PdfReader(arq)
+
+        # Itera sobre todas as páginas do PDF
+        for page_pdf, page in tqdm(paginas(arq, pdf_reader), total=len(pdf_reader.pages)):
+            if 'Tomador: ' in page[10]:
+                cnpj = page[10][page[10].find('Tomador: '):][9:]
+                if cnpj == 'Sem Tomador':
+                    continue
+
+                nome = nomes.busca(cnpj)
+                if nome is not None:
+                    nome = str(nome).replace('/', '') + '.pdf'
+                else:
+                    nome = '_NaoEncontrados.pdf'
+
+                # Adiciona a página atual às páginas do tomador.
+                if nome not in writers:
+                    writers[nome] = PdfWriter()
+                writers[nome].add_page(page_pdf)
+
+    # Salva as guias de cada tomador.
+    for nome, pdf_writer in writers.items():
+        with open(f'Guias/{nome}', 'wb') as output_file:
+            pdf_writer.write(output_file)
 
 
 if __name__ == '__main__':
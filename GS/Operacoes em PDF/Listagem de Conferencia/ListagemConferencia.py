@@ -1,44 +1,25 @@
-from os import listdir, path, mkdir
-from PyPDF2 import PdfReader, PdfWriter
-from tqdm import tqdm
+from os import path
+import sys
 
+# A separação é a mesma da opção 8 do Manipulador de PDF, ao lado desta pasta: as páginas seguidas da mesma
+# lotação são agrupadas por group_functions.separa, e as que não puderem ser identificadas são separadas em
+# _Nao_Identificados (ver quarentena_functions).
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), '..', '_Manipulador de PDF'))
+from configs.utils import quarentena_functions, saida_functions
+from configs.utils.functions.f08 import f08
 
-def main() -> None:
+
+def main() -> int:
     """
     Lista todos os arquivos PDF no diretório atual (só irá funcionar para Listagens de Conferência)
     e separa em subarquivos, agrupados pela lotação.
     """
-    # Cria a pasta de destino dos recibos
-    if not path.exists('Arquivos'):
-        mkdir('Arquivos')
-
-    for arq in [file for file in listdir() if '.pdf' in file]:
-        folder_name = arq.replace('.pdf', '').replace('/', '')
-        if not path.exists(f'Arquivos/{folder_name}'):
-            mkdir(f'Arquivos/{folder_name}')
-
-        with open(arq, 'rb') as file:
-            # Cria um objeto PdfFileReader para ler o conteúdo do arquivo PDF
-            pdf_reader = PdfReader(file)
-            pdf_writer = PdfWriter()
-            lotacao = ''
-
-            for page_pdf in tqdm(pdf_reader.pages):
-                page = page_pdf.extract_text().split('\n')
-                # Acessa a lotação
-                lotacao_nova = page[6]
-                # Verifica se a lotação é a mesma, se for, junta as páginas,
-                # caso contrário, salva o arquivo atual e cria um pdf novo.
-                if lotacao_nova != lotacao:
-                    if pdf_writer.pages:
-                        with open(f'Arquivos/{folder_name}/{lotacao}.pdf', 'wb') as output_file:
-                            pdf_writer.write(output_file)
-                        pdf_writer = PdfWriter()
-                    lotacao = lotacao_nova
-                    pdf_writer.add_page(page_pdf)
-                else:
-                    pdf_writer.add_page(page_pdf)
-            # Não é necessário salvar o último arquivo em memória, pois é apenas o resumo.
+    quarentena = quarentena_functions.inicia()
+    saidas = saida_functions.inicia()
+    tot_pags = f08()
+    quarentena.fecha()
+    saidas.fecha()
+    return tot_pags
 
 
 if __name__ == '__main__':
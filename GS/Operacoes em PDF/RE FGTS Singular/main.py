@@ -21,6 +21,7 @@ class Aut:
         self.not_found_empr: str = not_found_empr  # Nome padrão para empregador não encontrado.
         self.rel: Dict[str, str] = self.get_relacao()
         self.n_pags: int = 0  # Total de páginas processadas.
+        self.pastas: set = set()  # Pastas de empregador já criadas, para não consultar o disco a cada página.
 
     def salva_relatorio(self, tempo_exec) -> None:
         row = [[datetime.now().strftime("%d/%m/%Y"), 'RE FGTS', self.n_pags, tempo_exec]]
@@ -130,9 +131,10 @@ class Aut:
                     rows: List[str] = page.extract_text().split('\n')
                     nome: str = self.get_nome(rows)
                     empregador: str = self.get_empregador(rows)
-                    # Verifica se a pasta para o empregador já existe.
-                    if not os.path.exists(f'{self.dest}/{empregador}'):
-                        os.mkdir(f'{self.dest}/{empregador}')
+                    # Cria a pasta do empregador na sua primeira página.
+                    if empregador not in self.pastas:
+                        os.makedirs(f'{self.dest}/{empregador}', exist_ok=True)
+                        self.pastas.add(empregador)
 
                     file_name = f'{self.dest}/{empregador}/{nome}.pdf'
                     # Verifica se é um arquivo com nome não encontrado.
@@ -1,10 +1,15 @@
 import os
 from PyPDF2 import PdfReader, PdfWriter, PdfFileReader
 from tqdm import tqdm
-from typing import List
 import pandas as pd
 import sys
 
+# O índice da tabela de relação é o mesmo da opção 7 do Manipulador de PDF, ao lado desta pasta, assim como a
+# extração de texto, que lê do cache de textos as páginas já extraídas (ver extract_functions).
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '_Manipulador de PDF'))
+from configs.utils.extract_functions import paginas, prepara
+from configs.utils.tabela_functions import Indice, so_digitos
+
 
 def get_de_para() -> pd.DataFrame:
     """
@@ -27,20 +32,24 @@ def re_fgts_por_empresa() -> int:
     folder = 'Arquivos'
     # Inicializa a tabela com a relação de cnpj e nome das empresas.
     clientes: pd.DataFrame = get_de_para()
+    # Índice CNPJ -> nome da empresa, montado uma única vez.
+    nomes = Indice(zip(clientes['Inscrição'], clientes['Nome']), so_digitos)
+    nomes.avisa('CNPJs')
     # Cria a pasta de destino dos arquivos.
     if not os.path.exists(folder):
         os.mkdir(folder)
     # Lista todos os arquivos pdf do diretório.
     files = [file for file in os.listdir() if '.pdf' in file.lower()]
+    # Inicia a extração de texto de todos os arquivos.
+    prepara(files)
     for file in files:
         with open(file, 'rb') as file_b:
             # Cria um objeto PdfFileReader para ler o conteúdo do arquivo PDF.
             pdf = PdfReader(file_b)
             tot_pags += len(pdf.pages)
             # Itera sobre todas as páginas do PDF
-            for page in tqdm(pdf.pages):
-                # Extrai o texto da página no formato de uma lista de strings.
-                rows: List[str] = page.extract_text().split('\n')
+            # Percorre as páginas junto do texto de cada uma, no formato de uma lista de strings.
+            for page, rows in tqdm(paginas(file, pdf), total=len(pdf.pages)):
                 # Separa a linha que contém as informações do tomador.
                 row = rows[10]
                 # Caso não haja 'Tomador: ' na linha 10, indica que a página atual é continuação da anterior, e deve
@@ -59,10 +68,10 @@ def re_fgts_por_empresa() -> int:
                 if not os.path.exists(empregador):
                     os.mkdir(empregador)
                 # Procura o nome da empresa na tabela de relação.
-                nome = clientes['Nome'][clientes['Inscrição'] == cnpj].values
+                nome = nomes.busca(cnpj)
                 # Caso seja encontrada apenas uma ocorrência, o arquivo é salvo com este nome.
-                if len(nome) == 1:
-                    nome = nome[0].replace('/', '') + '.pdf'
+                if nome is not None:
+                    nome = str(nome).replace('/', '') + '.pdf'
                 # Caso seja encontrado 0 ou mais que 1 ocorrência, o arquivo é salvo junto com outros onde
                 # não se foi possível encontrar o nome.
                 else:
@@ -1,9 +1,16 @@
 import os
 from PyPDF2 import PdfReader, PdfWriter
+from typing import Dict
 from tqdm import tqdm
 import pandas as pd
 import sys
 
+# O índice da tabela de relação é o mesmo da opção 7 do Manipulador de PDF, ao lado desta pasta, assim como a
+# extração de texto, que lê do cache de textos as páginas já extraídas (ver extract_functions).
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '_Manipulador de PDF'))
+from configs.utils.extract_functions import paginas, prepara
+from configs.utils.tabela_functions import Indice, so_digitos
+
 # Esta função tem como objetivo carregar e preparar uma tabela de dados (DataFrame) 
 # a partir de um arquivo Excel que contém informações de clientes
 def get_de_para() -> pd.DataFrame:
@@ -32,53 +39,58 @@ def safe_folder_name(name: str) -> str:
 # Função principal do código
 def re_fgts_por_empresa():
     clientes: pd.DataFrame = get_de_para()
+    # Índice CNPJ -> nome da empresa, montado uma única vez. A inscrição pode estar na tabela como número.
+    nomes = Indice(zip(clientes['Inscrição'], clientes['Nome']), so_digitos)
+    nomes.avisa('CNPJs')
     total_paginas = 0
-    for arq in [file for file in os.listdir() if file.lower().endswith('.pdf')]:
-        with open(arq, 'rb') as file:
-            pdf_reader = PdfReader(file)
-            total_paginas += len(pdf_reader.pages)
-            # Processa cada página individualmente
-            for page_pdf in tqdm(pdf_reader.pages, desc=f"Processando {arq}"):
-                page = page_pdf.extract_text().split('\n')
-                
-                # Extrai nome do empregador
-                if 'Nome Empregador' in page[1]:
-                    empregador = page[1][page[1].rfind('Empregador: '):][12:].strip()
-                
-                # Cria pasta para o empregador
-                pasta_empregador = safe_folder_name(empregador)
-                if not os.path.exists(pasta_empregador):
-                    os.mkdir(pasta_empregador)
-                
-                # Processa tomadores
-                if 'Tomador: ' in page[10]:
-                    cnpj = page[10][page[10].find('Tomador: ')+9:].strip()
-                    if cnpj == 'Sem Tomador':
-                        continue
-                    
-                    # Busca na tabela com CNPJ original
-                    nome = clientes['Nome'][clientes['Inscrição'] == cnpj].values
-                    cnpj_limpo = clean_cnpj(cnpj)
-                    
-                    if len(nome) == 1:
-                        nome_arquivo = f"{safe_folder_name(nome[0])}_{cnpj_limpo}.pdf"
-                    else:
-                        nome_arquivo = f"{cnpj_limpo}_NaoEncontrado.pdf"
-                    
-                    pdf_writer = PdfWriter()
-                    pdf_writer.add_page(page_pdf)
+    # Acumula as páginas de cada tomador em memória, cada arquivo é salvo uma única vez no final.
+    writers: Dict[str, PdfWriter] = {}
+    files = [file for file in os.listdir() if file.lower().endswith('.pdf')]
+    # Inicia a extração de texto de todos os arquivos.
+    prepara(files)
+    for arq in files:
+        # O PdfReader recebe o caminho para manter o conteúdo em memória até os arquivos serem salvos.
+        pdf_reader = PdfReader(arq)
+        total_paginas += len(pdf_reader.pages)
+        # Processa cada página individualmente
+        for page_pdf, page in tqdm(paginas(arq, pdf_reader), total=len(pdf_reader.pages), desc=f"Processando {arq}"):
+
+            # Extrai nome do empregador
+            if 'Nome Empregador' in page[1]:
+                empregador = page[1][page[1].rfind('Empregador: '):][12:].strip()
+
+            # Cria pasta para o empregador
+            pasta_empregador = safe_folder_name(empregador)
+            if not os.path.exists(pasta_empregador):
+                os.mkdir(pasta_empregador)
+
+            # Processa tomadores
+            if 'Tomador: ' in page[10]:
+                cnpj = page[10][page[10].find('Tomador: ')+9:].strip()
+                if cnpj == 'Sem Tomador':
+                    continue
+
+                # Busca na tabela pelo CNPJ sem pontuação
+                cnpj_limpo = clean_cnpj(cnpj)
+                nome = nomes.busca(cnpj_limpo)
+
+                if nome is not None:
+                    nome_arquivo = f"{safe_folder_name(str(nome))}_{cnpj_limpo}.pdf"
+                else:
+                    nome_arquivo = f"{cnpj_limpo}_NaoEncontrado.pdf"
+
+                # Caminho completo do arquivo
+                output_path = os.path.join(pasta_empregador, nome_arquivo)
 
-                    # Caminho completo do arquivo
-                    output_path = os.path.join(pasta_empregador, nome_arquivo)
-                    
-                    # Verifica se arquivo já existe para mesclar
-                    if os.path.exists(output_path):
-                        old_pdf = PdfReader(output_path)
-                        for old_page in old_pdf.pages:
-                            pdf_writer.add_page(old_page)
+                # Adiciona a página atual às páginas do tomador.
+                if output_path not in writers:
+                    writers[output_path] = PdfWriter()
+                writers[output_path].add_page(page_pdf)
 
-                    with open(output_path, 'wb') as output_file:
-                        pdf_writer.write(output_file)
+    # Salva os arquivos de cada tomador.
+    for output_path, pdf_writer in writers.items():
+        with open(output_path, 'wb') as output_file:
+            pdf_writer.write(output_file)
     return total_paginas                    
     
    
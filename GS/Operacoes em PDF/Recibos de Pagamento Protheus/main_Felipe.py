@@ -2,6 +2,12 @@ import os
 from PyPDF2 import PdfReader, PdfWriter
 import re
 
+# Expressões compiladas uma única vez. A da matrícula e do nome é aplicada ao texto inteiro da página, mas,
+# como só aceita espaços dentro da linha ([^\S\n]), encontra a mesma ocorrência que a busca linha a linha.
+MATRICULA_NOME = re.compile(r'Matrícula[^\S\n]*:[^\S\n]*(\d+)[^\S\n]+Nome[^\S\n]*:[^\S\n]*([A-ZÀ-Ú ]+)')
+L_FINAL = re.compile(r'\s+L$')
+INVALIDOS = re.compile(r'[^A-Za-z0-9À-Ú_]')
+
 def recibos_de_pagamentos_protheus():
     def separar_paginas_por_nome(arquivo_pdf: str, pasta_destino: str) -> int:
         if not os.path.exists(arquivo_pdf):
@@ -19,19 +25,16 @@ def recibos_de_pagamentos_protheus():
                 if not texto_pagina:
                     continue
 
-                linhas = texto_pagina.split('\n')
                 matricula = ""
                 nome = ""
 
                 # Expressão regular ajustada para capturar apenas a matrícula e o nome
-                for linha in linhas:
-                    match = re.search(r'Matrícula\s*:\s*(\d+)\s+Nome\s*:\s*([A-ZÀ-Ú ]+)', linha)
-                    if match:
-                        matricula = match.group(1)
-                        nome = match.group(2).strip()
-                        # Garante que o nome não tenha palavras extras como "Local"
-                        nome = re.sub(r'\s+L$', '', nome)  # Remove um "L" no final caso tenha vindo junto
-                        break  # Encontrou, pode sair do loop
+                match = MATRICULA_NOME.search(texto_pagina)
+                if match:
+                    matricula = match.group(1)
+                    nome = match.group(2).strip()
+                    # Garante que o nome não tenha palavras extras como "Local"
+                    nome = L_FINAL.sub('', nome)  # Remove um "L" no final caso tenha vindo junto
 
                 # Formatação do nome do arquivo
                 if matricula and nome:
@@ -42,7 +45,7 @@ def recibos_de_pagamentos_protheus():
                     nome_arquivo = f"Pagina_{pag_num+1}"
 
                 # Limpeza do nome do arquivo
-                nome_arquivo = re.sub(r'[^A-Za-z0-9À-Ú_]', '', nome_arquivo)  # Remove caracteres inválidos
+                nome_arquivo = INVALIDOS.sub('', nome_arquivo)  # Remove caracteres inválidos
                 nome_arquivo = nome_arquivo.rstrip('_')  # Remove underlines finais extras
 
                 file_path = os.path.join(pasta_destino, f'{nome_arquivo}.pdf')
@@ -1,36 +1,52 @@
+from importlib.util import find_spec
 from os import listdir, path, mkdir
 from PyPDF2 import PdfReader
 from tqdm import tqdm
 import pandas as pd
+import sys
 
+# A regex dos recibos é a mesma da opção 22 do Manipulador de PDF, ao lado desta pasta, assim como a extração
+# de texto, que aplica a regex nos processos do pool e lê do cache de textos as páginas já extraídas.
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), '..', '_Manipulador de PDF'))
+from configs.utils.campos_functions import RECIBO
+from configs.utils.extract_functions import paginas, prepara
+from configs.utils.planilha_functions import Extrator
 
-if not path.exists('Planilhas'):
-    mkdir('Planilhas')
-
-for arq in [file for file in listdir() if '.pdf' in file]:
-    df = pd.DataFrame(columns=['Empregado', 'Total'])
-    with open(arq, 'rb') as file:
-        # Cria um objeto PdfFileReader para ler o conteúdo do arquivo PDF.
-        pdf_reader = PdfReader(file)
-        dados = list()
-        achou = False
-        for pag in tqdm(pdf_reader.pages):
-
-            rows = pag.extract_text().split('\n')
-            for i, row in enumerate(rows):
-                # Acessa o nome do contrato e do empregado.
-                if row == 'Total':
-                    if not rows[i-2].startswith(' '):
-                        contrato = rows[i-2]
-                    achou = True
-                    nome = rows[i-1].split()[1:]
-                    idx = 0
-                    while nome[idx].isalpha():
-                        idx += 1
-                    nome = ' '.join(nome[:idx])
-                if achou and row.startswith(' '):
-                    achou = False
-                    total = row.split()[0]
-                    df.loc[len(df)] = [nome, total]
-    df.to_excel(f'Planilhas\\{arq.replace('.pdf', '.xlsx')}', index=False)
+EXTRATOR = Extrator(RECIBO, ['anterior', 'empregado', 'total'])
 
+
+if __name__ == '__main__':
+    if not path.exists('Planilhas'):
+        mkdir('Planilhas')
+
+    colunas = {'Arquivo': [], 'Empregado': [], 'Total': []}
+
+    def adiciona(arq, nome, total):
+        colunas['Arquivo'].append(arq)
+        colunas['Empregado'].append(nome)
+        colunas['Total'].append(total)
+
+    arquivos = [file for file in listdir() if '.pdf' in file]
+    # As páginas de todos os arquivos são enviadas de uma vez e lidas na ordem.
+    prepara(arquivos, parser=EXTRATOR)
+    for arq in arquivos:
+        pdf_reader = PdfReader(arq)
+        # Empregado cujo total ainda não apareceu, por estar na página seguinte.
+        pendente = None
+        for _, ocorrencias in tqdm(paginas(arq, pdf_reader, EXTRATOR), total=len(pdf_reader.pages), desc=arq):
+            for anterior, empregado, total in ocorrencias:
+                if anterior is not None:
+                    if pendente is not None:
+                        adiciona(arq, pendente, anterior)
+                elif total is not None:
+                    adiciona(arq, empregado or '', total)
+                else:
+                    pendente = empregado or ''
+                    continue
+                pendente = None
+
+    # Uma planilha com os empregados de todos os arquivos e, se o pyarrow estiver instalado, o Parquet.
+    df = pd.DataFrame(colunas)
+    df.to_excel(path.join('Planilhas', 'Total por Empregado.xlsx'), index=False)
+    if find_spec('pyarrow') is not None:
+        df.to_parquet(path.join('Planilhas', 'Total por Empregado.parquet'), index=False)
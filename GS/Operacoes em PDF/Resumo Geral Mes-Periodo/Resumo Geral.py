@@ -1,46 +1,22 @@
-from os import listdir, path, mkdir
-from PyPDF2 import PdfReader, PdfWriter
-from tqdm import tqdm
+from os import path
+import sys
 
-# Cria a pasta de destino dos recibos
-if not path.exists('Arquivos'):
-    mkdir('Arquivos')
+# A separação é a mesma da opção 12 do Manipulador de PDF, ao lado desta pasta: as páginas seguidas da mesma
+# empresa são agrupadas por group_functions.separa, e as que não puderem ser identificadas são separadas em
+# _Nao_Identificados (ver quarentena_functions).
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), '..', '_Manipulador de PDF'))
+from configs.utils import quarentena_functions, saida_functions
+from configs.utils.functions.f12 import f12
 
-for arq in [file for file in listdir() if '.pdf' in file]:
-    with open(arq, 'rb') as file:
-        # Cria um objeto PdfFileReader para ler o conteúdo do arquivo PDF
-        pdf_reader = PdfReader(file)
-        pdf_writer = PdfWriter()
-        empresa = ''
 
-        for page_pdf in tqdm(pdf_reader.pages):
-            page = page_pdf.extract_text().split('\n')
-            # Acessa o nome e CNPJ da empresa
-            for row in page:
-                if 'Empresa: ' in row:
-                    idx = 1
-                    while not row[-idx].isnumeric():
-                        idx += 1
-                    row = row[8:1 - idx].split()
-                    cnpj = ''.join(i for i in row[-1] if i.isnumeric())
-                    idx = 0
-                    while row[idx] != '-':
-                        idx += 1
-                    empresa_nova = ' '.join(row[:idx])
-                    break
+def main() -> int:
+    quarentena = quarentena_functions.inicia()
+    saidas = saida_functions.inicia()
+    tot_pags = f12()
+    quarentena.fecha()
+    saidas.fecha()
+    return tot_pags
 
-            # Verifica se a empresa e a mesma, se for, junta as páginas,
-            # caso contrário, salva o arquivo atual e cria um pdf novo.
-            if empresa_nova != empresa:
-                if pdf_writer.pages:
-                    with open(f'Arquivos/{empresa}-{cnpj}.pdf', 'wb') as output_file:
-                        pdf_writer.write(output_file)
-                    pdf_writer = PdfWriter()
-                empresa = empresa_nova
-                pdf_writer.add_page(page_pdf)
-            else:
-                pdf_writer.add_page(page_pdf)
-        # Salva o último arquivo aberto
-        with open(f'Arquivos/{empresa}-{cnpj}.pdf', 'wb') as output_file:
-            pdf_writer.write(output_file)
-        pdf_writer = PdfWriter()
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,7 @@ from googleapiclient.errors import HttpError
 from PyPDF2 import PdfReader, PdfWriter
 from datetime import datetime
 from typing import List, Dict
+from threading import Thread
 from time import sleep
 from tqdm import tqdm
 from PIL import Image
@@ -23,6 +24,10 @@ import re
 pytesseract.pytesseract.tesseract_cmd = 'configs/tess/tesseract.exe'
 
 VERSION: str = '0.2.2'
+# Tempo máximo de espera pela API do GitHub e validade da última versão guardada, em segundos.
+TIMEOUT_VERSAO: float = 3
+TTL_VERSAO: float = float(os.environ.get('MANIPULADOR_TTL_VERSAO', 12 * 60 * 60))
+CACHE_VERSAO: str = 'configs/versao.json'
 
 main_msg: str = '''0: Ajuda (Informações) 
 1: Identificar Automaticamente (mais lento)
@@ -50,23 +55,38 @@ def main():
     main_hub()  # inicia o menu.
 
 
-def check_update():
+def check_update() -> Thread:
+    """
+    Inicia a verificação de atualização em segundo plano, sem atrasar a exibição do menu.
+    """
+    thread = Thread(target=verifica_versao, daemon=True)
+    thread.start()
+    return thread
+
+
+def verifica_versao() -> None:
     last_version = get_last_version()
-    if type(last_version) == str:
-        if VERSION != get_last_version():
-            print('Nova versão disponível!')
-            print('Para baixar a nova versão, feche e exclua este arquivo (main.py) e execute o arquivo "download_last_version" dentro da pasta "configs".')
-            input('Para continuar utilizando esta versão, pressione Enter')
+    if type(last_version) == str and VERSION != last_version:
+        print('\nNova versão disponível!')
+        print('Para baixar a nova versão, feche e exclua este arquivo (main.py) e execute o arquivo "download_last_version" dentro da pasta "configs".')
 
 
 def get_last_version():
+    # Reaproveita a última versão consultada enquanto ela estiver dentro da validade.
+    try:
+        with open(CACHE_VERSAO, 'r', encoding='utf-8') as file:
+            cache = json.load(file)
+        if time.time() - cache['data'] <= TTL_VERSAO:
+            return cache['versao']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
     # Endpoint da API para buscar o histórico de commits de um arquivo específico
     url = f"https://api.github.com/repos/LuizGusQueiroz/Automacoes/commits"
     # Parâmetros da consulta, para buscar commits de um arquivo específico
-    params = {'path': "KMF/Operacoes em PDF/_Manipulador de PDF - Tess/main.exe"}
+    params = {'path': "KMF/Operacoes em PDF/_Manipulador de PDF - Tess/main.exe", 'per_page': 1}
     try:
         # Envia a requisição GET para a API do GitHub
-        response = requests.get(url, params=params)
+        response = requests.get(url, params=params, timeout=TIMEOUT_VERSAO)
         response.raise_for_status()  # Levanta uma exceção se houver um erro na requisição
         # Extrai o JSON da resposta
         commits_data = response.json()
@@ -74,6 +94,11 @@ def get_last_version():
             # A mensagem do commit mais recente está no primeiro item da lista
             last_commit = commits_data[0]
             commit_message = last_commit['commit']['message']
+            try:
+                with open(CACHE_VERSAO, 'w', encoding='utf-8') as file:
+                    json.dump({'versao': commit_message, 'data': time.time()}, file)
+            except OSError:
+                pass
             return commit_message
         else:
             return None
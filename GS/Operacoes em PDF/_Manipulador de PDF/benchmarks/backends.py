@@ -0,0 +1,101 @@
+"""
+Confere que o PyPDF2 e o PyMuPDF dão o mesmo resultado sobre os PDFs sintéticos (ver corpus.py), sem
+medir tempo: o texto de cada página, inteiro e só com as linhas do cabeçalho, e as saídas de cada opção
+(ver bench.assinatura). Termina com código 1 se houver alguma diferença, para ser usado antes de
+publicar uma versão. Se o PyMuPDF não estiver instalado, não há o que conferir.
+
+Uso, a partir da pasta do Manipulador:
+    python benchmarks/backends.py
+    python benchmarks/backends.py --only f08 f21 --pages 50
+"""
+from typing import List
+import argparse
+import tempfile
+import shutil
+import sys
+import os
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, PASTA)
+sys.path.insert(0, os.path.dirname(PASTA))
+
+from configs.utils.backend_functions import disponivel, get_backend
+import corpus
+import bench
+
+# Quantidades de linhas do cabeçalho conferidas, as mesmas usadas pelas opções (LINHAS_CABECALHO).
+LINHAS_CABECALHO = (1, 2, 4, 7, 12)
+
+
+def confere_textos(option: str, n_pags: int) -> List[str]:
+    """
+    Compara o texto extraído por cada backend em todas as páginas do corpus da opção.
+    """
+    pypdf2, pymupdf = get_backend('pypdf2'), get_backend('pymupdf')
+    diretorio = tempfile.mkdtemp(prefix=f'backends_{option}_')
+    divergencias = []
+    try:
+        corpus.gera(option, n_pags, diretorio)
+        for nome in sorted(os.listdir(diretorio)):
+            path = os.path.join(diretorio, nome)
+            paginas = zip(pypdf2.abre(path).pages, pymupdf.abre(path).pages)
+            for i, (pagina, pagina_mupdf) in enumerate(paginas):
+                for n_linhas in (None, *LINHAS_CABECALHO):
+                    if pypdf2.linhas(pagina, n_linhas) != pymupdf.linhas(pagina_mupdf, n_linhas):
+                        divergencias.append(f'{option}: texto diferente em {nome}, página {i + 1}'
+                                            + (f' ({n_linhas} linhas)' if n_linhas else ''))
+                        break
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+    return divergencias
+
+
+def confere_saidas(option: str, n_pags: int, workers: int | None) -> List[str]:
+    """
+    Executa a opção com cada backend e compara as assinaturas das saídas.
+    """
+    resultados = {backend: bench.mede(option, n_pags, workers, cache=False, backend=backend, paridade=True)
+                  for backend in ('pypdf2', 'pymupdf')}
+    erros = [f"{option} [{backend}]: {resultado.get('erro', '')}"
+             for backend, resultado in resultados.items() if resultado['status'] != 'ok']
+    if erros:
+        return erros
+    if resultados['pypdf2']['assinatura'] != resultados['pymupdf']['assinatura']:
+        return [f'{option}: as saídas do pymupdf diferem das do pypdf2']
+    return []
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Confere se os backends de PDF dão o mesmo resultado.')
+    parser.add_argument('--pages', '-p', type=int, default=30, help='Páginas do corpus de cada opção.')
+    parser.add_argument('--only', nargs='+', default=sorted(corpus.LAYOUTS),
+                        help='Opções conferidas (ex.: f08 f12). Por padrão, todas.')
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                        help='Processos de extração (MANIPULADOR_WORKERS). Por padrão, o do ambiente.')
+    args = parser.parse_args(argv)
+
+    invalidas = [option for option in args.only if option not in corpus.LAYOUTS]
+    if invalidas:
+        print(f'Opções sem gerador de corpus: {invalidas}', file=sys.stderr)
+        return 2
+    if not disponivel('pymupdf'):
+        print('PyMuPDF não instalado (pip install pymupdf), nada a conferir.')
+        return 0
+
+    divergencias = []
+    for option in args.only:
+        print(f'{option}...', file=sys.stderr)
+        divergencias += confere_textos(option, args.pages)
+        divergencias += confere_saidas(option, args.pages, args.workers)
+
+    if divergencias:
+        print('Diferenças entre o pypdf2 e o pymupdf:')
+        for divergencia in divergencias:
+            print(f'  {divergencia}')
+        return 1
+    print(f'pypdf2 e pymupdf iguais em {len(args.only)} opções.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
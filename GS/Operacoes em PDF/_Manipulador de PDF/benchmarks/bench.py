@@ -0,0 +1,321 @@
+"""
+Benchmark das opções do Manipulador sobre PDFs sintéticos (ver corpus.py).
+
+Cada opção é executada em um processo separado, dentro de uma pasta temporária com os arquivos
+gerados, e são medidos o tempo, as páginas por segundo, o pico de memória (RSS) e o tamanho dos
+arquivos de saída. O resultado pode ser guardado como referência e comparado com execuções futuras.
+
+Uso, a partir da pasta do Manipulador:
+    python benchmarks/bench.py --pages 10 100 1000
+    python benchmarks/bench.py --only f08 f12 --pages 10000 --save-baseline
+    python benchmarks/bench.py --startup
+    python benchmarks/bench.py --only f05 f10 f21 --pages 1000 --optimize
+    python benchmarks/bench.py --pages 100 1000 --backend pypdf2 pymupdf
+    python benchmarks/bench.py --only f08 f09 --pages 1000 5000 20000 --memoria 200
+"""
+from typing import Dict, List
+import subprocess
+import hashlib
+import tempfile
+import argparse
+import shutil
+import json
+import time
+import sys
+import os
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+# Pasta do Manipulador, de onde vem o pacote configs.
+RAIZ = os.path.dirname(PASTA)
+sys.path.insert(0, PASTA)
+sys.path.insert(0, RAIZ)
+
+import corpus
+
+BASELINE_PATH: str = os.path.join(PASTA, 'baseline.json')
+# Queda de páginas por segundo, em relação à referência, considerada regressão.
+TOLERANCIA: float = 0.10
+
+
+def pico_memoria() -> int:
+    """
+    Retorna o pico de memória (RSS) do processo atual, em bytes.
+    """
+    try:
+        # No Linux, o ru_maxrss de um processo criado pelo subprocess começa no pico do processo que o criou
+        # (o do benchmark, que gera os corpus), então o pico é lido do próprio processo (VmHWM).
+        with open('/proc/self/status') as status:
+            for linha in status:
+                if linha.startswith('VmHWM:'):
+                    return int(linha.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        # No Linux o valor é dado em KB, no macOS em bytes.
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico if sys.platform == 'darwin' else pico * 1024
+    except ImportError:
+        try:
+            import psutil
+            info = psutil.Process().memory_info()
+            return getattr(info, 'peak_wset', info.rss)
+        except ImportError:
+            return 0
+
+
+def assinatura(entradas: set) -> str:
+    """
+    Resume o resultado da separação: o caminho de cada arquivo de saída e o texto de cada uma das suas
+    páginas, lido sempre pelo PyPDF2. Execuções com backends diferentes devem ter a mesma assinatura.
+    """
+    from PyPDF2 import PdfReader
+    sha = hashlib.sha256()
+    for base, _, files in sorted(os.walk('.')):
+        for file in sorted(files):
+            path = os.path.join(base, file)
+            if os.path.normpath(path) in entradas or path.startswith(os.path.join('.', 'configs')):
+                continue
+            sha.update(path.replace('\\', '/').encode())
+            if file.lower().endswith('.pdf'):
+                for page in PdfReader(path).pages:
+                    sha.update(b'\0' + page.extract_text().encode())
+    return sha.hexdigest()
+
+
+def _executa(option: str, paridade: bool = False) -> None:
+    """
+    Executada no processo filho, dentro da pasta com os arquivos gerados: roda a opção e
+    imprime as medidas em JSON na última linha da saída.
+    """
+    from configs.utils.functions import OPCOES, carrega
+    from configs.utils import backend_functions, otimiza_functions, quarentena_functions, saida_functions
+    numero = int(option[1:])
+    entradas = set(os.listdir())
+    sys.stdin = open(os.devnull)
+    st = time.perf_counter()
+    funcao = carrega(numero)
+    quarentena = quarentena_functions.inicia()
+    saida_functions.inicia()
+    otimiza_functions.inicia()
+    # Opções com modos rodam no último deles (ex.: opção 9, por lotação, que agrupa páginas).
+    n_pags = funcao(OPCOES[numero].modos[-1]) if OPCOES[numero].modos else funcao()
+    quarentena.fecha()
+    tempo = time.perf_counter() - st
+
+    saida = 0
+    for base, _, files in os.walk('.'):
+        for file in files:
+            path = os.path.join(base, file)
+            if os.path.normpath(path) not in entradas and not path.startswith(os.path.join('.', 'configs')):
+                saida += os.path.getsize(path)
+    medidas = {'n_pags': n_pags, 'tempo': tempo, 'rss': pico_memoria(), 'saida': saida,
+               'economia': otimiza_functions.resumo()['bytes_economizados'],
+               'backend': backend_functions.get_backend().nome}
+    if paridade:
+        medidas['assinatura'] = assinatura(entradas)
+    print(json.dumps(medidas))
+
+
+def mede(option: str, n_pags: int, workers: int | None, cache: bool, otimiza: bool = False,
+         backend: str | None = None, paridade: bool = False, memoria: int | None = None) -> Dict:
+    """
+    Gera o corpus da opção em uma pasta temporária e mede a sua execução em um processo separado.
+    Com `paridade`, a execução também retorna a assinatura das saídas (ver `assinatura`). Com `memoria`,
+    a execução usa esse limite de memória, em MB (ver memoria_functions).
+    """
+    diretorio = tempfile.mkdtemp(prefix=f'bench_{option}_')
+    resultado = {'option': option, 'paginas': n_pags, 'otimiza': otimiza, 'status': 'ok'}
+    if backend is not None:
+        resultado['backend'] = backend
+    if memoria is not None:
+        resultado['memoria'] = memoria
+    try:
+        resultado['entrada'] = corpus.gera(option, n_pags, diretorio)
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([RAIZ, os.environ.get('PYTHONPATH', '')]))
+        if workers is not None:
+            env['MANIPULADOR_WORKERS'] = str(workers)
+        if not cache:
+            env['MANIPULADOR_CACHE'] = '0'
+        env['MANIPULADOR_OTIMIZA'] = '1' if otimiza else '0'
+        if backend is not None:
+            env['MANIPULADOR_BACKEND'] = backend
+        if memoria is not None:
+            env['MANIPULADOR_MEMORIA'] = str(memoria)
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--_run', option]
+                              + (['--_paridade'] if paridade else []),
+                              cwd=diretorio, env=env, capture_output=True, text=True)
+        linhas = proc.stdout.strip().split('\n')
+        if proc.returncode != 0 or not linhas[-1].startswith('{'):
+            resultado['status'] = 'erro'
+            resultado['erro'] = (proc.stderr.strip().split('\n') or [''])[-1]
+            return resultado
+        medidas = json.loads(linhas[-1])
+        resultado.update(medidas)
+        resultado['pags_s'] = n_pags / medidas['tempo'] if medidas['tempo'] else 0.0
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+    return resultado
+
+
+def mede_inicio(repeticoes: int = 5) -> Dict:
+    """
+    Mede o tempo até o menu ficar disponível, importando apenas o que a abertura do programa importa.
+    """
+    from configs.utils.menu_functions import META_TEMPO_INICIO
+    codigo = ('import time; st = time.perf_counter(); import configs.utils.menu_functions; '
+              'print(time.perf_counter() - st)')
+    tempos = []
+    for _ in range(repeticoes):
+        proc = subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, capture_output=True, text=True)
+        tempos.append(float(proc.stdout.strip()))
+    return {'tempo': min(tempos), 'meta': META_TEMPO_INICIO, 'status': 'ok' if min(tempos) <= META_TEMPO_INICIO else 'lento'}
+
+
+def chave(resultado: Dict) -> str:
+    return (f"{resultado['option']}-{resultado['paginas']}" + ('-otimizado' if resultado.get('otimiza') else '')
+            + (f"-{resultado['backend']}" if resultado.get('backend', 'pypdf2') != 'pypdf2' else '')
+            + (f"-memoria{resultado['memoria']}" if resultado.get('memoria') else ''))
+
+
+def compara(resultados: List[Dict], baseline: Dict[str, Dict]) -> List[str]:
+    """
+    Compara as páginas por segundo com a referência e retorna as regressões encontradas.
+    """
+    regressoes = []
+    for resultado in resultados:
+        anterior = baseline.get(chave(resultado))
+        if resultado['status'] != 'ok' or anterior is None or not anterior.get('pags_s'):
+            continue
+        variacao = resultado['pags_s'] / anterior['pags_s'] - 1
+        resultado['variacao'] = variacao
+        if variacao < -TOLERANCIA:
+            regressoes.append(f'{chave(resultado)}: {anterior["pags_s"]:.1f} -> {resultado["pags_s"]:.1f} pág/s ({variacao:+.0%})')
+    return regressoes
+
+
+def compara_backends(resultados: List[Dict]) -> List[str]:
+    """
+    Compara as execuções da mesma medida com backends diferentes: as saídas devem ter a mesma
+    assinatura. Imprime o ganho de cada backend em relação ao PyPDF2 e retorna as divergências.
+    """
+    medidas: Dict[tuple, Dict[str, Dict]] = {}
+    for resultado in resultados:
+        if resultado['status'] == 'ok' and 'assinatura' in resultado:
+            medidas.setdefault((resultado['option'], resultado['paginas'], resultado['otimiza']), {})[
+                resultado['backend']] = resultado
+    divergencias = []
+    print(f"\n{'opção':<8}{'páginas':>8}{'backend':>10}{'ganho':>8}{'saídas':>10}")
+    for (option, n_pags, otimiza), backends in medidas.items():
+        referencia = backends.get('pypdf2')
+        if referencia is None:
+            continue
+        for nome, resultado in backends.items():
+            if nome == 'pypdf2':
+                continue
+            iguais = resultado['assinatura'] == referencia['assinatura']
+            ganho = resultado['pags_s'] / referencia['pags_s'] if referencia['pags_s'] else 0.0
+            opcao = option + ('+o' if otimiza else '')
+            print(f"{opcao:<8}{n_pags:>8}{nome:>10}{ganho:>7.1f}x{'iguais' if iguais else 'DIFERENTES':>10}")
+            if not iguais:
+                divergencias.append(f'{opcao}-{n_pags}: as saídas do {nome} diferem das do pypdf2')
+    return divergencias
+
+
+def imprime(resultados: List[Dict]) -> None:
+    # As medidas com a otimização das saídas aparecem como 'f21+o', as feitas com o PyMuPDF como 'f21+m' e
+    # as feitas com limite de memória como 'f21+l'.
+    print(f"{'opção':<8}{'páginas':>8}{'tempo (s)':>11}{'pág/s':>10}{'RSS (MB)':>10}{'saída (KB)':>12}"
+          f"{'economia (KB)':>15}{'var.':>8}")
+    for r in resultados:
+        opcao = (r['option'] + ('+o' if r.get('otimiza') else '') + ('+m' if r.get('backend') == 'pymupdf' else '')
+                 + ('+l' if r.get('memoria') else ''))
+        if r['status'] != 'ok':
+            print(f"{opcao:<8}{r['paginas']:>8}  erro: {r.get('erro', '')}")
+            continue
+        variacao = f"{r['variacao']:+.0%}" if 'variacao' in r else ''
+        economia = f"{r['economia'] / 2**10:.1f}" if r.get('otimiza') else ''
+        print(f"{opcao:<8}{r['paginas']:>8}{r['tempo']:>11.2f}{r['pags_s']:>10.1f}"
+              f"{r['rss'] / 2**20:>10.1f}{r['saida'] / 2**10:>12.1f}{economia:>15}{variacao:>8}")
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark das opções do Manipulador de PDFs.')
+    parser.add_argument('--pages', '-p', type=int, nargs='+', default=[10, 100, 1000],
+                        help='Quantidades de páginas do corpus de cada opção.')
+    parser.add_argument('--only', nargs='+', default=sorted(corpus.LAYOUTS),
+                        help='Opções medidas (ex.: f08 f12). Por padrão, todas.')
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                        help='Processos de extração (MANIPULADOR_WORKERS). Por padrão, o do ambiente.')
+    parser.add_argument('--cache', action='store_true',
+                        help='Mantém o cache de textos ligado. Como cada medida usa uma pasta nova, ele fica vazio.')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Arquivo de referência para comparação.')
+    parser.add_argument('--save-baseline', action='store_true', help='Guarda os resultados como nova referência.')
+    parser.add_argument('--output', '-o', default=None, help='Arquivo onde os resultados são salvos em JSON.')
+    parser.add_argument('--startup', action='store_true', help='Mede apenas o tempo de abertura do menu.')
+    parser.add_argument('--optimize', action='store_true',
+                        help='Mede cada opção duas vezes, gravando as saídas normalmente e com a otimização '
+                             '(MANIPULADOR_OTIMIZA), para comparar o tempo e o tamanho das saídas.')
+    parser.add_argument('--backend', '-b', nargs='+', default=None, choices=['pypdf2', 'pymupdf'],
+                        help='Mede cada opção com cada backend (MANIPULADOR_BACKEND). Com mais de um, confere se '
+                             'as saídas são as mesmas e mostra o ganho em relação ao pypdf2.')
+    parser.add_argument('--memoria', type=int, default=None, metavar='MB',
+                        help='Limite de memória das execuções, em MB (MANIPULADOR_MEMORIA). Com o limite, o pico '
+                             'de memória deve ficar estável com o aumento das páginas.')
+    parser.add_argument('--_run', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--_paridade', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args._run:
+        _executa(args._run, args._paridade)
+        return 0
+    if args.startup:
+        inicio = mede_inicio()
+        print(f"Abertura do menu: {inicio['tempo']:.3f} s (meta: {inicio['meta']} s) [{inicio['status']}]")
+        return 0 if inicio['status'] == 'ok' else 1
+
+    invalidas = [option for option in args.only if option not in corpus.LAYOUTS]
+    if invalidas:
+        print(f'Opções sem gerador de corpus: {invalidas}', file=sys.stderr)
+        return 2
+
+    resultados = []
+    paridade = args.backend is not None and len(args.backend) > 1
+    for option in args.only:
+        for n_pags in args.pages:
+            for otimiza in ([False, True] if args.optimize else [False]):
+                for backend in args.backend or [None]:
+                    print(f'{option} - {n_pags} páginas{" (otimizado)" if otimiza else ""}'
+                          f'{f" [{backend}]" if backend else ""}...', file=sys.stderr)
+                    resultados.append(mede(option, n_pags, args.workers, args.cache, otimiza, backend, paridade,
+                                           args.memoria))
+
+    baseline = {}
+    if os.path.isfile(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+    regressoes = compara(resultados, baseline)
+    imprime(resultados)
+    divergencias = compara_backends(resultados) if paridade else []
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(resultados, file, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        baseline.update({chave(r): r for r in resultados if r['status'] == 'ok'})
+        with open(args.baseline, 'w', encoding='utf-8') as file:
+            json.dump(baseline, file, ensure_ascii=False, indent=2)
+
+    if divergencias:
+        print('\nSaídas diferentes entre os backends:')
+        for divergencia in divergencias:
+            print(f'  {divergencia}')
+    if regressoes:
+        print('\nRegressões em relação à referência:')
+        for regressao in regressoes:
+            print(f'  {regressao}')
+    return 1 if regressoes or divergencias else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
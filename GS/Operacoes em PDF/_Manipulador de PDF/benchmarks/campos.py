@@ -0,0 +1,124 @@
+"""
+Micro-benchmark dos extratores de campos (ver configs/utils/campos_functions.py) contra os trechos que
+eles substituem: a limpeza de dígitos com `''.join(... if char.isnumeric())`, a busca da empresa da
+opção 12 com laços de índice e a busca linha a linha com `re.search`.
+
+Antes de medir, executa os casos conhecidos dos extratores (ver confere_campos.py) e confere que os dois
+lados dão o mesmo resultado.
+
+Uso, a partir da pasta do Manipulador:
+    python benchmarks/campos.py
+    python benchmarks/campos.py --pages 5000 --repeat 10
+"""
+from typing import Callable, List
+import argparse
+import random
+import timeit
+import sys
+import os
+import re
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(PASTA))
+
+from configs.utils.campos_functions import Campos, cpf_valido, digitos
+from configs.utils.functions.f12 import f12_chave
+from confere_campos import confere
+from corpus import LOTACOES, NOMES, _cnpj
+
+
+def _cpf(n: int) -> str:
+    """
+    Gera um CPF válido e formatado.
+    """
+    base = [int(char) for char in f'{n % 10**9:09}']
+    for tamanho in (9, 10):
+        base.append(sum(valor * peso for valor, peso in zip(base, range(tamanho + 1, 1, -1))) * 10 % 11 % 10)
+    numero = ''.join(map(str, base))
+    return f'{numero[:3]}.{numero[3:6]}.{numero[6:9]}-{numero[9:]}'
+
+
+def pagina(g: int) -> List[str]:
+    """
+    Página de recibo com matrícula, CPF, competência, empresa e valores, como nas opções de folha.
+    """
+    rows = [f'Empresa: {LOTACOES[g % len(LOTACOES)]} {g} - {_cnpj(g)} Pág',
+            f'Matrícula: {g:06} Nome: {NOMES[g % len(NOMES)]}',
+            f'CPF: {_cpf(g * 7919 + 1)} Competência: {g % 12 + 1:02}/2024']
+    aleatorio = random.Random(g)
+    for i in range(30):
+        rows.append(f'{i:03} Verba {i} {aleatorio.randint(0, 99999) / 100:,.2f}'.replace(',', '_')
+                    .replace('.', ',').replace('_', '.'))
+    return rows
+
+
+def _digitos_antigo(texto: str) -> str:
+    return ''.join(char for char in texto if char.isnumeric())
+
+
+def _f12_chave_antiga(rows: list):
+    for row in rows:
+        if 'Empresa: ' in row:
+            idx = 1
+            while not row[-idx].isnumeric():
+                idx += 1
+            row = row[8:1 - idx].split()
+            cnpj = ''.join(i for i in row[-1] if i.isnumeric())
+            idx = 0
+            while row[idx] != '-':
+                idx += 1
+            return ' '.join(row[:idx]), cnpj
+
+
+def _linha_a_linha(rows: List[str]) -> dict:
+    """
+    Busca por linha, com os padrões repetidos em cada chamada, como nos scripts avulsos.
+    """
+    encontrados = {'matricula': [], 'cpf': [], 'competencia': [], 'valor': []}
+    for row in rows:
+        match = re.search(r'Matr[íi]cula\s*:?\s*(\d+)', row, re.IGNORECASE)
+        if match:
+            encontrados['matricula'].append(match.group(1))
+        for cpf in re.findall(r'(?<!\d)\d{3}\.?\d{3}\.?\d{3}-?\d{2}(?!\d)', row):
+            if cpf_valido(_digitos_antigo(cpf)):
+                encontrados['cpf'].append(_digitos_antigo(cpf))
+        match = re.search(r'(?<![\d/])(0[1-9]|1[0-2])/(\d{4})(?!\d)', row)
+        if match:
+            encontrados['competencia'].append(f'{match.group(1)}/{match.group(2)}')
+        for valor in re.findall(r'(?<![\d.,])-?(?:\d{1,3}(?:\.\d{3})+|\d+),\d{2}(?!\d)', row):
+            encontrados['valor'].append(float(valor.replace('.', '').replace(',', '.')))
+    return encontrados
+
+
+def mede(nome: str, antigo: Callable[[], object], novo: Callable[[], object], repeat: int) -> None:
+    assert antigo() == novo(), f'{nome}: resultados diferentes'
+    t_antigo = min(timeit.repeat(antigo, number=1, repeat=repeat))
+    t_novo = min(timeit.repeat(novo, number=1, repeat=repeat))
+    print(f'{nome:<28} {t_antigo * 1000:>9.1f} ms {t_novo * 1000:>9.1f} ms {t_antigo / t_novo:>7.2f}x')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=2000, help='Páginas sintéticas (padrão: 2000).')
+    parser.add_argument('--repeat', type=int, default=5, help='Repetições de cada medida (vale a menor).')
+    args = parser.parse_args()
+
+    falhas = confere()
+    if falhas:
+        sys.exit('Casos dos extratores que mudaram (ver confere_campos.py):\n' + '\n'.join(falhas))
+    paginas = [pagina(g) for g in range(args.pages)]
+    linhas = [row for rows in paginas for row in rows]
+    campos = Campos('matricula', 'cpf', 'competencia', 'valor')
+
+    print(f'{args.pages} páginas, {len(linhas)} linhas')
+    print(f'{"":<28} {"antes":>12} {"depois":>12} {"ganho":>8}')
+    mede('dígitos', lambda: [_digitos_antigo(row) for row in linhas],
+         lambda: [digitos(row) for row in linhas], args.repeat)
+    mede('empresa (opção 12)', lambda: [_f12_chave_antiga(rows) for rows in paginas],
+         lambda: [f12_chave(rows) for rows in paginas], args.repeat)
+    mede('campos da página', lambda: [_linha_a_linha(rows) for rows in paginas],
+         lambda: [campos(rows) for rows in paginas], args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Casos conhecidos dos extratores de campos (ver configs/utils/campos_functions.py), da chave da opção 12 e
+dos nomes das regras da admissão (ver configs/utils/regra_functions.py), sem medir tempo. Lista os casos
+que mudaram e termina com código 1 se houver algum. Também é executado por campos.py antes das medidas.
+
+Uso, a partir da pasta do Manipulador:
+    python benchmarks/confere_campos.py
+"""
+from typing import Any, Callable, List, Tuple
+import sys
+import os
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(PASTA))
+
+from configs.utils.campos_functions import (cnpj, cnpj_valido, cnpjs, competencia, converte, cpf_valido, cpfs,
+                                            digitos, matricula, valores)
+from configs.utils.functions.f12 import f12_chave
+from configs.utils.group_functions import CONTINUA
+from configs.utils.regra_functions import ADMISSAO, extrai
+
+
+def nome_admissao(titulo: str, rows: List[str]) -> str | None:
+    """
+    Nome extraído pela regra da admissão com o título `titulo`.
+    """
+    regra = next(regra for regra in ADMISSAO if regra.titulo == titulo)
+    return extrai(regra.nome, rows)
+
+
+# Cada caso: a descrição, o cálculo e o resultado esperado.
+CASOS: List[Tuple[str, Callable[[], Any], Any]] = [
+    # Dígitos verificadores.
+    ('CPF válido', lambda: cpf_valido('52998224725'), True),
+    ('CPF com dígito errado', lambda: cpf_valido('52998224724'), False),
+    ('CPF com dígitos iguais', lambda: cpf_valido('11111111111'), False),
+    ('CNPJ válido', lambda: cnpj_valido('11222333000181'), True),
+    ('CNPJ com dígito errado', lambda: cnpj_valido('11222333000182'), False),
+    ('CNPJ alfanumérico', lambda: cnpj_valido('12ABC34501DE35'), True),
+    ('CNPJ com zeros', lambda: cnpj_valido('00000000000000'), False),
+    # CPF.
+    ('CPFs com e sem pontuação', lambda: cpfs('CPF 529.982.247-25, RG 123.456.789-00 e 52998224725'),
+     ['52998224725', '52998224725']),
+    ('CPF sem validação', lambda: cpfs('RG 123.456.789-00', valida=False), ['12345678900']),
+    # CNPJ com e sem a máscara.
+    ('CNPJ com máscara', lambda: cnpj('CNPJ: 11.222.333/0001-81'), '11222333000181'),
+    ('CNPJ sem máscara', lambda: cnpj('CNPJ: 11222333000181'), '11222333000181'),
+    ('CNPJ com e sem máscara', lambda: cnpjs('11.222.333/0001-81 e 11222333000181'),
+     ['11222333000181', '11222333000181']),
+    ('CNPJ alfanumérico com máscara', lambda: cnpj('CNPJ 12.ABC.345/01DE-35'), '12ABC34501DE35'),
+    # Sem a máscara, as letras não são aceitas, para não confundir o CNPJ com palavras.
+    ('CNPJ alfanumérico sem máscara', lambda: cnpj('CNPJ 12ABC34501DE35'), None),
+    ('CNPJ com dígito errado', lambda: cnpj('11.222.333/0001-82'), None),
+    # Matrícula, competência e valores.
+    ('matrícula', lambda: matricula('Matrícula: 001234 Nome: ANA'), '001234'),
+    ('matrícula abreviada', lambda: matricula('MAT.: 77'), '77'),
+    ('competência depois de uma data', lambda: competencia('Emissão 15/01/2024 Competência 02/2024'), '02/2024'),
+    ('competência por extenso', lambda: competencia('Referente a Março de 2023'), '03/2023'),
+    ('valores', lambda: valores('Salário 1.234,56 Desconto -10,00 Horas 220'), [1234.56, -10.0]),
+    ('conversão de valor', lambda: converte('1.234.567,89'), 1234567.89),
+    ('dígitos', lambda: digitos('12.345.678/0001-90'), '12345678000190'),
+    # Chave da opção 12: a linha da empresa pode terminar no CNPJ, sem o 'Pág'.
+    ('empresa da opção 12', lambda: f12_chave(['Empresa: ACME  LTDA - 11.222.333/0001-81 Pág']),
+     ('ACME LTDA', '11222333000181')),
+    ('empresa terminada em dígito', lambda: f12_chave(['Empresa: ACME  LTDA - 11.222.333/0001-81']),
+     ('ACME LTDA', '11222333000181')),
+    ('empresa com número no nome', lambda: f12_chave(['Empresa: EMPRESA 7 - 11.222.333/0001-81']),
+     ('EMPRESA 7', '11222333000181')),
+    ('página sem a empresa', lambda: f12_chave(['Resumo Geral Mês/Período']), CONTINUA),
+    # Nomes das regras da admissão: sem a vírgula, o nome vai até o fim da linha.
+    ('TERMO LDPD', lambda: nome_admissao('TERMO LDPD', ['', '', '', f'{"Eu,":<35}ANA_SOUZA, portador']),
+     'ANASOUZA'),
+    ('TERMO LDPD sem vírgula', lambda: nome_admissao('TERMO LDPD', ['', '', '', f'{"Eu,":<35}ANA SOUZA']),
+     'ANA SOUZA'),
+    ('TERMO LDPD curto', lambda: nome_admissao('TERMO LDPD', ['', '', '', 'Eu, ANA SOUZA']), None),
+    ('CTPS DIGITAL', lambda: nome_admissao('CTPS DIGITAL', ['', '', '', 'Eu  ANA   SOUZA, portador']),
+     'ANA SOUZA'),
+    ('CTPS DIGITAL sem vírgula', lambda: nome_admissao('CTPS DIGITAL', ['', '', '', 'Eu ANA SOUZA']),
+     'ANA SOUZA'),
+]
+
+
+def confere() -> List[str]:
+    """
+    Executa os casos e retorna as descrições dos que não deram o resultado esperado.
+    """
+    falhas = []
+    for descricao, calculo, esperado in CASOS:
+        try:
+            obtido = calculo()
+        except Exception as erro:
+            obtido = erro
+        if obtido != esperado:
+            falhas.append(f'{descricao}: esperado {esperado!r}, obtido {obtido!r}')
+    return falhas
+
+
+def main() -> int:
+    falhas = confere()
+    for falha in falhas:
+        print(falha)
+    print(f'{len(CASOS) - len(falhas)} de {len(CASOS)} casos conferidos.')
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,278 @@
+"""
+Gerador de PDFs sintéticos com os layouts esperados por cada opção do Manipulador (f01 a f22).
+
+Os PDFs são escritos diretamente (fonte Helvetica, uma linha de texto por linha da página),
+sem dependências além da biblioteca padrão, e o texto extraído pelo PyPDF2 reproduz as linhas
+que cada função procura.
+"""
+from typing import Callable, Dict, List, Tuple
+import random
+import os
+
+# Linhas de preenchimento adicionadas ao corpo das páginas, para simular páginas densas.
+LINHAS_CORPO: int = 40
+# Tamanho, em bytes, de uma imagem (logotipo) incluída nos recursos de todas as páginas sem ser desenhada,
+# como nas exportações que apontam todas as páginas para os recursos do relatório inteiro.
+TAMANHO_RECURSOS: int = 32 * 1024
+
+NOMES = ['ANA SOUZA', 'BRUNO LIMA', 'CARLA DIAS', 'DANIEL ROCHA', 'EDUARDA MELO', 'FABIO NUNES',
+         'GABRIELA REIS', 'HUGO PIRES', 'ISABELA COSTA', 'JOAO ALVES', 'KARINA LOPES', 'LUCAS MOURA']
+LOTACOES = ['CONDOMINIO ALFA', 'CONDOMINIO BETA', 'EDIFICIO GAMA', 'RESIDENCIAL DELTA', 'SHOPPING EPSILON']
+
+Pagina = List[str]
+Arquivo = Tuple[str, List[Pagina]]
+
+
+def _escapa(texto: str) -> str:
+    return texto.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def escreve_pdf(path: str, paginas: List[Pagina]) -> None:
+    """
+    Escreve um PDF com uma página para cada lista de linhas.
+    """
+    logo = random.Random(TAMANHO_RECURSOS).randbytes(TAMANHO_RECURSOS)
+    objetos: List[bytes] = [b'<< /Type /Catalog /Pages 2 0 R >>', b'',
+                            b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+                            b'<< /Type /XObject /Subtype /Image /Width 128 /Height %d /ColorSpace /DeviceGray '
+                            b'/BitsPerComponent 8 /Length %d >>\nstream\n' % (len(logo) // 128, len(logo))
+                            + logo + b'\nendstream']
+    kids = []
+    for linhas in paginas:
+        # T* (próxima linha) apenas entre as linhas, para que a última linha extraída não fique vazia.
+        conteudo = 'BT /F1 8 Tf 10 TL 20 820 Td ' + ' T* '.join(f'({_escapa(linha)}) Tj' for linha in linhas) + ' ET'
+        conteudo = conteudo.encode('cp1252', errors='replace')
+        objetos.append(b'<< /Length %d >>\nstream\n' % len(conteudo) + conteudo + b'\nendstream')
+        objetos.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+                       b'/Resources << /Font << /F1 3 0 R >> /XObject << /Logo 4 0 R >> >> /Contents %d 0 R >>'
+                       % len(objetos))
+        kids.append(len(objetos))
+    objetos[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (b' '.join(b'%d 0 R' % k for k in kids), len(kids))
+
+    # As partes são juntadas só no final: concatenar os bytes a cada objeto fica quadrático nos corpus grandes.
+    partes = [b'%PDF-1.4\n']
+    offsets = []
+    tamanho = len(partes[0])
+    for i, objeto in enumerate(objetos, start=1):
+        offsets.append(tamanho)
+        partes.append(b'%d 0 obj\n' % i + objeto + b'\nendobj\n')
+        tamanho += len(partes[-1])
+    partes.append(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objetos) + 1))
+    partes.extend(b'%010d 00000 n \n' % offset for offset in offsets)
+    partes.append(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objetos) + 1, tamanho))
+    with open(path, 'wb') as file:
+        file.write(b''.join(partes))
+
+
+def _corpo(n: int = LINHAS_CORPO) -> Pagina:
+    return [f'{i:03} PROVENTO {random.randint(1, 999)} {random.randint(100, 9999)},{random.randint(10, 99)}'
+            for i in range(n)]
+
+
+def _cpf() -> str:
+    d = [random.randint(0, 9) for _ in range(11)]
+    return f'{d[0]}{d[1]}{d[2]}.{d[3]}{d[4]}{d[5]}.{d[6]}{d[7]}{d[8]}-{d[9]}{d[10]}'
+
+
+def _cnpj(i: int) -> str:
+    return f'{10 + i % 89:02}.{123 + i % 800:03}.{456:03}/0001-{10 + i % 89:02}'
+
+
+def _sequencial(n_pags: int, por_grupo: int, pagina: Callable[[int, int], Pagina]) -> List[Arquivo]:
+    """
+    Um único arquivo em que as páginas são agrupadas em sequência (grupo = i // por_grupo).
+    """
+    return [('entrada.pdf', [pagina(i // por_grupo, i) for i in range(n_pags)])]
+
+
+def _um_por_arquivo(n_pags: int, pagina: Callable[[int], Pagina]) -> List[Arquivo]:
+    return [(f'doc{i:05}.pdf', [pagina(i)]) for i in range(n_pags)]
+
+
+def f01(n_pags: int) -> List[Arquivo]:
+    def pagina(g: int, i: int) -> Pagina:
+        nome = NOMES[g % len(NOMES)] + f' {g}'
+        if i % 2 == 0:
+            return ['DECLARAÇÃO DE DEPENDENTES PARA FINS DE IMPOSTO DE RENDA', 'Declarante', nome] + _corpo()
+        return ['AUTODECLARAÇÃO ÉTNICO-RACIAL'] + [f'campo {k}' for k in range(12)] + [nome] + _corpo()
+    return _sequencial(n_pags, 4, pagina)
+
+
+def f02(n_pags: int) -> List[Arquivo]:
+    def pagina(g: int, i: int) -> Pagina:
+        return (['TERMO DE QUITAÇÃO DE RESCISÃO DO CONTRATO DE TRABALHO'] + [f'campo {k}' for k in range(7)] +
+                [NOMES[g % len(NOMES)] + f' {g}', 'CPF', f'{g:03}.456.789-09 Admissão'] + _corpo())
+    return _sequencial(n_pags, 2, pagina)
+
+
+def f03(n_pags: int) -> List[Arquivo]:
+    return _um_por_arquivo(n_pags, lambda i: ['BOLETO BMP'] + _corpo(20) +
+                           [f'{NOMES[i % len(NOMES)]} {i} - CPF/CNPJ: {_cpf()}', 'Autenticação mecânica'])
+
+
+def f04(n_pags: int) -> List[Arquivo]:
+    def pagina(g: int, i: int) -> Pagina:
+        return (['Boleto de Cobrança'] + _corpo(10) +
+                [f'UF:CEP:Data Vencimento: {LOTACOES[g % len(LOTACOES)]} {g}', _cnpj(g)] + _corpo(20))
+    return _sequencial(n_pags, 1, pagina)
+
+
+def f05(n_pags: int) -> List[Arquivo]:
+    def pagina(g: int, i: int) -> Pagina:
+        return ['FICHA DE REGISTRO', f'{NOMES[g % len(NOMES)]} {g}Dados Pessoais'] + _corpo()
+    return _sequencial(n_pags, 1, pagina)
+
+
+def f06(n_pags: int) -> List[Arquivo]:
+    def pagina(g: int, i: int) -> Pagina:
+        return (['Folha de Pagamento Mensal', 'Empresa', 'Competência', 'Emissão', 'Página',
+                 f'{g:03} {LOTACOES[g % len(LOTACOES)]} {g}'] + _corpo())
+    return _sequencial(n_pags, 20, pagina)
+
+
+def f07(n_pags: int) -> List[Arquivo]:
+    def pagina(g: int, i: int) -> Pagina:
+        return ['RE - Relação de Empregados'] + [f'campo {k}' for k in range(9)] + \
+            [f'FGTS Tomador: {_cnpj(g % 50)}'] + _corpo()
+    return _sequencial(n_pags, 1, pagina)
+
+
+def f08(n_pags: int) -> List[Arquivo]:
+    def pagina(g: int, i: int) -> Pagina:
+        return (['Listagem de Conferência'] + [f'cabeçalho {k}' for k in range(5)] +
+                [f'{LOTACOES[g % len(LOTACOES)]} {g}'] + _corpo())
+    return _sequencial(n_pags, 15, pagina)
+
+
+def f09(n_pags: int) -> List[Arquivo]:
+    def pagina(g: int, i: int) -> Pagina:
+        return (['Recibo de Pagamento'] + [f'cabeçalho {k}' for k in range(4)] + [f'CNPJ: {_cnpj(g)}'] +
+                ['Competência', 'Empresa', 'Endereço', f'{LOTACOES[g % len(LOTACOES)]} {g} 0001', 'Funcionário',
+                 f'{NOMES[i % len(NOMES)]} {i}'] + _corpo())
+    return _sequencial(n_pags, 10, pagina)
+
+
+def f10(n_pags: int) -> List[Arquivo]:
+    def pagina(g: int, i: int) -> Pagina:
+        return ['RECIBO FOLK', f'{i:05}.{NOMES[i % len(NOMES)]} {i}'] + _corpo()
+    return _sequencial(n_pags, 1, pagina)
+
+
+def f11(n_pags: int) -> List[Arquivo]:
+    def pagina(g: int, i: int) -> Pagina:
+        return [f'{LOTACOES[g % len(LOTACOES)]} {i}' + ' Relatório de Serviços Administrativos'[:37].ljust(37)] + \
+            _corpo()
+    return _sequencial(n_pags, 1, pagina)
+
+
+def f12(n_pags: int) -> List[Arquivo]:
+    def pagina(g: int, i: int) -> Pagina:
+        return ['Resumo Geral Mês/Período', f'Empresa: EMPRESA {g} - {_cnpj(g)} Pág'] + _corpo()
+    return _sequencial(n_pags, 25, pagina)
+
+
+def f13(n_pags: int) -> List[Arquivo]:
+    return _um_por_arquivo(n_pags, lambda i: [
+        'Dados do Prestador de Serviços', 'NFS-e', f'{i}', 'Razão Social/Nome', 'PRESTADORA LTDA', 'x',
+        _cnpj(0), 'Razão Social/Nome', f'{LOTACOES[i % len(LOTACOES)]} {i}', 'x', _cnpj(i)] + _corpo(20))
+
+
+def f14(n_pags: int) -> List[Arquivo]:
+    def pagina(g: int, i: int) -> Pagina:
+        return ['EMPRESA MODELO LTDA', f'{NOMES[i % len(NOMES)]} {i}DEMONSTRATIVO DE FÉRIAS'] + _corpo()
+    return _sequencial(n_pags, 1, pagina)
+
+
+def f15(n_pags: int) -> List[Arquivo]:
+    return _um_por_arquivo(n_pags, lambda i: ['NFS-e Eusébio'] + _corpo(20) + [
+        f'Endereço{LOTACOES[i % len(LOTACOES)]} {i}', 'Rua X', f'{_cnpj(i)} Inscrição'])
+
+
+def f16(n_pags: int) -> List[Arquivo]:
+    def pagina(g: int, i: int) -> Pagina:
+        return (['Prezados, ' if i % 2 == 0 else 'Continuação'] + [f'{LOTACOES[g % len(LOTACOES)]} {g}'] +
+                _corpo())
+    return _sequencial(n_pags, 2, pagina)
+
+
+def f17(n_pags: int) -> List[Arquivo]:
+    def pagina(g: int, i: int) -> Pagina:
+        return (['Comprovante de Rendimentos', f'Beneficiario CPF {_cpf()} Nome Completo {NOMES[g % len(NOMES)]} '
+                 f'{g} Fim'] + _corpo())
+    return _sequencial(n_pags, 2, pagina)
+
+
+def f18(n_pags: int) -> List[Arquivo]:
+    def pagina(g: int, i: int) -> Pagina:
+        if i % 2 == 1:
+            return ['Continuação'] + _corpo()
+        return (['MINISTÉRIO DA FAZENDA', 'Secretaria da Receita Federal', 'Comprovante', 'Ano-calendário',
+                 'Fonte Pagadora', 'Nome Empresarial', 'CNPJ', _cnpj(g % 20),
+                 f'CPF Título de Eleitor {_cpf()}', 'Nome Completo', f'{NOMES[g % len(NOMES)]} {g}'] + _corpo())
+    return _sequencial(n_pags, 2, pagina)
+
+
+def f19(n_pags: int) -> List[Arquivo]:
+    def pagina(g: int, i: int) -> Pagina:
+        rows = ['Relatório de Planos', f'Empresa: EMPRESA {g % 5}', 'Competência', 'Operador: UNIMED',
+                'Cabeçalho', 'Colunas', f'{LOTACOES[g % len(LOTACOES)]}']
+        for k in range(6):
+            rows += [f'150,00 120,00 {k:03} {NOMES[(i + k) % len(NOMES)]} 01/01 X',
+                     f'150,00 120,00 PL - PLANO {["OURO", "PRATA"][k % 2]} A B',
+                     f'D DEPENDENTE {k} {i} 50,00 40,00 x y z']
+        return rows + ['100,00 Total Geral']
+    return _sequencial(n_pags, 1, pagina)
+
+
+def f20(n_pags: int) -> List[Arquivo]:
+    def pagina(g: int, i: int) -> Pagina:
+        return (['Folha por Centro de Custo', f'Filial: 01 C Custo: {g:06} Descricao: CENTRO {g}'] +
+                _corpo())
+    return _sequencial(n_pags, 20, pagina)
+
+
+def f21(n_pags: int) -> List[Arquivo]:
+    def pagina(g: int, i: int) -> Pagina:
+        # O CNPJ vai para o nome do arquivo, então aparece apenas com dígitos.
+        cnpj = ''.join(c for c in _cnpj(g) if c.isdigit())
+        return ['RECIBO DE PAGAMENTO', f'Empresa: EMPRESA {g} CNPJ: {cnpj}',
+                f'a b c d e CENTRO {g} z', f'Func Mat: {i:06} a b {NOMES[i % len(NOMES)]} {i} x y z'] + _corpo()
+    return _sequencial(n_pags, 10, pagina)
+
+
+def f22(n_pags: int) -> List[Arquivo]:
+    def pagina(g: int, i: int) -> Pagina:
+        rows = ['Recibos por Contrato', f'Competência {i}']
+        if i % 3 == 1:
+            # Total do último empregado da página anterior.
+            rows.append(f' {random.randint(1000, 9999)},{random.randint(10, 99)} 0,00')
+        for k in range(4):
+            e = 4 * i + k
+            if k == 0:
+                rows.append(f'CONTRATO {g}')
+            rows += [f'{e:05} {NOMES[e % len(NOMES)]} {_cpf()}', 'Total', 'Salário Base 1.000,00', 'Adicional 200,00']
+            if i % 3 != 0 or k < 3:
+                rows.append(f' {random.randint(1000, 9999)},{random.randint(10, 99)} 0,00')
+        return rows + _corpo(10)
+    return _sequencial(n_pags, 5, pagina)
+
+
+# Geradores de cada opção: recebem o total de páginas e retornam os arquivos (nome, páginas).
+LAYOUTS: Dict[str, Callable[[int], List[Arquivo]]] = {
+    name: func for name, func in globals().items() if name.startswith('f') and name[1:].isdigit()
+}
+
+
+def gera(option: str, n_pags: int, diretorio: str, seed: int = 0) -> int:
+    """
+    Gera no diretório os arquivos de entrada da opção com `n_pags` páginas no total.
+    Returns:
+        (int): O tamanho total dos arquivos gerados, em bytes.
+    """
+    random.seed(seed)
+    total = 0
+    for nome, paginas in LAYOUTS[option](n_pags):
+        path = os.path.join(diretorio, nome)
+        escreve_pdf(path, paginas)
+        total += os.path.getsize(path)
+    return total
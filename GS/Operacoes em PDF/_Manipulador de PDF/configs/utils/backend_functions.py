@@ -0,0 +1,442 @@
+from . import memoria_functions, otimiza_functions
+from PyPDF2 import PdfReader, PdfWriter, PageObject
+from PyPDF2.generic import DictionaryObject, IndirectObject, NameObject
+from collections.abc import Sequence
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Tuple
+import weakref
+import PyPDF2
+import sys
+import os
+
+# Bibliotecas que podem abrir os PDFs, extrair o texto e copiar as páginas para os arquivos de saída.
+BACKENDS: Tuple[str, ...] = ('pypdf2', 'pymupdf')
+# Com MANIPULADOR_BACKEND=pymupdf, usa o PyMuPDF (fitz), bem mais rápido que o PyPDF2, se estiver instalado.
+# O valor vem do ambiente para valer também nos processos do pool.
+BACKEND: str = os.environ.get('MANIPULADOR_BACKEND', 'pypdf2')
+
+
+class _CabecalhoCompleto(Exception):
+    """
+    Interrompe a extração de texto assim que as linhas do cabeçalho foram lidas.
+    """
+
+
+# Se o PdfReader ainda usa os métodos privados que o LeitorPyPDF2 substitui (ver requirements.txt).
+_SOB_DEMANDA: bool = hasattr(PdfReader, '_get_page') and hasattr(PdfReader, '_get_num_pages')
+_avisado: bool = False
+
+
+def _avisa_versao() -> None:
+    global _avisado
+    if not _avisado:
+        _avisado = True
+        print(f'Aviso: PyPDF2 {PyPDF2.__version__} não tem os membros usados para ler as páginas sob demanda;'
+              ' as páginas serão guardadas em memória pelo PdfReader.', file=sys.stderr)
+
+
+class LeitorPyPDF2(PdfReader):
+    """
+    PdfReader que monta cada página apenas quando ela é pedida, sem guardá-la. O PdfReader guarda todas as
+    páginas do documento na primeira vez que `pages` é usado, além de cada objeto lido do arquivo (conteúdo das
+    páginas, fontes...), de modo que a memória cresce com o tamanho do documento. Aqui, a árvore de páginas é
+    percorrida uma vez, guardando só a referência de cada página, e os objetos lidos são descartados quando
+    passam de `LIMITE_OBJETOS` (são relidos do arquivo se forem usados de novo).
+
+    A página montada por último é mantida, para que pedidos seguidos da mesma página retornem o mesmo objeto.
+
+    Isso substitui membros privados do PdfReader (`_get_page`, `_get_num_pages` e `resolved_objects`),
+    conferidos com a versão fixada em requirements.txt. Se a versão instalada não os tiver, o leitor
+    funciona como o PdfReader comum, que guarda as páginas e os objetos lidos.
+    """
+    # Quantidade de objetos lidos do arquivo mantidos em memória.
+    LIMITE_OBJETOS: int = 5000
+    # Atributos que as páginas herdam dos nós da árvore de páginas.
+    HERDADOS = (NameObject('/Resources'), NameObject('/MediaBox'), NameObject('/CropBox'), NameObject('/Rotate'))
+    # Falso enquanto o PdfReader lê o arquivo, e se a versão do PyPDF2 não tiver os membros substituídos.
+    _sob_demanda: bool = False
+
+    def __init__(self, stream: str | BinaryIO):
+        # Referência de cada página e os atributos herdados por ela, na ordem do documento.
+        self._referencias: List[Tuple[IndirectObject | DictionaryObject, Dict[str, Any]]] | None = None
+        self._ultima: Tuple[int, PageObject] | None = None
+        # Arquivo aberto pelo próprio leitor (ver `BackendPyPDF2.abre`).
+        self.arquivo: BinaryIO | None = None
+        super().__init__(stream)
+        self._sob_demanda = _SOB_DEMANDA and isinstance(getattr(self, 'resolved_objects', None), dict)
+        if not self._sob_demanda:
+            _avisa_versao()
+        _leitores.add(self)
+
+    def _percorre(self) -> None:
+        # Mesma ordem e mesma herança do PdfReader._flatten, em que os atributos de um nó continuam valendo
+        # para os nós seguintes.
+        self._referencias = []
+        herdados: Dict[str, Any] = {}
+        copia: Dict[str, Any] = {}
+        pilha = [iter([self.trailer['/Root'].get_object()['/Pages']])]
+        while pilha:
+            kid = next(pilha[-1], None)
+            if kid is None:
+                pilha.pop()
+                continue
+            no = kid.get_object()
+            if no.get('/Type', '/Pages') == '/Pages':
+                if any(attr in no for attr in self.HERDADOS):
+                    herdados.update({attr: no[attr] for attr in self.HERDADOS if attr in no})
+                    copia = dict(herdados)
+                pilha.append(iter(no['/Kids']))
+            elif no['/Type'] == '/Page':
+                if isinstance(kid, IndirectObject):
+                    # A página é lida de novo do arquivo quando for pedida.
+                    self.resolved_objects.pop((kid.generation, kid.idnum), None)
+                self._referencias.append((kid, copia))
+
+    def _get_num_pages(self) -> int:
+        if self.is_encrypted or not self._sob_demanda:
+            return super()._get_num_pages()
+        if self._referencias is None:
+            self._percorre()
+        return len(self._referencias)
+
+    def _get_page(self, page_number: int) -> PageObject:
+        if self.is_encrypted or not self._sob_demanda:
+            return super()._get_page(page_number)
+        if self._ultima is not None and self._ultima[0] == page_number:
+            return self._ultima[1]
+        if self._referencias is None:
+            self._percorre()
+        if len(self.resolved_objects) > self.LIMITE_OBJETOS:
+            self.libera()
+        referencia, herdados = self._referencias[page_number]
+        page = PageObject(self, referencia if isinstance(referencia, IndirectObject) else None)
+        page.update(referencia.get_object())
+        for attr, valor in herdados.items():
+            if attr not in page:
+                page[attr] = valor
+        self._ultima = (page_number, page)
+        return page
+
+    def libera(self) -> None:
+        """
+        Descarta os objetos já lidos do arquivo, que continuam nas páginas que ainda estão em uso.
+        """
+        if self._sob_demanda:
+            self.resolved_objects.clear()
+
+    def fecha(self) -> None:
+        """
+        Fecha o arquivo, se foi aberto pelo leitor (ver `BackendPyPDF2.abre`).
+        """
+        if self.arquivo is not None:
+            self.arquivo.close()
+
+
+# Leitores abertos, cujos objetos são descartados quando o limite de memória é passado (ver memoria_functions).
+_leitores: 'weakref.WeakSet[LeitorPyPDF2]' = weakref.WeakSet()
+
+
+class BackendPyPDF2:
+    """
+    Abre, extrai e grava os PDFs com o PyPDF2. É o padrão, pois não depende de nada além do que o
+    Manipulador já usa.
+    """
+    nome: str = 'pypdf2'
+    # Sufixo da versão do extrator no cache de textos (ver cache_functions). Vazio para o PyPDF2, que
+    # já está na versão do extrator.
+    versao: str = ''
+
+    def abre(self, file: str | BinaryIO) -> LeitorPyPDF2:
+        if not isinstance(file, str) or not memoria_functions.LIMITE_MB:
+            return LeitorPyPDF2(file)
+        # Com o limite de memória, o arquivo é lido do disco à medida que as páginas são pedidas, em vez de
+        # carregado inteiro, e fica aberto até o fim da execução (ver `fecha`).
+        arquivo = open(file, 'rb')
+        leitor = LeitorPyPDF2(arquivo)
+        leitor.arquivo = arquivo
+        return leitor
+
+    def linhas(self, page: PageObject, n_linhas: int | None = None) -> List[str]:
+        """
+        Extrai o texto da página na forma de uma lista de linhas.
+
+        Com `n_linhas`, apenas as primeiras linhas são extraídas: a decodificação do texto é interrompida
+        assim que elas estão completas, o que evita processar o corpo das páginas densas. Se a página
+        terminar antes disso, o resultado é conferido com a extração da página inteira. Se a regra da
+        opção falhar nessas linhas, ela é repetida com a página inteira (ver quarentena_functions.aplica).
+        """
+        if n_linhas is None:
+            return page.extract_text().split('\n')
+
+        partes: List[str] = []
+        n_quebras = 0
+
+        def visitor_text(text: str, cm, tm, font_dict, font_size) -> None:
+            nonlocal n_quebras
+            partes.append(text)
+            n_quebras += text.count('\n')
+
+        def visitor_operand(operator: bytes, operands, cm, tm) -> None:
+            # Quando a quebra da linha n_linhas aparece, as linhas anteriores já estão completas.
+            # A interrupção é feita aqui porque as exceções do visitor_text são ignoradas pelo PyPDF2.
+            if n_quebras >= n_linhas:
+                raise _CabecalhoCompleto()
+
+        try:
+            page.extract_text(visitor_text=visitor_text, visitor_operand_before=visitor_operand)
+        except _CabecalhoCompleto:
+            return ''.join(partes).split('\n')[:n_linhas]
+        # A página tem menos linhas que o cabeçalho, usa a extração completa.
+        return page.extract_text().split('\n')
+
+    def copia(self, pages: Iterable[PageObject]) -> PdfWriter:
+        """
+        Retorna um novo documento com as páginas, na ordem.
+        """
+        writer = PdfWriter()
+        for page in pages:
+            writer.add_page(page)
+        return writer
+
+    def otimiza(self, writer: PdfWriter) -> None:
+        otimiza_functions.otimiza(writer)
+
+    def grava(self, writer: PdfWriter, output: BinaryIO) -> None:
+        writer.write(output)
+
+    def salva(self, writer: PdfWriter, path: str) -> None:
+        with open(path, 'wb') as output:
+            writer.write(output)
+
+
+def _pymupdf():
+    """
+    Importa o PyMuPDF, que nas versões antigas (como a usada pelo Manipulador - Tess) só existe como fitz.
+    """
+    try:
+        import pymupdf
+    except ImportError:
+        import fitz as pymupdf
+    return pymupdf
+
+
+class PaginaPyMuPDF:
+    """
+    Página de um documento aberto pelo PyMuPDF. Faz o papel do PageObject do PyPDF2: as funções apenas
+    extraem o seu texto e a repassam para a gravação, que copia a página do documento de origem.
+    """
+    __slots__ = ('documento', 'indice', '__weakref__')
+
+    def __init__(self, documento: 'DocumentoPyMuPDF', indice: int):
+        self.documento = documento
+        self.indice = indice
+
+    def extract_text(self) -> str:
+        # O PyMuPDF termina a última linha com uma quebra, que o PyPDF2 não inclui.
+        return self.documento.doc[self.indice].get_text().removesuffix('\n')
+
+
+class DocumentoPyMuPDF:
+    """
+    Documento aberto pelo PyMuPDF, com a lista `pages` como o PdfReader.
+    """
+
+    def __init__(self, file: str | BinaryIO):
+        pymupdf = _pymupdf()
+        # Aberto pelo caminho, o PyMuPDF lê apenas as partes do arquivo que usa.
+        path = file if isinstance(file, str) else getattr(file, 'name', None)
+        if isinstance(path, str) and os.path.isfile(path):
+            self.doc = pymupdf.open(path)
+        else:
+            self.doc = pymupdf.open(stream=file.read(), filetype='pdf')
+        self.pages = PaginasPyMuPDF(self)
+
+
+class PaginasPyMuPDF(Sequence):
+    """
+    Páginas de um documento do PyMuPDF, criadas quando são pedidas, como as do LeitorPyPDF2.
+    """
+
+    def __init__(self, documento: DocumentoPyMuPDF):
+        self.documento = documento
+
+    def __len__(self) -> int:
+        return self.documento.doc.page_count
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError('Índice de página fora do documento.')
+        return PaginaPyMuPDF(self.documento, indice)
+
+
+class SaidaPyMuPDF:
+    """
+    Documento de saída do PyMuPDF, com as opções usadas ao gravá-lo.
+    """
+
+    def __init__(self):
+        self.doc = _pymupdf().open()
+        self.opcoes: Dict = {}
+
+    @property
+    def pages(self):
+        return self.doc
+
+
+class BackendPyMuPDF:
+    """
+    Abre, extrai e grava os PDFs com o PyMuPDF, em que a extração de texto e a cópia das páginas
+    (`insert_pdf`) são feitas pelo MuPDF, em C. O texto extraído é o mesmo do PyPDF2 nos layouts do
+    Manipulador, o que é conferido por benchmarks/backends.py.
+    """
+    nome: str = 'pymupdf'
+
+    def __init__(self):
+        self.versao = f'-pymupdf-{_pymupdf().VersionBind}'
+
+    def abre(self, file: str | BinaryIO) -> DocumentoPyMuPDF:
+        return DocumentoPyMuPDF(file)
+
+    def linhas(self, page: PaginaPyMuPDF, n_linhas: int | None = None) -> List[str]:
+        """
+        Extrai o texto da página na forma de uma lista de linhas. Não há modo de cabeçalho: a página
+        inteira é sempre extraída e, com `n_linhas`, apenas cortada, então `n_linhas` não deixa a
+        extração mais rápida neste backend.
+        """
+        return page.extract_text().split('\n')[:n_linhas]
+
+    def copia(self, pages: Iterable[PaginaPyMuPDF]) -> SaidaPyMuPDF:
+        """
+        Retorna um novo documento com as páginas, na ordem. As páginas seguidas do mesmo documento
+        de origem são copiadas de uma vez.
+        """
+        saida = SaidaPyMuPDF()
+        for documento, inicio, fim in _intervalos(pages):
+            saida.doc.insert_pdf(documento.doc, from_page=inicio, to_page=fim)
+        return saida
+
+    def otimiza(self, saida: SaidaPyMuPDF) -> None:
+        # Ao gravar, o conteúdo das páginas é reescrito só com os recursos que usa (clean), os objetos
+        # que deixaram de ser referenciados são descartados (garbage) e os streams são compactados.
+        saida.opcoes = {'garbage': 3, 'deflate': True, 'clean': True}
+
+    def grava(self, saida: SaidaPyMuPDF, output: BinaryIO) -> None:
+        antes = self._tamanho(saida)
+        dados = saida.doc.tobytes(**saida.opcoes)
+        self._economia(antes, len(dados))
+        output.write(dados)
+
+    def salva(self, saida: SaidaPyMuPDF, path: str) -> None:
+        antes = self._tamanho(saida)
+        # Gravado pelo caminho, o arquivo é escrito pelo MuPDF, sem passar cada parte pelo Python.
+        saida.doc.save(path, **saida.opcoes)
+        self._economia(antes, os.path.getsize(path))
+
+    def _tamanho(self, saida: SaidaPyMuPDF) -> int | None:
+        """
+        Tamanho do documento sem a otimização, medido antes de gravar, pois o `clean` altera as páginas.
+        """
+        return len(saida.doc.tobytes()) if saida.opcoes else None
+
+    def _economia(self, antes: int | None, tamanho: int) -> None:
+        if antes is not None:
+            otimiza_functions.soma({'arquivos': 1, 'bytes_economizados': antes - tamanho})
+
+
+def _intervalos(pages: Iterable[PaginaPyMuPDF]) -> Iterator[Tuple[DocumentoPyMuPDF, int, int]]:
+    """
+    Agrupa as páginas seguidas do mesmo documento em intervalos (documento, primeira, última).
+    """
+    atual = None
+    for page in pages:
+        if atual is not None and page.documento is atual[0] and page.indice == atual[2] + 1:
+            atual[2] = page.indice
+            continue
+        if atual is not None:
+            yield tuple(atual)
+        atual = [page.documento, page.indice, page.indice]
+    if atual is not None:
+        yield tuple(atual)
+
+
+Backend = BackendPyPDF2 | BackendPyMuPDF
+Documento = LeitorPyPDF2 | DocumentoPyMuPDF
+Pagina = PageObject | PaginaPyMuPDF
+Saida = PdfWriter | SaidaPyMuPDF
+
+_backends: Dict[str, Backend] = {}
+
+
+def disponivel(nome: str) -> bool:
+    """
+    Indica se a biblioteca do backend está instalada.
+    """
+    if nome != 'pymupdf':
+        return nome in BACKENDS
+    try:
+        _pymupdf()
+    except ImportError:
+        return False
+    return True
+
+
+def ativa(nome: str) -> None:
+    """
+    Escolhe o backend das próximas execuções, inclusive nos processos do pool criados depois.
+    Raises:
+        ValueError: Se o backend não existe.
+    """
+    global BACKEND
+    if nome not in BACKENDS:
+        raise ValueError(f'Backend inválido: {nome} (use {", ".join(BACKENDS)})')
+    BACKEND = nome
+    os.environ['MANIPULADOR_BACKEND'] = nome
+
+
+def get_backend(nome: str | None = None) -> Backend:
+    """
+    Retorna o backend escolhido (ou o de nome `nome`). Se o PyMuPDF não estiver instalado, avisa e
+    usa o PyPDF2, para que a execução não pare.
+    """
+    nome = nome or BACKEND
+    if nome not in _backends:
+        if nome == 'pymupdf' and disponivel(nome):
+            _backends[nome] = BackendPyMuPDF()
+        elif nome == 'pymupdf':
+            print('PyMuPDF não instalado (pip install pymupdf), usando o PyPDF2.', file=sys.stderr)
+            _backends[nome] = get_backend('pypdf2')
+        else:
+            _backends[nome] = BackendPyPDF2()
+    return _backends[nome]
+
+
+def abre(file: str | BinaryIO) -> Documento:
+    """
+    Abre o PDF com o backend escolhido. Substitui o PdfReader nas funções: o documento tem a lista
+    `pages`, cujas páginas são entregues por `paginas` (ver extract_functions) e gravadas pelas
+    funções de sink_functions.
+    """
+    return get_backend().abre(file)
+
+
+@memoria_functions.registra
+def libera() -> None:
+    """
+    Descarta os objetos já lidos pelos leitores abertos e, se o PyMuPDF estiver em uso, esvazia o cache do MuPDF.
+    """
+    for leitor in list(_leitores):
+        leitor.libera()
+    if 'pymupdf' in _backends and isinstance(_backends['pymupdf'], BackendPyMuPDF):
+        _pymupdf().TOOLS.store_shrink(100)
+
+
+def fecha() -> None:
+    """
+    Fecha os arquivos abertos pelos leitores, no fim de uma execução, para que as entradas possam ser
+    movidas ou removidas.
+    """
+    for leitor in list(_leitores):
+        leitor.fecha()
@@ -0,0 +1,167 @@
+from PyPDF2 import __version__ as pypdf2_version
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Tuple
+import hashlib
+import sqlite3
+import json
+import time
+import os
+
+# Arquivo do cache de textos extraídos.
+CACHE_PATH: str = 'configs/cache/textos.db'
+# Tamanho máximo do texto guardado no cache, em bytes. Acima disso, os arquivos menos usados são removidos.
+LIMITE_BYTES: int = 512 * 1024 * 1024
+# Com MANIPULADOR_CACHE=0 o cache não é lido nem gravado.
+USAR_CACHE: bool = os.environ.get('MANIPULADOR_CACHE', '1') != '0'
+# Quantidade de páginas lidas do banco de cada vez ao percorrer as páginas guardadas de um arquivo.
+BLOCO_PAGINAS: int = 500
+# Versão do extrator. Deve ser alterada sempre que a forma de extrair o texto mudar,
+# para que textos extraídos por versões anteriores não sejam reaproveitados.
+VERSAO_EXTRATOR: str = f'PyPDF2-{pypdf2_version}-1'
+
+_cache: 'TextCache | None' = None
+# Hashes já calculados, por (caminho, tamanho, data de modificação).
+_hashes: Dict[Tuple[str, int, float], str] = {}
+
+
+def hash_arquivo(file: str) -> str:
+    """
+    Calcula o SHA-256 do conteúdo do arquivo. O resultado é memorizado enquanto o arquivo não mudar.
+    """
+    stat = os.stat(file)
+    chave = (os.path.abspath(file), stat.st_size, stat.st_mtime)
+    if chave not in _hashes:
+        sha = hashlib.sha256()
+        with open(file, 'rb') as file_b:
+            for bloco in iter(lambda: file_b.read(1024 * 1024), b''):
+                sha.update(bloco)
+        _hashes[chave] = sha.hexdigest()
+    return _hashes[chave]
+
+
+class Guardadas(Mapping):
+    """
+    Linhas das páginas guardadas de um arquivo, indexadas pelo número da página. Apenas os números são lidos
+    de início; as linhas são lidas do banco em blocos de `BLOCO_PAGINAS` páginas, à medida que são pedidas,
+    e só o último bloco fica em memória, para que um arquivo grande não seja carregado inteiro.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, hash_arq: str, versao: str):
+        self.conn = conn
+        self.hash_arq = hash_arq
+        self.versao = versao
+        self.indices = {pagina for (pagina,) in conn.execute(
+            'SELECT pagina FROM paginas WHERE hash = ? AND versao = ?', (hash_arq, versao))}
+        self._bloco: Dict[int, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __contains__(self, pagina) -> bool:
+        return pagina in self.indices
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(sorted(self.indices))
+
+    def __getitem__(self, pagina: int) -> List[str]:
+        if pagina not in self._bloco:
+            if pagina not in self.indices:
+                raise KeyError(pagina)
+            self._bloco = {i: json.loads(linhas) for i, linhas in self.conn.execute(
+                'SELECT pagina, linhas FROM paginas WHERE hash = ? AND versao = ? AND pagina >= ? AND pagina < ?',
+                (self.hash_arq, self.versao, pagina, pagina + BLOCO_PAGINAS))}
+        return self._bloco[pagina]
+
+
+class TextCache:
+    """
+    Cache em disco (SQLite) do texto extraído de cada página, indexado pelo hash do conteúdo do arquivo,
+    o índice da página e a versão do extrator. A remoção é feita por arquivo, do menos usado recentemente
+    para o mais usado, sempre que o tamanho total passa de `limite` bytes.
+    """
+
+    def __init__(self, path: str | None = None, limite: int = LIMITE_BYTES, versao: str = VERSAO_EXTRATOR):
+        # Sem `path`, vale o CACHE_PATH do momento da abertura, que a linha de comando troca pelo caminho absoluto.
+        if path is None:
+            path = CACHE_PATH
+        self.limite = limite
+        self.versao = versao
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # O timeout permite que execuções simultâneas (ex.: linha de comando) compartilhem o cache.
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS arquivos (
+                hash TEXT, versao TEXT, n_pags INTEGER, bytes INTEGER DEFAULT 0, acesso REAL,
+                PRIMARY KEY (hash, versao));
+            CREATE TABLE IF NOT EXISTS paginas (
+                hash TEXT, versao TEXT, pagina INTEGER, linhas TEXT,
+                PRIMARY KEY (hash, versao, pagina));
+        ''')
+        self.conn.commit()
+
+    def get(self, hash_arq: str, modo: str = '') -> Tuple[Mapping[int, List[str]], int | None]:
+        """
+        Retorna as linhas de cada página já guardada do arquivo (ver `Guardadas`) e o seu total de páginas,
+        se conhecido. O `modo` separa extrações parciais (ex.: só o cabeçalho) das extrações da página inteira.
+        """
+        versao = self.versao + modo
+        row = self.conn.execute('SELECT n_pags FROM arquivos WHERE hash = ? AND versao = ?',
+                                (hash_arq, versao)).fetchone()
+        if row is None:
+            return {}, None
+        self.conn.execute('UPDATE arquivos SET acesso = ? WHERE hash = ? AND versao = ?',
+                          (time.time(), hash_arq, versao))
+        return Guardadas(self.conn, hash_arq, versao), row[0]
+
+    def conta(self, hash_arq: str, modo: str = '') -> int:
+        """
+        Retorna quantas páginas do arquivo já estão guardadas.
+        """
+        return self.conn.execute('SELECT COUNT(*) FROM paginas WHERE hash = ? AND versao = ?',
+                                 (hash_arq, self.versao + modo)).fetchone()[0]
+
+    def put(self, hash_arq: str, n_pags: int, paginas: Dict[int, List[str]], modo: str = '') -> None:
+        """
+        Guarda as linhas das páginas do arquivo. As gravações só são confirmadas em `flush`.
+        """
+        versao = self.versao + modo
+        valores = [(hash_arq, versao, pagina, json.dumps(linhas, ensure_ascii=False))
+                   for pagina, linhas in paginas.items()]
+        self.conn.execute('INSERT OR IGNORE INTO arquivos (hash, versao, n_pags, acesso) VALUES (?, ?, ?, ?)',
+                          (hash_arq, versao, n_pags, time.time()))
+        self.conn.executemany('INSERT OR REPLACE INTO paginas VALUES (?, ?, ?, ?)', valores)
+        # O tamanho é recalculado das páginas guardadas, pois uma página guardada de novo substitui a anterior.
+        self.conn.execute('UPDATE arquivos SET bytes = (SELECT COALESCE(SUM(LENGTH(linhas)), 0) FROM paginas'
+                          ' WHERE hash = ?1 AND versao = ?2), acesso = ?3 WHERE hash = ?1 AND versao = ?2',
+                          (hash_arq, versao, time.time()))
+
+    def flush(self) -> None:
+        """
+        Confirma as gravações e remove os arquivos menos usados até o cache caber no limite.
+        """
+        total = self.conn.execute('SELECT COALESCE(SUM(bytes), 0) FROM arquivos').fetchone()[0]
+        if total > self.limite:
+            for hash_arq, versao, n_bytes in self.conn.execute(
+                    'SELECT hash, versao, bytes FROM arquivos ORDER BY acesso').fetchall():
+                if total <= self.limite:
+                    break
+                self.conn.execute('DELETE FROM paginas WHERE hash = ? AND versao = ?', (hash_arq, versao))
+                self.conn.execute('DELETE FROM arquivos WHERE hash = ? AND versao = ?', (hash_arq, versao))
+                total -= n_bytes
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.flush()
+        self.conn.close()
+
+
+def get_cache() -> TextCache | None:
+    """
+    Retorna o cache de textos, abrindo-o na primeira chamada. Retorna None se o cache estiver desativado.
+    """
+    global _cache
+    if not USAR_CACHE:
+        return None
+    if _cache is None:
+        _cache = TextCache()
+    return _cache
@@ -0,0 +1,238 @@
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence
+import re
+
+# Padrões compilados uma única vez, na importação, e usados por todas as opções. Os campos são procurados
+# no texto inteiro da página (as linhas unidas por '\n'), em vez de linha a linha.
+#
+# O `re` só pula direto para as posições possíveis quando o padrão começa por um caractere fixo, então a
+# matrícula e a competência começam pelo 'M' e pela '/' e deixam o que vem antes para um lookbehind. CPF,
+# CNPJ e valor não têm espaços, e são procurados apenas nas palavras do texto que podem contê-los. Como
+# um espaço não é dígito, ponto nem vírgula, as bordas de uma palavra valem como as bordas no texto, e o
+# resultado é o mesmo da busca no texto inteiro.
+
+# CPF, com ou sem pontuação: '123.456.789-09' ou '12345678909'.
+CPF = re.compile(r'(?<!\d)\d{3}\.?\d{3}\.?\d{3}-?\d{2}(?!\d)')
+# CNPJ numérico, com ou sem pontuação, ou alfanumérico (letras na raiz e na ordem), só com a pontuação,
+# para não confundir com palavras: '12.345.678/0001-90', '12345678000190' ou '12.ABC.345/01DE-35'.
+CNPJ = re.compile(r'(?<!\d)\d{2}\.?\d{3}\.?\d{3}/?\d{4}-?\d{2}(?!\d)'
+                  r'|(?<![0-9A-Z])[0-9A-Z]{2}\.[0-9A-Z]{3}\.[0-9A-Z]{3}/[0-9A-Z]{4}-\d{2}(?!\d)')
+# Número após 'Matrícula' ou 'Mat:', com a inicial ou tudo em maiúsculas (ex.: 'Matrícula: 001234',
+# 'MATRICULA 1234', 'Mat.: 1234').
+MATRICULA = re.compile(r'M(?<!\wM)(?:atr[íi]cula\s*:?|ATR[ÍI]CULA\s*:?|at\.?\s*:|AT\.?\s*:)\s*(\d+)')
+# Competência em mês/ano: '01/2024' (que não faça parte de uma data), 'Janeiro/2024' ou 'JANEIRO DE 2024'.
+COMPETENCIA = re.compile(r'/(?<=(?<![\d/])(0[1-9]|1[0-2])/)(\d{4})(?!\d)'
+                         r'|(?=[JjFfMmAaSsOoNnDd])(?<!\w)((?i:janeiro|fevereiro|mar[çc]o|abril|maio|junho|julho|agosto'
+                         r'|setembro|outubro|novembro|dezembro))\s*(?:/|[Dd][Ee])\s*(\d{4})(?!\d)')
+# Valor com vírgula decimal e, opcionalmente, ponto nos milhares: '1.234,56', '1234,56' ou '-0,50'.
+VALOR = re.compile(r'(?<![\d.,])-?(?:\d{1,3}(?:\.\d{3})+|\d+),\d{2}(?!\d)')
+
+# Linha que não começa com espaço e não é a linha "Total" (inclusive vazia).
+_OUTRA = r'''(?: \n (?: (?!Total(?:\n|\Z)) [^ \n] [^\n]* )? )'''
+# Primeira linha que começa com espaço: o seu primeiro valor é um total. Fica fora da ocorrência
+# (lookahead), pois pode ser também a linha da matrícula e do nome do empregado seguinte.
+_TOTAL = r'''(?= \n [ ] [^\S\n]* (?P<{}> \S+ ) )'''
+# Total de cada empregado nos recibos por contrato (opção 22 e script Recibos-Lucas), no texto da página
+# precedido de '\n' (ver planilha_functions.Extrator). Cada empregado aparece como a linha com a matrícula
+# e o nome, a linha "Total" e, na primeira linha seguinte que começa com espaço, o seu total. Grupos:
+#   anterior: total no topo da página, antes de qualquer empregado, que é o do último empregado da
+#             página anterior;
+#   empregado: nome do empregado, ou None se a linha da matrícula não tiver nome;
+#   total: total do empregado, ou None se ele estiver na página seguinte.
+RECIBO = re.compile(rf'''
+    # Total no topo da página: as linhas antes dele não começam com espaço.
+    \A {_OUTRA}*? {_TOTAL.format('anterior')}
+  |
+    # Linha da matrícula: a primeira palavra e, em seguida, o nome, que são as palavras só com letras.
+    \n [^\S\n]* \S+
+    (?: [^\S\n]+ (?P<empregado> [^\W\d_]+ (?: [^\S\n]+ [^\W\d_]+ )* ) (?!\S) )?
+    [^\n]*
+    \n Total (?=\n|\Z)
+    # O total, ou o fim da página, se ele estiver na página seguinte.
+    (?: {_OUTRA}*? {_TOTAL.format('total')} | {_OUTRA}* \Z )
+''', re.VERBOSE)
+
+MESES: Dict[str, str] = {mes: f'{i:02}' for i, mes in enumerate(
+    ['janeiro', 'fevereiro', 'março', 'abril', 'maio', 'junho', 'julho', 'agosto', 'setembro', 'outubro',
+     'novembro', 'dezembro'], start=1)}
+MESES['marco'] = MESES['março']
+
+# Pontuação retirada do CNPJ, que pode ter letras.
+_PONTUACAO_CNPJ = str.maketrans('', '', './-')
+# Pesos dos dígitos verificadores do CNPJ.
+_PESOS_CNPJ = (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)
+
+
+def digitos(texto: str) -> str:
+    """
+    Mantém apenas os dígitos do texto. Ex.: '12.345.678/0001-90' -> '12345678000190'.
+    Substitui o `''.join(char for char in texto if char.isnumeric())`, com o filtro feito em C (cerca de
+    20% mais rápido), e ignora também frações e numerais que não são dígitos (ex.: '½').
+    """
+    return ''.join(filter(str.isdigit, texto))
+
+
+def cpf_valido(numero: str) -> bool:
+    """
+    Confere os dígitos verificadores de um CPF só com dígitos. CPFs com todos os dígitos iguais são inválidos.
+    """
+    if len(numero) != 11 or not numero.isdigit() or numero == numero[0] * 11:
+        return False
+    valores = [int(char) for char in numero]
+    for n in (9, 10):
+        resto = sum(valor * peso for valor, peso in zip(valores, range(n + 1, 1, -1))) * 10 % 11
+        if resto % 10 != valores[n]:
+            return False
+    return True
+
+
+def cnpj_valido(numero: str) -> bool:
+    """
+    Confere os dígitos verificadores de um CNPJ sem pontuação, numérico ou alfanumérico (cada caractere
+    vale o seu código menos 48, ou seja, '0' a '9' valem 0 a 9 e 'A' vale 17).
+    """
+    if len(numero) != 14 or not numero[12:].isdigit() or numero == numero[0] * 14:
+        return False
+    valores = [ord(char) - 48 for char in numero]
+    if any(not 0 <= valor <= 42 for valor in valores[:12]):
+        return False
+    for n in (12, 13):
+        resto = sum(valor * peso for valor, peso in zip(valores, _PESOS_CNPJ[13 - n:])) % 11
+        if (0 if resto < 2 else 11 - resto) != valores[n]:
+            return False
+    return True
+
+
+def _cpfs(palavras: Iterable[str], valida: bool) -> Iterator[str]:
+    for palavra in palavras:
+        if len(palavra) < 11:
+            continue
+        for achado in CPF.findall(palavra):
+            numero = digitos(achado)
+            if not valida or cpf_valido(numero):
+                yield numero
+
+
+def _cnpjs(palavras: Iterable[str], valida: bool) -> Iterator[str]:
+    for palavra in palavras:
+        if len(palavra) < 14:
+            continue
+        for achado in CNPJ.findall(palavra):
+            numero = achado.translate(_PONTUACAO_CNPJ)
+            if not valida or cnpj_valido(numero):
+                yield numero
+
+
+def cpfs(texto: str, valida: bool = True) -> List[str]:
+    """
+    Retorna os CPFs do texto, só com os dígitos. Com `valida`, os que têm dígitos verificadores errados
+    (em geral, outros números com 11 dígitos) são ignorados.
+    """
+    return list(_cpfs(texto.split(), valida))
+
+
+def cpf(texto: str, valida: bool = True) -> str | None:
+    """
+    Retorna o primeiro CPF do texto (ver `cpfs`), ou None.
+    """
+    return next(_cpfs(texto.split(), valida), None)
+
+
+def cnpjs(texto: str, valida: bool = True) -> List[str]:
+    """
+    Retorna os CNPJs do texto, sem a pontuação. Com `valida`, os que têm dígitos verificadores errados
+    são ignorados.
+    """
+    return list(_cnpjs(texto.split(), valida))
+
+
+def cnpj(texto: str, valida: bool = True) -> str | None:
+    """
+    Retorna o primeiro CNPJ do texto (ver `cnpjs`), ou None.
+    """
+    return next(_cnpjs(texto.split(), valida), None)
+
+
+def matriculas(texto: str) -> List[str]:
+    return MATRICULA.findall(texto)
+
+
+def matricula(texto: str) -> str | None:
+    """
+    Retorna a primeira matrícula do texto, com os zeros à esquerda, ou None.
+    """
+    match = MATRICULA.search(texto)
+    return match.group(1) if match is not None else None
+
+
+def _competencia(match: re.Match) -> str:
+    mes, ano, mes_extenso, ano_extenso = match.groups()
+    if mes is not None:
+        return f'{mes}/{ano}'
+    return f'{MESES[mes_extenso.lower()]}/{ano_extenso}'
+
+
+def competencias(texto: str) -> List[str]:
+    return [_competencia(match) for match in COMPETENCIA.finditer(texto)]
+
+
+def competencia(texto: str) -> str | None:
+    """
+    Retorna a primeira competência do texto no formato 'MM/AAAA', ou None.
+    """
+    match = COMPETENCIA.search(texto)
+    return _competencia(match) if match is not None else None
+
+
+def converte(valor: str) -> float:
+    """
+    Converte um valor com vírgula decimal e ponto nos milhares em float. Ex.: '1.234,56' -> 1234.56.
+    """
+    return float(valor.replace('.', '').replace(',', '.'))
+
+
+def _valores(palavras: Iterable[str]) -> List[float]:
+    return [converte(valor) for palavra in palavras if ',' in palavra for valor in VALOR.findall(palavra)]
+
+
+def valores(texto: str) -> List[float]:
+    """
+    Retorna todos os valores do texto (ver `VALOR`), convertidos em float.
+    """
+    return _valores(texto.split())
+
+
+# Campos aceitos por `Campos`: o nome e a função que retorna todas as ocorrências, a partir do texto e das
+# suas palavras, separadas uma única vez para todos os campos.
+EXTRATORES: Dict[str, Callable[[str, List[str], bool], List]] = {
+    'cpf': lambda texto, palavras, valida: list(_cpfs(palavras, valida)),
+    'cnpj': lambda texto, palavras, valida: list(_cnpjs(palavras, valida)),
+    'matricula': lambda texto, palavras, valida: matriculas(texto),
+    'competencia': lambda texto, palavras, valida: competencias(texto),
+    'valor': lambda texto, palavras, valida: _valores(palavras),
+}
+
+
+class Campos:
+    """
+    Extrai de uma vez, do texto inteiro da página, todas as ocorrências de cada campo pedido (ver
+    `EXTRATORES`), na ordem em que aparecem. As linhas são unidas e separadas em palavras uma única vez,
+    e cada padrão percorre o texto uma vez, em vez de uma busca por linha.
+
+    Pode ser passado como parser de `paginas` (ver extract_functions), como o Extrator de
+    planilha_functions, para que a extração rode nos processos do pool. Ex.:
+        campos = Campos('cpf', 'competencia')
+        for page, encontrados in paginas(file, pdf, campos):
+            cpf = encontrados['cpf'][0] if encontrados['cpf'] else None
+    """
+
+    def __init__(self, *nomes: str, valida: bool = True):
+        desconhecidos = [nome for nome in nomes if nome not in EXTRATORES]
+        if desconhecidos:
+            raise ValueError(f'Campo desconhecido: {", ".join(desconhecidos)}')
+        self.nomes = nomes or tuple(EXTRATORES)
+        self.valida = valida
+
+    def __call__(self, rows: Sequence[str]) -> Dict[str, List]:
+        texto = '\n'.join(rows)
+        palavras = texto.split()
+        return {nome: EXTRATORES[nome](texto, palavras, self.valida) for nome in self.nomes}
@@ -0,0 +1,378 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .manifest_functions import Manifesto, executa as executa_manifesto, planeja
+from .pacote_functions import FORMATOS, compacta
+from . import backend_functions, memoria_functions, otimiza_functions, planilha_functions
+from .functions import OPCOES, carrega
+from .perfil_functions import FASES, inicia
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Dict, List
+import argparse
+import shutil
+import json
+import time
+import sys
+import os
+
+# Códigos de saída da linha de comando.
+EXIT_OK: int = 0
+EXIT_FALHA: int = 1
+EXIT_USO: int = 2
+# Nome do manifesto salvo na pasta de destino de cada execução planejada.
+MANIFESTO: str = 'manifesto.json'
+
+
+def cria_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='manipulador',
+        description='Executa as opções do Manipulador de PDFs sem interação com o usuário.')
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    run = subparsers.add_parser('run', help='Executa uma ou mais opções sobre uma ou mais pastas de entrada.')
+    run.add_argument('--option', '-o', type=int, action='append', required=True, dest='options',
+                     help='Número da opção do menu. Pode ser repetido.')
+    run.add_argument('--input', '-i', action='append', required=True, dest='inputs',
+                     help='Pasta com os arquivos de entrada. Pode ser repetido.')
+    run.add_argument('--output', '-d', required=True,
+                     help='Pasta de destino. Com mais de uma execução, cada uma usa uma subpasta.')
+    run.add_argument('--mode', '-m', default=None,
+                     help='Modo das opções que perguntam algo ao usuário (ex.: opção 9: funcionario ou lotacao).')
+    run.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                     help='Quantidade de execuções em paralelo.')
+    run.add_argument('--summary', '-s', default=None,
+                     help='Arquivo onde o resumo em JSON é salvo. Por padrão, é impresso na saída padrão.')
+    run.add_argument('--relatorio', action='store_true',
+                     help='Envia cada execução para o relatório de uso no Google Sheets.')
+    run.add_argument('--plan', action='store_true',
+                     help=f'Apenas classifica as páginas e salva o destino de cada uma em {MANIFESTO}, '
+                          'na pasta de destino, sem gravar os arquivos.')
+    run.add_argument('--parquet', action='store_true',
+                     help='Nas opções que extraem tabelas (ex.: 19), grava as planilhas também em Parquet. '
+                          'Precisa do pyarrow instalado.')
+    run.add_argument('--memoria', type=int, default=None, metavar='MB',
+                     help='Limite de memória de cada execução, em MB: os PDFs são lidos do disco aos poucos e as '
+                          'páginas que esperam gravação são despejadas em disco ao passar do limite. '
+                          'Por padrão, o de MANIPULADOR_MEMORIA ou nenhum.')
+    adiciona_saida(run)
+
+    execute = subparsers.add_parser('execute', help='Grava os arquivos planejados em um ou mais manifestos.')
+    execute.add_argument('manifestos', nargs='+', help=f'Arquivos {MANIFESTO} gerados com run --plan.')
+    execute.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                         help='Quantidade de processos gravando arquivos em paralelo.')
+    execute.add_argument('--nome', '-n', default=None,
+                         help='Refaz o nome dos arquivos a partir dos dados extraídos (ex.: "{cnpj}-{lotacao}.pdf").')
+    execute.add_argument('--summary', '-s', default=None,
+                         help='Arquivo onde o resumo em JSON é salvo. Por padrão, é impresso na saída padrão.')
+    adiciona_saida(execute)
+
+    watch = subparsers.add_parser('watch', help='Vigia pastas de entrada e processa os arquivos à medida que chegam.')
+    watch.add_argument('config', help='Arquivo JSON com as pastas vigiadas e a opção de cada uma.')
+    watch.add_argument('--jobs', '-j', type=int, default=None,
+                       help='Quantidade de lotes processados em paralelo. Por padrão, o da configuração ou 1.')
+    watch.add_argument('--once', action='store_true',
+                       help='Processa os arquivos já presentes e termina, em vez de continuar vigiando.')
+    watch.add_argument('--summary', '-s', default=None,
+                       help='Arquivo onde o resumo em JSON é salvo ao encerrar. Por padrão, é impresso na saída padrão.')
+
+    subparsers.add_parser('list', help='Lista as opções disponíveis.')
+    return parser
+
+
+def adiciona_saida(parser: argparse.ArgumentParser) -> None:
+    """
+    Opções de como os PDFs são lidos e os arquivos de saída gravados, comuns a run e execute.
+    """
+    parser.add_argument('--archive', '-a', choices=FORMATOS, default=None,
+                        help='Grava os arquivos de saída dentro de um pacote zip ou tar, na pasta de destino, '
+                             'em vez de arquivos soltos.')
+    parser.add_argument('--per-folder', action='store_true', dest='per_folder',
+                        help='Com --archive, grava um pacote para cada pasta de saída (ex.: uma por lotação).')
+    parser.add_argument('--optimize', action='store_true',
+                        help='Otimiza os PDFs gravados: retira fontes e imagens não usadas pelas páginas e '
+                             'compacta o conteúdo. Gera arquivos menores, com mais processamento.')
+    parser.add_argument('--backend', '-b', choices=backend_functions.BACKENDS, default=None,
+                        help='Biblioteca usada para ler e gravar os PDFs. O pymupdf é mais rápido, mas precisa '
+                             'estar instalado. Por padrão, a de MANIPULADOR_BACKEND ou pypdf2.')
+
+
+def executa(job: Dict) -> Dict:
+    """
+    Executa uma opção sobre uma pasta de entrada. Roda em um processo separado, pois as funções
+    trabalham sobre o diretório atual.
+
+    Os arquivos de entrada são copiados para a pasta de destino e a função é executada lá, então a
+    pasta de entrada nunca é alterada. Ao final, as cópias que continuam com o nome original são removidas.
+    """
+    from . import (cache_functions, diario_functions, extract_functions, otimiza_functions, quarentena_functions,
+                   saida_functions)
+    resultado = {'option': job['option'], 'nome': job['nome'], 'input': job['input'], 'output': job['output'],
+                 'status': 'ok', 'n_pags': 0, 'tempo': 0.0, 'erro': None}
+    perfil = inicia()
+    quarentena = quarentena_functions.inicia()
+    saidas = saida_functions.inicia()
+    st = time.time()
+    try:
+        # O cache de textos continua no diretório de onde a linha de comando foi chamada.
+        cache_functions.CACHE_PATH = job['cache']
+        extract_functions.WORKERS = job['workers']
+        otimiza_functions.ativa(job['optimize'])
+        otimiza_functions.inicia()
+        planilha_functions.ativa(job['parquet'])
+        if job['memoria'] is not None:
+            memoria_functions.ativa(job['memoria'])
+        if job['backend']:
+            backend_functions.ativa(job['backend'])
+        resultado['backend'] = backend_functions.get_backend().nome
+        # Qualquer pergunta ao usuário falha em vez de travar a execução.
+        sys.stdin = open(os.devnull)
+
+        os.makedirs(job['output'], exist_ok=True)
+        copias = []
+        # Se a entrada for a própria pasta de destino, nada é copiado.
+        entradas = os.listdir(job['input']) if job['input'] != job['output'] else []
+        for file in entradas:
+            origem = os.path.join(job['input'], file)
+            if os.path.isfile(origem):
+                shutil.copy2(origem, os.path.join(job['output'], file))
+                copias.append(file)
+
+        os.chdir(job['output'])
+        try:
+            funcao = carrega(job['option'])
+            argumentos = [job['mode']] if job['mode'] is not None and job['mode'] in OPCOES[job['option']].modos else []
+            if job['plan']:
+                # As cópias têm os mesmos nomes da entrada, então o manifesto lê as páginas da pasta original.
+                with planeja(job['input'], job['output']) as manifesto:
+                    resultado['n_pags'] = funcao(*argumentos)
+                    resultado['nao_identificados'] = quarentena.fecha()
+                    resultado['nomes_repetidos'] = saidas.fecha()
+                manifesto.salva(MANIFESTO)
+                resultado['manifesto'] = os.path.join(job['output'], MANIFESTO)
+                resultado['n_saidas'] = len(manifesto.saidas)
+            else:
+                pacote = compacta(job['archive'], job['per_folder']) if job['archive'] else nullcontext()
+                with pacote as pacote:
+                    # Se a execução anterior nesta pasta de destino foi interrompida, ela é retomada.
+                    diario_functions.inicia(job['option'], job['mode'])
+                    resultado['n_pags'] = funcao(*argumentos)
+                    resultado['nao_identificados'] = quarentena.fecha()
+                    resultado['arquivos_pulados'] = diario_functions.encerra()
+                    resultado['nomes_repetidos'] = saidas.fecha()
+                if pacote is not None:
+                    resultado['pacote'] = pacote.fecha()
+                if job['optimize']:
+                    resultado['otimizacao'] = otimiza_functions.resumo()
+        finally:
+            # Os PDFs lidos do disco são fechados antes, pois no Windows um arquivo aberto não pode ser removido.
+            backend_functions.fecha()
+            for file in copias:
+                if os.path.isfile(file):
+                    os.remove(file)
+            extract_functions.encerra()
+    except BaseException as e:
+        resultado['status'] = 'erro'
+        resultado['erro'] = f'{type(e).__name__}: {e}'
+    resultado['tempo'] = time.time() - st
+    # Tempo de cada etapa, por arquivo, e as páginas mais lentas.
+    resultado['perfil'] = perfil.resumo()
+    return resultado
+
+
+def monta_job(option: int, pasta: str, output: str, mode: str | None = None, plan: bool = False,
+              archive: str | None = None, per_folder: bool = False, optimize: bool = False, n_jobs: int = 1,
+              backend: str | None = None, parquet: bool = False, memoria: int | None = None) -> Dict:
+    """
+    Monta a execução de uma opção sobre uma pasta, recebida por `executa`.
+    Raises:
+        ValueError: Se a opção pergunta um modo ao usuário e `mode` não é um dos seus modos. Opções sem
+            modos ignoram `mode`, para que o mesmo modo valha para várias opções de uma execução.
+    """
+    modos = OPCOES[option].modos
+    if mode is not None and modos and mode not in modos:
+        raise ValueError(f"Modo inválido para a opção {option}: {mode} (modos: {', '.join(modos)})")
+    return {'option': option, 'nome': OPCOES[option].nome,
+            'input': os.path.abspath(pasta), 'output': os.path.abspath(output), 'mode': mode, 'plan': plan,
+            'archive': archive, 'per_folder': per_folder, 'optimize': optimize, 'backend': backend, 'parquet': parquet,
+            'memoria': memoria, 'cache': os.path.abspath('configs/cache/textos.db'),
+            # Os processos de extração são divididos entre as execuções simultâneas.
+            'workers': max(1, (os.cpu_count() or 1) // n_jobs)}
+
+
+def monta_jobs(args: argparse.Namespace) -> List[Dict]:
+    combinacoes = [(option, pasta) for pasta in args.inputs for option in args.options]
+    n_jobs = max(1, min(args.jobs, len(combinacoes)))
+    jobs = []
+    for option, pasta in combinacoes:
+        output = os.path.abspath(args.output)
+        if len(combinacoes) > 1:
+            output = os.path.join(output, f'{os.path.basename(os.path.normpath(pasta))}-f{option:02}')
+        jobs.append(monta_job(option, pasta, output, args.mode, args.plan, args.archive, args.per_folder,
+                              args.optimize, n_jobs, args.backend, args.parquet, args.memoria))
+    return jobs
+
+
+def run(args: argparse.Namespace) -> int:
+    invalidas = [option for option in args.options if option not in OPCOES]
+    if invalidas:
+        print(f'Opções inválidas: {invalidas}', file=sys.stderr)
+        return EXIT_USO
+    pastas = [pasta for pasta in args.inputs if not os.path.isdir(pasta)]
+    if pastas:
+        print(f'Pastas de entrada não encontradas: {pastas}', file=sys.stderr)
+        return EXIT_USO
+    if args.plan and args.archive:
+        print('Com --plan nada é gravado; use --archive no comando execute.', file=sys.stderr)
+        return EXIT_USO
+    if args.plan:
+        sem_manifesto = [option for option in args.options if not OPCOES[option].planeja]
+        if sem_manifesto:
+            print(f'Opções que não podem ser planejadas: {sem_manifesto}', file=sys.stderr)
+            return EXIT_USO
+
+    try:
+        jobs = monta_jobs(args)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return EXIT_USO
+    st = time.time()
+    with ProcessPoolExecutor(max_workers=max(1, min(args.jobs, len(jobs)))) as pool:
+        futures = [pool.submit(executa, job) for job in jobs]
+        for future in as_completed(futures):
+            resultado = future.result()
+            nao_identificados = resultado.get('nao_identificados') or {}
+            aviso = (f" ({nao_identificados['paginas']} página(s) e {nao_identificados['arquivos']} arquivo(s) "
+                     f"não identificados)" if nao_identificados.get('motivos') else '')
+            print(f"[{resultado['status']}] {resultado['nome']} - {resultado['input']}{aviso}", file=sys.stderr)
+    # O resumo segue a ordem em que as execuções foram pedidas.
+    resultados = [future.result() for future in futures]
+
+    if args.relatorio:
+        from .report_functions import salva_relatorio
+        data = datetime.now().strftime("%d/%m/%Y")
+        salva_relatorio([[data, resultado['nome'], resultado['n_pags'], resultado['tempo'],
+                          *(resultado['perfil']['fases'][nome] for nome in FASES)]
+                         for resultado in resultados if resultado['status'] == 'ok'])
+
+    falhas = sum(resultado['status'] != 'ok' for resultado in resultados)
+    resumo = {'status': 'ok' if not falhas else 'erro', 'execucoes': len(resultados), 'falhas': falhas,
+              'n_pags': sum(resultado['n_pags'] or 0 for resultado in resultados),
+              'nao_identificados': {chave: sum((resultado.get('nao_identificados') or {}).get(chave, 0)
+                                                for resultado in resultados) for chave in ('paginas', 'arquivos')},
+              'tempo': time.time() - st, 'resultados': resultados}
+    escreve_resumo(resumo, args.summary)
+    return EXIT_OK if not falhas else EXIT_FALHA
+
+
+def execute(args: argparse.Namespace) -> int:
+    """
+    Grava os arquivos de cada manifesto, sem extrair o texto dos PDFs novamente.
+    """
+    faltando = [path for path in args.manifestos if not os.path.isfile(path)]
+    if faltando:
+        print(f'Manifestos não encontrados: {faltando}', file=sys.stderr)
+        return EXIT_USO
+
+    otimiza_functions.ativa(args.optimize)
+    if args.backend:
+        backend_functions.ativa(args.backend)
+    st = time.time()
+    resultados = []
+    for path in args.manifestos:
+        resultado = {'manifesto': os.path.abspath(path), 'status': 'ok', 'n_arquivos': 0, 'tempo': 0.0, 'erro': None,
+                     'backend': backend_functions.get_backend().nome}
+        st_manifesto = time.time()
+        otimiza_functions.inicia()
+        try:
+            manifesto = Manifesto.le(path)
+            pacote = compacta(args.archive, args.per_folder, raiz=manifesto.saida) if args.archive else nullcontext()
+            with pacote as pacote:
+                resultado['n_arquivos'] = executa_manifesto(manifesto, args.jobs, args.nome)
+            if pacote is not None:
+                resultado['pacote'] = pacote.fecha()
+            if args.optimize:
+                resultado['otimizacao'] = otimiza_functions.resumo()
+        except Exception as e:
+            resultado['status'] = 'erro'
+            resultado['erro'] = f'{type(e).__name__}: {e}'
+        resultado['tempo'] = time.time() - st_manifesto
+        print(f"[{resultado['status']}] {path}", file=sys.stderr)
+        resultados.append(resultado)
+
+    falhas = sum(resultado['status'] != 'ok' for resultado in resultados)
+    resumo = {'status': 'ok' if not falhas else 'erro', 'execucoes': len(resultados), 'falhas': falhas,
+              'n_arquivos': sum(resultado['n_arquivos'] for resultado in resultados),
+              'tempo': time.time() - st, 'resultados': resultados}
+    escreve_resumo(resumo, args.summary)
+    return EXIT_OK if not falhas else EXIT_FALHA
+
+
+def watch(args: argparse.Namespace) -> int:
+    """
+    Vigia as pastas da configuração (ver vigia_functions) até ser interrompido, ou até processar os
+    arquivos já presentes, com --once.
+    """
+    from .vigia_functions import INTERVALO, VERIFICACOES, Vigia, le_configuracao
+    if not os.path.isfile(args.config):
+        print(f'Configuração não encontrada: {args.config}', file=sys.stderr)
+        return EXIT_USO
+    try:
+        pastas, configuracao = le_configuracao(args.config)
+    except (ValueError, KeyError, json.JSONDecodeError) as e:
+        print(f'Configuração inválida: {type(e).__name__}: {e}', file=sys.stderr)
+        return EXIT_USO
+    if not pastas:
+        print('Nenhuma pasta na configuração.', file=sys.stderr)
+        return EXIT_USO
+
+    st = time.time()
+    vigia = Vigia(pastas, args.jobs or configuracao.get('jobs', 1), configuracao.get('intervalo', INTERVALO),
+                  configuracao.get('verificacoes', VERIFICACOES))
+    resultados = vigia.executa(args.once)
+    falhas = sum(resultado['status'] != 'ok' for resultado in resultados)
+    resumo = {'status': 'ok' if not falhas else 'erro', 'execucoes': len(resultados), 'falhas': falhas,
+              'n_pags': sum(resultado.get('n_pags') or 0 for resultado in resultados),
+              'tempo': time.time() - st, 'resultados': resultados}
+    escreve_resumo(resumo, args.summary)
+    return EXIT_OK if not falhas else EXIT_FALHA
+
+
+def escreve_resumo(resumo: Dict, path: str | None) -> None:
+    texto = json.dumps(resumo, ensure_ascii=False, indent=2, default=str)
+    if path:
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(texto)
+    else:
+        print(texto)
+
+
+def main(argv: List[str] | None = None) -> int:
+    """
+    Ponto de entrada da linha de comando. Ex.:
+        main.exe run --option 6 --input Folha --output Saida
+        main.exe run -o 8 -o 12 -i Janeiro -i Fevereiro -d Saida --summary resumo.json
+        main.exe run -o 8 -i Janeiro -d Saida --plan
+        main.exe execute Saida/manifesto.json --nome "{lotacao}.pdf"
+        main.exe run -o 21 -i Recibos -d Saida --archive zip --per-folder
+        main.exe run -o 21 -i Recibos -d Saida --optimize
+        main.exe run -o 21 -i Recibos -d Saida --backend pymupdf
+        main.exe run -o 19 -i Planos -d Saida --parquet
+        main.exe run -o 8 -i Anual -d Saida --memoria 1024
+        main.exe watch vigia.json
+    Returns:
+        (int): 0 se todas as execuções terminaram bem, 1 se alguma falhou e 2 em caso de uso incorreto.
+    """
+    parser = cria_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return EXIT_USO if e.code else EXIT_OK
+    if args.comando == 'list':
+        for option, opcao in OPCOES.items():
+            modos = f" (modos: {', '.join(opcao.modos)})" if opcao.modos else ''
+            print(f"{option}: {opcao.nome} [{', '.join(opcao.entradas)}]{modos}")
+        return EXIT_OK
+    if args.comando == 'execute':
+        return execute(args)
+    if args.comando == 'watch':
+        return watch(args)
+    return run(args)
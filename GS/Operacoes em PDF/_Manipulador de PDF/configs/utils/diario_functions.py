@@ -0,0 +1,184 @@
+from .cache_functions import hash_arquivo
+from .manifest_functions import get_manifesto
+from .pacote_functions import get_pacote
+from .saida_functions import get_saidas
+from typing import Dict, Iterable, Iterator, List, Tuple
+import json
+import sys
+import os
+
+# Diário da execução em andamento, na pasta dos arquivos. É removido quando a execução termina bem.
+DIARIO_PATH: str = '_diario_execucao.jsonl'
+
+
+class Diario:
+    """
+    Diário (append-only) dos arquivos de entrada já processados em uma execução e das saídas que cada um
+    gravou. Se a execução for interrompida (erro, computador desligado), a próxima execução da mesma opção
+    pula os arquivos registrados cujas saídas ainda existem e continua dos demais.
+
+    Cada linha é gravada e sincronizada com o disco assim que o arquivo termina, e uma linha cortada pela
+    interrupção é ignorada na leitura. O texto das páginas já extraídas fica no cache (ver cache_functions),
+    então mesmo o arquivo interrompido no meio não é extraído de novo.
+    """
+
+    def __init__(self, opcao: int, modo: str | None = None, path: str = DIARIO_PATH):
+        self.path = path
+        self.contexto = {'opcao': opcao, 'modo': modo}
+        # (Nome, hash) de cada arquivo concluído -> saídas gravadas e páginas não identificadas. O nome
+        # também identifica o arquivo, pois há opções que o usam nas saídas (ex.: a pasta de cada arquivo).
+        self.concluidos: Dict[Tuple[str, str], Dict] = {}
+        # Saídas gravadas desde o último arquivo concluído.
+        self.saidas: List[str] = []
+        self.n_pulados: int = 0
+        if os.path.isfile(path):
+            self._le()
+        if not self.concluidos:
+            # Diário de outra opção, ou vazio: começa um novo.
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(json.dumps({'tipo': 'inicio', **self.contexto}, ensure_ascii=False) + '\n')
+
+    def _le(self) -> None:
+        with open(self.path, 'r', encoding='utf-8') as file:
+            linhas = file.read().split('\n')
+        registros = []
+        for linha in linhas:
+            try:
+                registros.append(json.loads(linha))
+            except json.JSONDecodeError:
+                continue
+        if not registros or registros[0].get('tipo') != 'inicio' or \
+                {chave: registros[0].get(chave) for chave in self.contexto} != self.contexto:
+            return
+        for registro in registros[1:]:
+            if registro.get('tipo') == 'concluido':
+                self.concluidos[registro['arquivo'], registro['hash']] = registro
+
+    def _grava(self, registro: Dict) -> None:
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(registro, ensure_ascii=False) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+
+    def registra(self, path: str) -> None:
+        """
+        Registra uma saída gravada pelo arquivo em andamento.
+        """
+        self.saidas.append(path)
+
+    def pula(self, file: str) -> bool:
+        """
+        Indica se o arquivo já foi concluído em uma execução interrompida e as suas saídas ainda existem.
+        Nesse caso, as suas páginas não identificadas voltam para a separação desta execução, e os nomes
+        das suas saídas ficam reservados, para que as saídas seguintes recebam os mesmos sufixos que
+        receberiam sem a interrupção (ver saida_functions).
+        """
+        if not self.concluidos:
+            return False
+        registro = self.concluidos.get((file, hash_arquivo(file)))
+        if registro is None or not all(os.path.isfile(saida) for saida in registro['saidas']):
+            return False
+        from .quarentena_functions import get_quarentena
+        quarentena = get_quarentena()
+        for pagina, motivo in registro['nao_identificadas']:
+            quarentena.adiciona(file, pagina, motivo)
+        get_saidas().marca(registro['saidas'])
+        self.n_pulados += 1
+        return True
+
+    def conclui(self, files: Iterable[str]) -> None:
+        """
+        Registra os arquivos como concluídos, junto das saídas gravadas desde o último registro.
+        """
+        from .quarentena_functions import get_quarentena
+        registros = get_quarentena().registros
+        for file in files:
+            nao_identificadas = [(registro['pagina'] - 1, registro['motivo']) for registro in registros
+                                 if registro['arquivo'] == file and registro['pagina'] != '']
+            self._grava({'tipo': 'concluido', 'arquivo': file, 'hash': hash_arquivo(file), 'saidas': self.saidas,
+                         'nao_identificadas': nao_identificadas})
+        self.saidas = []
+
+    def fecha(self, ok: bool = True) -> int:
+        """
+        Encerra o diário. Se a execução terminou bem, ele é removido; caso contrário, fica para a próxima.
+        Returns:
+            (int): A quantidade de arquivos pulados por já terem sido processados.
+        """
+        if ok and os.path.isfile(self.path):
+            os.remove(self.path)
+        return self.n_pulados
+
+
+_diario: Diario | None = None
+
+
+def inicia(opcao: int, modo: str | None = None) -> Diario | None:
+    """
+    Inicia o diário de uma execução. No modo de planejamento e gravando em pacote, nada é retomado,
+    pois as saídas não ficam como arquivos na pasta.
+    """
+    global _diario
+    _diario = Diario(opcao, modo) if get_manifesto() is None and get_pacote() is None else None
+    if _diario is not None and _diario.concluidos:
+        print(f'Retomando a execução interrompida: {len(_diario.concluidos)} arquivo(s) já processados '
+              f'serão pulados se as suas saídas existirem.', file=sys.stderr)
+    return _diario
+
+
+def encerra(ok: bool = True) -> int:
+    """
+    Encerra o diário da execução (ver `Diario.fecha`).
+    """
+    global _diario
+    if _diario is None:
+        return 0
+    n_pulados = _diario.fecha(ok)
+    _diario = None
+    return n_pulados
+
+
+def get_diario() -> Diario | None:
+    return _diario
+
+
+def registra(path: str) -> None:
+    """
+    Registra uma saída gravada no diário, se houver uma execução com diário em andamento.
+    """
+    if _diario is not None:
+        _diario.registra(path)
+
+
+def pendentes(files: List[str]) -> List[str]:
+    """
+    Retorna os arquivos que ainda não foram processados. Ex.:
+        files = pendentes([file for file in os.listdir() if '.pdf' in file])
+    """
+    if _diario is None:
+        return files
+    return [file for file in files if not _diario.pula(file)]
+
+
+def conclui(files: List[str]) -> None:
+    """
+    Registra os arquivos como concluídos. Usada pelas opções que juntam as páginas de todos os arquivos
+    antes de gravar, depois de gravar as saídas.
+    """
+    if _diario is not None:
+        _diario.conclui(files)
+
+
+def concluindo(files: Iterable[str]) -> Iterator[str]:
+    """
+    Percorre os arquivos registrando cada um como concluído quando o próximo é pedido (ou quando
+    termina), ou seja, depois que o corpo do laço gravou as suas saídas. Ex.:
+        for file in concluindo(files):
+            ...
+            sink.close()
+    """
+    for file in files:
+        if _diario is not None:
+            _diario.saidas = []
+        yield file
+        conclui([file])
@@ -0,0 +1,283 @@
+from . import memoria_functions
+from .backend_functions import Documento, Pagina, fecha, get_backend
+from .cache_functions import get_cache, hash_arquivo
+from .perfil_functions import percorre
+from concurrent.futures import ProcessPoolExecutor, Future
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List, Set, Tuple
+import weakref
+import atexit
+import os
+
+# Quantidade de processos usados na extração de texto. Com 1, tudo roda no processo principal.
+WORKERS: int = int(os.environ.get('MANIPULADOR_WORKERS', os.cpu_count() or 1))
+# Quantidade de páginas extraídas por tarefa enviada ao pool.
+TAM_LOTE: int = 50
+# Arquivos com menos páginas que isso não compensam o custo de iniciar os processos.
+MIN_PAGINAS: int = 100
+# A cada quantas páginas extraídas o texto é confirmado no cache, para que uma execução interrompida
+# no meio de um arquivo grande não precise extraí-las de novo.
+CHECKPOINT_PAGINAS: int = 500
+
+_pool: ProcessPoolExecutor | None = None
+# Extrações já enviadas ao pool, por arquivo: o parser aplicado e as tarefas, na ordem das páginas.
+_pendentes: Dict[str, Tuple[Callable | None, List[Future]]] = {}
+# Arquivo e índice de cada página entregue por `paginas`, usados no manifesto de saída. Cada página sai
+# daqui quando deixa de ser usada.
+_origens: Dict[int, Tuple[str, int]] = {}
+# Páginas entregues por `paginas` apenas com as linhas do cabeçalho (ver `cabecalho`).
+_cabecalhos: Set[int] = set()
+
+
+def extrai_linhas(page: Pagina, n_linhas: int | None = None) -> List[str]:
+    """
+    Extrai o texto da página na forma de uma lista de linhas, com o backend escolhido (ver backend_functions).
+    Com `n_linhas`, apenas as primeiras linhas são extraídas.
+    """
+    return get_backend().linhas(page, n_linhas)
+
+
+def _extrai_intervalo(file: str, inicio: int, fim: int, parser: Callable | None = None,
+                      n_linhas: int | None = None, backend: str | None = None) -> List[Tuple[List[str], Any]]:
+    """
+    Executada nos processos do pool: extrai as linhas das páginas [inicio, fim) do arquivo
+    e, se houver, aplica o parser às linhas de cada página. O backend é o do processo principal,
+    que pode ter mudado depois que o pool foi criado.
+    """
+    backend = get_backend(backend)
+    # Aberto pelo arquivo, o PDF é lido do disco só nas partes usadas, em vez de carregado inteiro a cada tarefa.
+    with open(file, 'rb') as file_b:
+        pdf = backend.abre(file_b)
+        resultados = []
+        for i in range(inicio, fim):
+            rows = backend.linhas(pdf.pages[i], n_linhas)
+            resultados.append((rows, parser(rows) if parser is not None else rows))
+    return resultados
+
+
+def _extrai_primeira(file: str, backend: str | None = None) -> Tuple[List[str], int]:
+    """
+    Executada nos processos do pool: extrai as linhas da primeira página e conta as páginas do arquivo.
+    """
+    backend = get_backend(backend)
+    # O arquivo é fechado antes de retornar, pois as opções que usam a primeira página renomeiam o arquivo.
+    with open(file, 'rb') as file_b:
+        pdf = backend.abre(file_b)
+        return backend.linhas(pdf.pages[0]), len(pdf.pages)
+
+
+def get_pool() -> ProcessPoolExecutor | None:
+    """
+    Retorna o pool de processos, criando-o na primeira chamada. Retorna None se o modo paralelo estiver desativado.
+    """
+    global _pool
+    if WORKERS <= 1:
+        return None
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=WORKERS)
+        atexit.register(encerra)
+    return _pool
+
+
+def pool_ativo() -> ProcessPoolExecutor | None:
+    """
+    Retorna o pool de processos se ele já foi criado, sem criá-lo.
+    """
+    return _pool
+
+
+def encerra() -> None:
+    """
+    Encerra o pool de processos, descarta extrações pendentes e fecha os PDFs abertos do disco.
+    """
+    global _pool
+    for _, futures in _pendentes.values():
+        for future in futures:
+            future.cancel()
+    _pendentes.clear()
+    _origens.clear()
+    fecha()
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+def _modo(n_linhas: int | None) -> str:
+    """
+    Identifica no cache as extrações feitas apenas do cabeçalho e as feitas por outro backend.
+    """
+    return get_backend().versao + (f'-cab{n_linhas}' if n_linhas is not None else '')
+
+
+def _envia(file: str, n_pags: int, parser: Callable | None = None,
+           n_linhas: int | None = None) -> List[Future] | None:
+    pool = get_pool()
+    if pool is None or n_pags < MIN_PAGINAS:
+        return None
+    return [pool.submit(_extrai_intervalo, file, inicio, min(inicio + TAM_LOTE, n_pags), parser, n_linhas,
+                        get_backend().nome)
+            for inicio in range(0, n_pags, TAM_LOTE)]
+
+
+def prepara(files: List[str], n_linhas: int | None = None, parser: Callable | None = None) -> None:
+    """
+    Envia a extração de todos os arquivos ao pool de uma vez, para que as páginas de arquivos
+    diferentes também sejam extraídas em paralelo. As páginas são consumidas depois por `paginas`,
+    que deve receber o mesmo `n_linhas` e o mesmo parser. Arquivos que já estão inteiros no cache não
+    são enviados.
+    """
+    if get_pool() is None:
+        return
+    cache = get_cache()
+    for file in files:
+        if file in _pendentes:
+            continue
+        with open(file, 'rb') as file_b:
+            n_pags = len(get_backend().abre(file_b).pages)
+        if cache is not None and cache.conta(hash_arquivo(file), _modo(n_linhas)) == n_pags:
+            continue
+        futures = _envia(file, n_pags, parser, n_linhas)
+        if futures is not None:
+            _pendentes[file] = (parser, futures)
+
+
+def _extrai(file: str, pdf: Documento, guardadas: Mapping[int, List[str]],
+            parser: Callable | None, n_linhas: int | None) -> Iterator[Tuple[List[str], Any]]:
+    """
+    Retorna as linhas de cada página e o resultado do parser, na ordem das páginas, reaproveitando
+    as páginas já guardadas no cache e extraindo as demais no pool ou no processo principal.
+    """
+    n_pags = len(pdf.pages)
+    if len(guardadas) == n_pags:
+        # Todas as páginas estão no cache, nenhuma extração é necessária.
+        _descarta_pendentes(file)
+        for i in range(n_pags):
+            yield guardadas[i], parser(guardadas[i]) if parser is not None else guardadas[i]
+        return
+
+    if file in _pendentes and _pendentes[file][0] == parser:
+        # Extração já enviada por `prepara`.
+        futures = _pendentes.pop(file)[1]
+    else:
+        _descarta_pendentes(file)
+        futures = _envia(file, n_pags, parser, n_linhas)
+
+    if futures is None:
+        for i, page in enumerate(pdf.pages):
+            rows = guardadas[i] if i in guardadas else extrai_linhas(page, n_linhas)
+            yield rows, parser(rows) if parser is not None else rows
+        return
+
+    for i in range(len(futures)):
+        # Cada tarefa é descartada assim que consumida, para que o texto das páginas já entregues seja liberado.
+        future, futures[i] = futures[i], None
+        yield from future.result()
+
+
+def origem(page: Pagina) -> Tuple[str, int]:
+    """
+    Retorna o arquivo e o índice de uma página entregue por `paginas`.
+    """
+    return _origens[id(page)]
+
+
+def cabecalho(page: Pagina) -> bool:
+    """
+    Indica se a página foi entregue por `paginas` apenas com as linhas do cabeçalho (`n_linhas`), de modo que
+    uma regra que falhe nelas pode ser repetida com o texto da página inteira (ver quarentena_functions.aplica).
+    """
+    return id(page) in _cabecalhos
+
+
+def _descarta_pendentes(file: str) -> None:
+    for future in _pendentes.pop(file, (None, []))[1]:
+        future.cancel()
+
+
+def paginas(file: str, pdf: Documento, parser: Callable | None = None,
+            n_linhas: int | None = None) -> Iterator[Tuple[Pagina, Any]]:
+    """
+    Percorre as páginas do pdf retornando cada página junto das suas linhas de texto.
+
+    O texto já extraído em execuções anteriores é lido do cache. No modo paralelo, o restante é extraído
+    pelos processos do pool e entregue na ordem original das páginas, de modo que o agrupamento feito
+    por quem consome o iterador não muda.
+    Se for passado um parser, ele é executado no pool e seu resultado substitui as linhas.
+    O tempo de extração e o de processamento de cada página são registrados no perfil da execução.
+    Args:
+        file (str): O caminho do arquivo, usado pelos processos do pool para abri-lo.
+        pdf (Documento): O documento aberto no processo principal (ver `abre`), de onde vêm as páginas.
+        parser (Callable): Função de nível de módulo (ou outro objeto que possa ser enviado aos processos,
+            ver group_functions.classifica) que recebe as linhas de uma página.
+        n_linhas (int): Se informado, extrai apenas as primeiras linhas de cada página (ver `extrai_linhas`).
+    """
+    return percorre(_paginas(file, pdf, parser, n_linhas), file)
+
+
+def _paginas(file: str, pdf: Documento, parser: Callable | None,
+             n_linhas: int | None) -> Iterator[Tuple[Pagina, Any]]:
+    cache = get_cache()
+    hash_arq = hash_arquivo(file) if cache is not None else ''
+    guardadas = cache.get(hash_arq, _modo(n_linhas))[0] if cache is not None else {}
+    novas: Dict[int, List[str]] = {}
+    try:
+        for i, (rows, resultado) in enumerate(_extrai(file, pdf, guardadas, parser, n_linhas)):
+            # Sem o cache, as linhas não são guardadas, para que a memória não cresça com o documento.
+            if cache is not None and i not in guardadas:
+                novas[i] = rows
+                if len(novas) >= CHECKPOINT_PAGINAS:
+                    cache.put(hash_arq, len(pdf.pages), novas, _modo(n_linhas))
+                    cache.flush()
+                    novas = {}
+            page = pdf.pages[i]
+            _origens[id(page)] = (file, i)
+            weakref.finalize(page, _origens.pop, id(page), None)
+            if n_linhas is not None:
+                _cabecalhos.add(id(page))
+                weakref.finalize(page, _cabecalhos.discard, id(page))
+            memoria_functions.confere()
+            yield page, resultado
+    finally:
+        # Guarda o que foi extraído, mesmo que o consumidor pare antes do fim.
+        if cache is not None and novas:
+            cache.put(hash_arq, len(pdf.pages), novas, _modo(n_linhas))
+            cache.flush()
+
+
+def primeiras_paginas(files: List[str]) -> Iterator[Tuple[str, List[str], int]]:
+    """
+    Percorre os arquivos retornando o nome, as linhas da primeira página e o total de páginas de cada um,
+    usado pelas opções que apenas renomeiam os arquivos a partir da primeira página.
+    """
+    return percorre(_primeiras_paginas(files))
+
+
+def _primeiras_paginas(files: List[str]) -> Iterator[Tuple[str, List[str], int]]:
+    cache = get_cache()
+    pool = get_pool()
+    resultados: List[Tuple[List[str], int] | Future] = []
+    hashes: List[str] = []
+    for file in files:
+        hash_arq = hash_arquivo(file) if cache is not None else ''
+        hashes.append(hash_arq)
+        guardadas, n_pags = cache.get(hash_arq, _modo(None)) if cache is not None else ({}, None)
+        if 0 in guardadas and n_pags is not None:
+            resultados.append((guardadas[0], n_pags))
+        elif pool is not None and len(files) > 1:
+            resultados.append(pool.submit(_extrai_primeira, file, get_backend().nome))
+        else:
+            resultados.append(None)
+
+    for file, hash_arq, resultado in zip(files, hashes, resultados):
+        if resultado is None:
+            rows, n_pags = _extrai_primeira(file)
+        elif isinstance(resultado, Future):
+            rows, n_pags = resultado.result()
+        else:
+            yield file, *resultado
+            continue
+        if cache is not None:
+            cache.put(hash_arq, n_pags, {0: rows}, _modo(None))
+        yield file, rows, n_pags
+    if cache is not None:
+        cache.flush()
@@ -1,53 +1,57 @@
-import pathlib
-import os
-from .f01 import f01
-from .f02 import f02
-from .f03 import f03
-from .f04 import f04
-from .f05 import f05
-from .f06 import f06
-from .f07 import f07
-from .f08 import f08
-from .f09 import f09
-from .f10 import f10
-from .f11 import f11
-from .f12 import f12
-from .f13 import f13
-from .f14 import f14
-from .f15 import f15
-from .f16 import f16
-from .f17 import f17
-from .f18 import f18
-from .f19 import f19
-from .f20 import f20
-from .f21 import f21
-
-# Caminho do diretório onde este __init__.py está.
-diretorio = pathlib.Path(__file__).parent
-# Conta quantos arquivos de função existem no diretório.
-N_FUNCTIONS = len([file for file in os.listdir(diretorio) if file.startswith('f') and file.endswith('.py')])
-__all__ = [f'f{i:02}' for i in range(1, N_FUNCTIONS+1)]
-# Nomeia cada função ao seu nome de arquivo.
-NAMES = {
-    1: 'Documentos de Admissão',
-    2: 'Documentos de Rescisão',
-    3: 'Boletos BMP',
-    4: 'Boletos de Cobrança',
-    5: 'Fichas de Registro',
-    6: 'Folha de Pagamento, Férias e Rescisão',
-    7: 're FGTS',
-    8: 'Listagem de Conferência',
-    9: 'Recibos de Pagamento Fortes',
-    10: 'Recibos FOLK',
-    11: 'Relatório de Serviços Administrativos',
-    12: 'Resumo Geral Mês/Período',
-    13: 'NFs Fortaleza',
-    14: 'Demonstrativo de Férias',
-    15: 'NFs Eusébio',
-    16: 'Cartas Singular',
-    17: 'Rendimentos Protheus',
-    18: 'Rendimentos Fortes',
-    19: 'Planos de Saúde',
-    20: 'Folha por Centro de Custo Protheus',
-    21: 'Recibos de Pagamento Protheus'
+from typing import Callable, Dict, NamedTuple, Tuple
+import importlib
+
+
+class Opcao(NamedTuple):
+    nome: str
+    # Módulo deste pacote que contém a função de mesmo nome.
+    modulo: str
+    # Tipos de arquivo lidos do diretório. Os que estão entre colchetes são opcionais.
+    entradas: Tuple[str, ...] = ('.pdf',)
+    # Modos aceitos pelo parâmetro `modo` da função, quando ela pergunta algo ao usuário.
+    modos: Tuple[str, ...] = ()
+    # Se as saídas da função passam pelo manifesto, podendo ser planejadas e gravadas depois.
+    planeja: bool = True
+
+
+# Registro das opções do menu. Os módulos (e suas dependências, como pandas e PyPDF2) só são
+# importados quando a opção é escolhida, o que mantém a abertura do menu rápida.
+# Como os módulos não são importados diretamente, o executável precisa ser gerado com
+# --collect-submodules configs.utils.functions para que o PyInstaller os inclua.
+OPCOES: Dict[int, Opcao] = {
+    1: Opcao('Documentos de Admissão', 'f01'),
+    2: Opcao('Documentos de Rescisão', 'f02'),
+    3: Opcao('Boletos BMP', 'f03'),
+    4: Opcao('Boletos de Cobrança', 'f04'),
+    5: Opcao('Fichas de Registro', 'f05'),
+    6: Opcao('Folha de Pagamento, Férias e Rescisão', 'f06', ('.pdf', '[.csv]')),
+    7: Opcao('re FGTS', 'f07', ('.pdf', '[.xls]')),
+    8: Opcao('Listagem de Conferência', 'f08'),
+    9: Opcao('Recibos de Pagamento Fortes', 'f09', modos=('funcionario', 'lotacao')),
+    10: Opcao('Recibos FOLK', 'f10'),
+    11: Opcao('Relatório de Serviços Administrativos', 'f11'),
+    12: Opcao('Resumo Geral Mês/Período', 'f12'),
+    13: Opcao('NFs Fortaleza', 'f13'),
+    14: Opcao('Demonstrativo de Férias', 'f14'),
+    15: Opcao('NFs Eusébio', 'f15'),
+    16: Opcao('Cartas Singular', 'f16'),
+    17: Opcao('Rendimentos Protheus', 'f17'),
+    18: Opcao('Rendimentos Fortes', 'f18'),
+    19: Opcao('Planos de Saúde', 'f19', planeja=False),
+    20: Opcao('Folha por Centro de Custo Protheus', 'f20', ('.pdf', '[.xls]')),
+    21: Opcao('Recibos de Pagamento Protheus', 'f21'),
+    22: Opcao('Total por Empregado', 'f22', planeja=False),
 }
+
+N_FUNCTIONS: int = len(OPCOES)
+# Nomeia cada função ao seu nome de arquivo.
+NAMES: Dict[int, str] = {option: opcao.nome for option, opcao in OPCOES.items()}
+
+
+def carrega(option: int) -> Callable[[], int]:
+    """
+    Importa o módulo da opção e retorna a sua função.
+    """
+    modulo = OPCOES[option].modulo
+    return getattr(importlib.import_module(f'.{modulo}', __name__), modulo)
+
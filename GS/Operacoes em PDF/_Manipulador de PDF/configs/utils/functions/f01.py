@@ -1,98 +1,50 @@
-from PyPDF2 import PdfReader, PdfWriter
+from ..backend_functions import abre
+from ..diario_functions import concluindo, pendentes
+from ..extract_functions import paginas, prepara
+from ..perfil_functions import fase, get_perfil
+from ..quarentena_functions import nao_identificada
+from ..regra_functions import ADMISSAO, TabelaTitulos
+from ..saida_functions import limpa, pasta
+from ..sink_functions import PageSink
 from tqdm import tqdm
 import os
 
 
 def f01() -> int:
     # Cria a pasta de destino dos documentos
-    if not os.path.exists('Arquivos'):
-        os.mkdir('Arquivos')
+    pasta('Arquivos')
     tot_pags: int = 0
     # Itera por todos os arquivos .pdf.
-    for file in [file for file in os.listdir() if '.pdf' in file.lower()]:
-        # Cria a pasta para o arquivo.
-        if not os.path.exists(f'Arquivos\\{file[:-4]}'):
-            os.mkdir(f'Arquivos\\{file[:-4]}')
+    # Arquivos já processados por uma execução interrompida são pulados (ver diario_functions).
+    files = pendentes([file for file in os.listdir() if '.pdf' in file.lower()])
+    # Inicia a extração de texto de todos os arquivos.
+    prepara(files)
+    # Compara o título de cada página com todas as regras de uma vez.
+    tabela = TabelaTitulos(ADMISSAO)
+    for file in concluindo(files):
         with open(file, 'rb') as file_b:
             # Cria um objeto PdfFileReader para ler o conteúdo do arquivo PDF.
-            pdf_reader = PdfReader(file_b)
+            with fase('abertura', file):
+                pdf_reader = abre(file_b)
             tot_pags += len(pdf_reader.pages)
+            # As páginas de cada funcionário são acumuladas e cada arquivo é salvo uma única vez.
+            sink = PageSink()
             # Para cada página, identifica o tipo de documento e o nome do funcionário.
-            for pag in tqdm(pdf_reader.pages):
-                rows = pag.extract_text().split('\n')
-                # Encontra o título do documento.
-                idx = 0
-                while not rows[idx].strip():
-                    idx += 1
-                titulo = rows[idx].strip()
-                # Remove espaços do títulos
-                titulo = ' '.join(titulo.split())
-                # Acessa o nome com base no tipo de documento.
-                if titulo == 'DECLARAÇÃO DE DEPENDENTES PARA FINS DE IMPOSTO DE RENDA':
-                    nome = rows[2]
-                elif titulo == 'TERMO LDPD':
-                    row = rows[3]
-                    nome = row[35:row.find(',', 35)].replace('_', '')
-                elif titulo == 'R E C I B O D E E N T R E G A D A C A R T E I R A D E T R A B A L H O':
-                    for row in rows:
-                        if '(Carimbo e visto da empresa)' in row:
-                            nome = row[28:-12]
-                            break
-                elif titulo == 'CTPS DIGITAL':
-                    row = rows[3]
-                    nome = row[row.find(' '):row.find(',', 4)]
-                    # Remove espaços entre os nomes.
-                    nome = ' '.join(nome.split())
-                elif titulo == 'TERMO DE COMPROMISSO DE VALE-TRANSPORTE':
-                    for i, row in enumerate(rows):
-                        if 'SSPNome' in row:
-                            nome = rows[i + 1]
-                            break
-                elif titulo == 'TERMO COLETIVO DE CESSÃO GRATUITA DE USO DE IMAGEM PARA DIVULGAÇÃO':
-                    for row in rows:
-                        if 'Empregado: ' in row:
-                            nome = row[11:]
-                            break
-                elif titulo == 'REGISTRO DE EMPREGADONúmero:':
-                    nome = rows[19][:-14]
-                elif titulo == 'Termo de Responsabilidade':
-                    nome = rows[6][:-10]
-                elif titulo == 'Contrato de Experiência de Trabalho':
-                    row = rows[2]
-                    nome = row[row.rfind(',') + 1:row.find(' p', row.rfind(','))].strip()
-                    # Remove espaços entre os nomes
-                    nome = ' '.join(nome.split())
-                elif titulo[:20] == 'A Controladora fica ':
-                    nome = rows[30]
-                elif titulo == 'AUTODECLARAÇÃO ÉTNICO-RACIAL':
-                    nome = rows[13]
-                # No Termo LGPD não tem o nome, fica na página seguinte, que começa com '" CLÁUSULA QUARTA:'
-                # Então a página atual precisa ser guardada.
-                elif titulo == 'TERMO LGPD':
-                    row = rows[3]
-                    nome = row[row.find(', eu') + 4:row.find(',', row.find(', eu') + 1)].strip()
-                elif titulo == '" CLÁUSULA TERCEIRA: COMPARTILHAMENTO DE DADOS.':
-                    nome = rows[31]
-                elif titulo == '" CLÁUSULA QUARTA: RESPONSABILIDADE PELA SEGURANÇA DOS DADOS.':
-                    nome = rows[29]
-                elif titulo == '" CLÁUSULA QUINTA: TÉRMINO DO TRATAMENTO DOS DADOS.':
-                    nome = rows[23]
-                else:
-                    print(f'Documento {[titulo]} não reconhecido!')
-                    input()
+            for pag, rows in tqdm(paginas(file, pdf_reader), total=len(pdf_reader.pages)):
+                # Identifica o tipo de documento pelo título e acessa o nome do funcionário.
+                regra, titulo, nome = tabela.classifica(rows)
+                if regra is None:
+                    nao_identificada(pag, f'Documento não reconhecido: {titulo}')
+                    continue
+                if nome is None:
+                    nao_identificada(pag, f'Nome não encontrado: {titulo}')
                     continue
 
-                file_name = f'Arquivos\\{file[:-4]}\\{nome}.pdf'
-                pdf_writer = PdfWriter()
-                # Verifica se já existe um arquivo para este funcionário
-                if os.path.exists(file_name):
-                    pdf_reader_temp = PdfReader(file_name)
-                    # Copia todas as páginas do documento do funcionário para o writer
-                    for page_num in range(len(pdf_reader_temp.pages)):
-                        pdf_writer.add_page(pdf_reader_temp.pages[page_num])
-                # Adiciona a página atual
-                pdf_writer.add_page(pag)
-                # Salva o arquivo
-                with open(file_name, "wb") as output_pdf:
-                    pdf_writer.write(output_pdf)
+                # A pasta do arquivo é criada junto da primeira saída (ver saida_functions).
+                file_name = f'Arquivos\\{file[:-4]}\\{limpa(nome)}.pdf'
+                # Adiciona a página atual ao arquivo do funcionário.
+                sink.add(file_name, pag, titulo=titulo, nome=nome)
+            # Salva os arquivos de todos os funcionários.
+            sink.close()
+    get_perfil().detalhes['regras'] = tabela.resumo()
     return tot_pags
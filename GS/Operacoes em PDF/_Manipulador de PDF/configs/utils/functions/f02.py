@@ -1,19 +1,32 @@
-from PyPDF2 import PdfReader, PdfWriter
+from ..backend_functions import abre
+from ..campos_functions import digitos
+from ..diario_functions import conclui, pendentes
+from ..extract_functions import paginas, prepara
+from ..perfil_functions import fase
+from ..quarentena_functions import nao_identificada, protege
+from ..saida_functions import limpa, pasta
+from ..sink_functions import PageSink
 from tqdm import tqdm
 import os
 
 
 def f02() -> int:
-    if not os.path.exists('Arquivos'):
-        os.mkdir('Arquivos')
+    pasta('Arquivos')
     tot_pags: int = 0
-    for arq in [file for file in os.listdir() if '.pdf' in file]:
-        with open(arq, 'rb') as file:
-            # Cria um objeto PdfFileReader para ler o conteúdo do arquivo PDF
-            pdf = PdfReader(file)
-            tot_pags += len(pdf.pages)
-            for pag in tqdm(pdf.pages):
-                rows = pag.extract_text().split('\n')
+    # Um funcionário pode aparecer em mais de um arquivo, então as páginas são acumuladas
+    # ao longo de todos eles e cada arquivo de saída é salvo uma única vez no final.
+    sink = PageSink()
+    # Arquivos já processados por uma execução interrompida são pulados (ver diario_functions).
+    files = pendentes([file for file in os.listdir() if '.pdf' in file])
+    # Inicia a extração de texto de todos os arquivos.
+    prepara(files)
+    for arq in files:
+        # O documento recebe o caminho para manter o conteúdo em memória até o sink ser fechado.
+        with fase('abertura', arq):
+            pdf = abre(arq)
+        tot_pags += len(pdf.pages)
+        for pag, rows in tqdm(paginas(arq, pdf), total=len(pdf.pages)):
+            with protege(pag):
                 tipo = rows[0]
                 if tipo == 'TERMO DE RESCISÃO DO CONTRATO DE TRABALHO':
                     cpf = rows[40]
@@ -22,20 +35,15 @@ def f02() -> int:
                     cpf = rows[10][:14]
                     nome = rows[8]
                 else:
-                    print(f'Tipo de documento não suportado: [{tipo}].')
+                    nao_identificada(pag, f'Tipo de documento não suportado: {tipo}')
                     continue
 
-                cpf = ''.join(char for char in cpf if char.isnumeric())
-                file_name = f'Arquivos/{nome}{cpf}.pdf'
-                writer = PdfWriter()
-                if os.path.exists(file_name):
-                    pdf_temp = PdfReader(file_name)
-                    # Copia todas as páginas do documento do funcionário para o writer
-                    for page_num in range(len(pdf_temp.pages)):
-                        writer.add_page(pdf_temp.pages[page_num])
-                # Adiciona a página atual.
-                writer.add_page(pag)
-                # Salva o arquivo
-                with open(file_name, "wb") as output_pdf:
-                    writer.write(output_pdf)
+                cpf = digitos(cpf)
+                file_name = f'Arquivos/{limpa(nome)}{cpf}.pdf'
+                # Adiciona a página atual ao arquivo do funcionário.
+                sink.add(file_name, pag, tipo=tipo, nome=nome, cpf=cpf)
+    # Salva os arquivos de todos os funcionários.
+    sink.close()
+    # Registra os arquivos somente depois que todas as saídas foram gravadas.
+    conclui(files)
     return tot_pags
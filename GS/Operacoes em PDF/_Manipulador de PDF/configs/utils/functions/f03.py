@@ -1,21 +1,22 @@
-from PyPDF2 import PdfReader
+from ..extract_functions import primeiras_paginas
+from ..quarentena_functions import protege
+from ..saida_functions import limpa, pasta
+from ..sink_functions import move
 from tqdm import tqdm
 import os
 
 
 def f03() -> int:
     # Cria a pasta de destino dos documentos
-    if not os.path.exists('Arquivos'):
-        os.mkdir('Arquivos')
+    pasta('Arquivos')
     tot_pags: int = 0
     # Itera por todos os arquivos .pdf.
     files = [file for file in os.listdir() if '.pdf' in file.lower()]
-    for file in tqdm(files):
-        with open(file, 'rb') as file_b:
-            pdf = PdfReader(file_b).pages[0]
-            rows = pdf.extract_text().split('\n')
+    # A primeira página de cada arquivo é lida em paralelo.
+    for file, rows, n_pags in tqdm(primeiras_paginas(files), total=len(files)):
+        with protege(file=file):
+            tot_pags += n_pags
             row = rows[-2]
             nome = row[:row.find(' - CPF/CNPJ: ')]
-            tot_pags += len(PdfReader(file_b).pages)
-        os.rename(file, f'Arquivos/BOLETO - {nome}.pdf')
+            move(file, f'Arquivos/BOLETO - {limpa(nome)}.pdf', nome=nome)
     return tot_pags
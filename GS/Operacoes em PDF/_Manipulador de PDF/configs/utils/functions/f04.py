@@ -1,30 +1,41 @@
-from PyPDF2 import PdfReader, PdfWriter
+from ..backend_functions import abre
+from ..campos_functions import digitos
+from ..diario_functions import concluindo, pendentes
+from ..extract_functions import paginas, prepara
+from ..perfil_functions import fase
+from ..quarentena_functions import nao_identificada, protege
+from ..saida_functions import limpa, pasta
+from ..sink_functions import grava
 from tqdm import tqdm
 import os
 
 
 def f04() -> int:
     # Cria a pasta de destino dos recibos
-    if not os.path.exists('Arquivos'):
-        os.mkdir('Arquivos')
+    pasta('Arquivos')
     tot_pags: int = 0
     # Itera por todos os arquivos .pdf.
-    for arq in [file for file in os.listdir() if '.pdf' in file]:
+    # Arquivos já processados por uma execução interrompida são pulados (ver diario_functions).
+    files = pendentes([file for file in os.listdir() if '.pdf' in file])
+    # Inicia a extração de texto de todos os arquivos.
+    prepara(files)
+    for arq in concluindo(files):
         with open(arq, 'rb') as file:
             # Cria um objeto PdfFileReader para ler o conteúdo do arquivo PDF
-            pdf_reader = PdfReader(file)
+            with fase('abertura', arq):
+                pdf_reader = abre(file)
             tot_pags += len(pdf_reader.pages)
             # Itera sobre todas as páginas do PDF
-            for page_pdf in tqdm(pdf_reader.pages):
-                page = page_pdf.extract_text().split('\n')
-                for i, row in enumerate(page):
-                    if 'UF:CEP:Data Vencimento: ' in row:
-                        condominio = row[row.rfind(':') + 2:]
-                        cnpj = ''.join(char for char in page[i + 1] if char.isnumeric())
-                        break
-                nome_arq = f'Arquivos/{condominio}-{cnpj}.pdf'
-                writer = PdfWriter()
-                writer.add_page(page_pdf)
-                with open(nome_arq, 'wb') as output:
-                    writer.write(output)
+            for page_pdf, page in tqdm(paginas(arq, pdf_reader), total=len(pdf_reader.pages)):
+                with protege(page_pdf):
+                    for i, row in enumerate(page):
+                        if 'UF:CEP:Data Vencimento: ' in row:
+                            condominio = row[row.rfind(':') + 2:]
+                            cnpj = digitos(page[i + 1])
+                            break
+                    else:
+                        nao_identificada(page_pdf, 'Condomínio não encontrado')
+                        continue
+                    nome_arq = f'Arquivos/{limpa(condominio)}-{cnpj}.pdf'
+                    grava(nome_arq, [page_pdf], condominio=condominio, cnpj=cnpj)
     return tot_pags
@@ -1,30 +1,39 @@
-from PyPDF2 import PdfReader, PdfWriter
+from ..backend_functions import abre
+from ..diario_functions import concluindo, pendentes
+from ..extract_functions import paginas, prepara
+from ..perfil_functions import fase
+from ..quarentena_functions import nao_identificada, protege
+from ..saida_functions import limpa, pasta
+from ..sink_functions import grava
 from tqdm import tqdm
 import os
 
 
 def f05() -> int:
-    if not os.path.exists('Arquivos'):
-        os.mkdir('Arquivos')
+    pasta('Arquivos')
     tot_pags: int = 0
 
-    for file in [file for file in os.listdir() if '.pdf' in file]:
+    # Arquivos já processados por uma execução interrompida são pulados (ver diario_functions).
+    files = pendentes([file for file in os.listdir() if '.pdf' in file])
+    # Inicia a extração de texto de todos os arquivos.
+    prepara(files)
+    for file in concluindo(files):
+        # A pasta do arquivo é criada junto da primeira saída (ver saida_functions).
         diretorio = f'Arquivos/{file[:-4]}'
-        if not os.path.exists(diretorio):
-            os.mkdir(diretorio)
         with open(file, 'rb') as file_b:
-            pdf = PdfReader(file_b)
+            with fase('abertura', file):
+                pdf = abre(file_b)
             tot_pags += len(pdf.pages)
             # Percorre todas as páginas do PDF.
-            for page in tqdm(pdf.pages):
-                rows = page.extract_text().split('\n')
-                for row in rows:
-                    if 'Dados Pessoais' in row:
-                        nome = row[:-14]
-                        break
-                writer = PdfWriter()
-                writer.add_page(page)
-                # Salva a página em um novo arquivo PDF
-                with open(f'{diretorio}/{nome}.pdf', 'wb') as output_file:
-                    writer.write(output_file)
+            for page, rows in tqdm(paginas(file, pdf), total=len(pdf.pages)):
+                with protege(page):
+                    for row in rows:
+                        if 'Dados Pessoais' in row:
+                            nome = row[:-14]
+                            break
+                    else:
+                        nao_identificada(page, 'Nome não encontrado')
+                        continue
+                    # Salva a página em um novo arquivo PDF
+                    grava(f'{diretorio}/{limpa(nome)}.pdf', [page], nome=nome)
     return tot_pags
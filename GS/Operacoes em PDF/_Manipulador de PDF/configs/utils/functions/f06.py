@@ -1,8 +1,38 @@
-from PyPDF2 import PdfReader, PdfWriter
+from ..backend_functions import abre
+from ..diario_functions import concluindo, pendentes
+from ..extract_functions import paginas, prepara, primeiras_paginas
+from ..group_functions import IGNORA, NaoIdentificada, Novo, classifica, separa
+from ..perfil_functions import fase
+from ..saida_functions import limpa, pasta
+from ..tabela_functions import indexa
 from tqdm import tqdm
+from functools import partial
 import pandas as pd
 import os
 
+# Apenas as 7 primeiras linhas são lidas: o tipo (linha 0) e a lotação (linhas 4 a 6).
+LINHAS_CABECALHO: int = 7
+
+
+def f06_chave(i: int, rows: list):
+    # `i` é 1 nos arquivos com a linha 'Estabelecimento:', que desloca a lotação uma linha para baixo.
+    tipo = ' '.join(rows[0].split()[:3])
+    # Verifica o tipo de arquivo
+    if tipo == 'Folha de Pagamento':
+        lotacao = rows[5+i]
+    elif tipo == 'Listagem de Férias':
+        lotacao = rows[4+i]
+    elif tipo == 'Listagem de Rescisão':
+        lotacao = rows[4+i]
+    else:
+        return NaoIdentificada(f'Tipo de documento não reconhecido: {tipo}')
+    if len(lotacao.split()[0]) > 3:
+        return IGNORA
+    # A página de resumo sempre inicia um novo arquivo.
+    if 'Total Geral ' in lotacao:
+        return Novo((tipo, lotacao))
+    return tipo, lotacao
+
 
 def f06() -> int:
     def get_tabela() -> pd.DataFrame:
@@ -13,55 +43,41 @@ def f06() -> int:
         return pd.read_csv(files[0], header=None, sep=';', encoding='latin1', names=['cod', 'nome', 'cnpj', 'tomador'])
 
     tot_pags = 0
-    df = get_tabela()
-    tem_relacao = len(df) > 0
+    # Índice lotação -> CNPJ, montado uma única vez.
+    lotacoes = indexa(get_tabela(), 'nome', 'cnpj')
+    lotacoes.avisa('lotações')
+    tem_relacao = len(lotacoes) > 0
     # Cria a pasta de destino dos recibos
-    if not os.path.exists('Arquivos'):
-        os.mkdir('Arquivos')
+    pasta('Arquivos')
+
+    # Arquivos já processados por uma execução interrompida são pulados (ver diario_functions).
+    files = pendentes([file for file in os.listdir() if '.pdf' in file])
+    # O deslocamento da lotação de cada arquivo vem da sua primeira página. Há uma chave para cada
+    # deslocamento, calculada nos processos do pool (ver group_functions.classifica), e a extração dos
+    # arquivos é iniciada com a chave de cada um.
+    deslocamentos = {file: int('Estabelecimento:' in rows[4]) for file, rows, _ in primeiras_paginas(files)}
+    chaves = {i: partial(f06_chave, i) for i in set(deslocamentos.values())}
+    classificadores = {i: classifica(chave) for i, chave in chaves.items()}
+    for i, classificador in classificadores.items():
+        prepara([file for file in files if deslocamentos[file] == i], LINHAS_CABECALHO, classificador)
+
+    def destino(chave):
+        tipo, lotacao = chave
+        cnpj = ''
+        if tem_relacao:
+            with fase('consulta'):
+                cnpj = lotacoes.busca(lotacao) or ''
+        # A pasta do tipo é criada junto da primeira saída (ver saida_functions).
+        return f'Arquivos/{tipo}/{limpa(lotacao)}-{cnpj}.pdf', {'tipo': tipo, 'lotacao': lotacao, 'cnpj': cnpj}
 
-    for arq in [file for file in os.listdir() if '.pdf' in file]:
+    for arq in concluindo(files):
         with open(arq, 'rb') as file:
             # Cria um objeto PdfFileReader para ler o conteúdo do arquivo PDF
-            pdf_reader = PdfReader(file)
+            with fase('abertura', arq):
+                pdf_reader = abre(file)
             tot_pags += len(pdf_reader.pages)
-            pdf_writer = PdfWriter()
-            lotacao = ''
-            i = 0
-            if 'Estabelecimento:' in pdf_reader.pages[0].extract_text().split('\n')[4]:
-                i = 1
-            for page_pdf in tqdm(pdf_reader.pages):
-                page = page_pdf.extract_text().split('\n')
-                tipo = ' '.join(page[0].split()[:3])
-                # Verifica o tipo de arquivo
-                if tipo == 'Folha de Pagamento':
-                    lotacao_nova = page[5+i]
-                elif tipo == 'Listagem de Férias':
-                    lotacao_nova = page[4+i]
-                elif tipo == 'Listagem de Rescisão':
-                    lotacao_nova = page[4+i]
-                else:
-                    print(tipo)
-                    continue
-                if len(lotacao_nova.split()[0]) > 3:
-                    continue
-                # Verifica se já há umas pasta para o tipo
-                if not os.path.exists(f'Arquivos/{tipo}'):
-                    os.mkdir(f'Arquivos/{tipo}')
-                # Verifica se está na página de resumo ou se a lotacao for a mesma, se sim,
-                # junta as páginas, caso contrário, salva o arquivo atual e cria um pdf novo.
-                if 'Total Geral ' in lotacao_nova or lotacao_nova != lotacao:
-                    if pdf_writer.pages:
-                        cnpj = ''
-                        if tem_relacao:
-                            result = df[df['nome'] == lotacao]['cnpj']
-                            if len(result) == 1:
-                                cnpj = result[0]
-                        file_name = f'Arquivos/{tipo}/{lotacao.replace('/', '')}-{cnpj}.pdf'
-                        with open(file_name, 'wb') as output_file:
-                            pdf_writer.write(output_file)
-                        pdf_writer = PdfWriter()
-                    lotacao = lotacao_nova
-                    pdf_writer.add_page(page_pdf)
-                else:
-                    pdf_writer.add_page(page_pdf)
+            i = deslocamentos[arq]
+            # Junta as páginas seguidas do mesmo tipo e lotação em um arquivo.
+            separa(tqdm(paginas(arq, pdf_reader, classificadores[i], n_linhas=LINHAS_CABECALHO),
+                        total=len(pdf_reader.pages)), chaves[i], destino)
     return tot_pags
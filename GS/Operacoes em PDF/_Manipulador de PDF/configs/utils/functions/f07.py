@@ -1,4 +1,11 @@
-from PyPDF2 import PdfReader, PdfWriter
+from ..backend_functions import abre
+from ..diario_functions import conclui, pendentes
+from ..extract_functions import paginas, prepara
+from ..perfil_functions import fase
+from ..quarentena_functions import nao_identificada, protege
+from ..saida_functions import pasta
+from ..sink_functions import PageSink
+from ..tabela_functions import indexa, so_digitos
 from tqdm import tqdm
 import pandas as pd
 import os
@@ -15,62 +22,55 @@ def f07() -> int:  # 7
 
     clientes: pd.DataFrame | None = get_de_para()
     tem_excel: bool = clientes is not None
+    # Índice CNPJ (apenas dígitos) -> nome do tomador, montado uma única vez.
+    nomes = indexa(clientes, 'Inscrição', 'Nome', so_digitos)
+    nomes.avisa('CNPJs')
     # Cria a pasta de destino dos recibos
-    if not os.path.exists('Arquivos do fgts'):
-        os.mkdir('Arquivos do fgts')
+    pasta('Arquivos do fgts')
     tot_pags: int = 0
 
-    for arq in [file for file in os.listdir() if '.pdf' in file]:
-        with open(arq, 'rb') as file:
-            # Cria um objeto PdfFileReader para ler o conteúdo do arquivo PDF
-            pdf_reader = PdfReader(file)
-            tot_pags += len(pdf_reader.pages)
-            # Itera sobre todas as páginas do PDF
-            for page_pdf in tqdm(pdf_reader.pages):
-                page = page_pdf.extract_text().split('\n')
-
+    # As páginas de cada tomador são acumuladas ao longo de todos os arquivos
+    # e cada arquivo de saída é salvo uma única vez no final.
+    sink = PageSink()
+    # Arquivos já processados por uma execução interrompida são pulados (ver diario_functions).
+    files = pendentes([file for file in os.listdir() if '.pdf' in file])
+    # Inicia a extração de texto de todos os arquivos.
+    prepara(files)
+    for arq in files:
+        # O documento recebe o caminho para manter o conteúdo em memória até o sink ser fechado.
+        with fase('abertura', arq):
+            pdf_reader = abre(arq)
+        tot_pags += len(pdf_reader.pages)
+        # Itera sobre todas as páginas do PDF
+        for page_pdf, page in tqdm(paginas(arq, pdf_reader), total=len(pdf_reader.pages)):
+            with protege(page_pdf):
                 if tem_excel:
                     if 'Tomador: ' in page[10]:
                         cnpj = page[10][page[10].find('Tomador: '):][9:]
                         if cnpj == 'Sem Tomador':
                             continue
 
-                        nome = clientes['Nome'][clientes['Inscrição'] == cnpj].values
-                        if len(nome) == 1:
-                            nome = nome[0].replace('/', '') + '.pdf'
+                        with fase('consulta'):
+                            nome = nomes.busca(cnpj)
+                        if nome is not None:
+                            nome = str(nome).replace('/', '') + '.pdf'
                         else:
                             nome = '_NaoEncontrados.pdf'
-
-                        pdf_writer = PdfWriter()
-                        # Adiciona a página atual ao objeto PdfWriter
-                        pdf_writer.add_page(page_pdf)
-
-                        # Verifica se o arquivo com este nome já existe, caso exista, junta-o com o novo arquivo
-                        if nome in os.listdir('Arquivos do fgts'):
-                            old_pdf = PdfReader(f'Arquivos do fgts/{nome}')
-                            for page in old_pdf.pages:
-                                pdf_writer.add_page(page)
-
-                        # Salva a página em um novo arquivo PDF
-                        with open(f'Arquivos do fgts/{nome}', 'wb') as output_file:
-                            pdf_writer.write(output_file)
+                        # Adiciona a página atual ao arquivo do tomador.
+                        sink.add(f'Arquivos do fgts/{nome}', page_pdf, cnpj=cnpj, nome=nome[:-4])
                 else:
                     for row in page:
                         if 'Tomador: ' in row:
                             cnpj = row[row.find('Tomador: ') + 9:]
                             nome = f'{cnpj.replace('/', '').replace('-', '').replace('.', '')}.pdf'
                             break
-                    pdf_writer = PdfWriter()
-                    # Adiciona a página atual ao objeto PdfWriter
-                    pdf_writer.add_page(page_pdf)
-
-                    # Verifica se o arquivo com este nome já existe, caso exista, junta-o com o novo arquivo
-                    if nome in os.listdir('Arquivos do fgts'):
-                        old_pdf = PdfReader(f'Arquivos do fgts/{nome}')
-                        for page in old_pdf.pages:
-                            pdf_writer.add_page(page)
-
-                    # Salva a página em um novo arquivo PDF
-                    with open(f'Arquivos do fgts/{nome}', 'wb') as output_file:
-                        pdf_writer.write(output_file)
+                    else:
+                        nao_identificada(page_pdf, 'Tomador não encontrado')
+                        continue
+                    # Adiciona a página atual ao arquivo do tomador.
+                    sink.add(f'Arquivos do fgts/{nome}', page_pdf, cnpj=cnpj, nome=nome[:-4])
+    # Salva os arquivos de todos os tomadores.
+    sink.close()
+    # Registra os arquivos somente depois que todas as saídas foram gravadas.
+    conclui(files)
     return tot_pags
@@ -1,7 +1,20 @@
-from PyPDF2 import PdfReader, PdfWriter
+from ..backend_functions import abre
+from ..diario_functions import concluindo, pendentes
+from ..extract_functions import paginas, prepara
+from ..group_functions import classifica, separa
+from ..perfil_functions import fase
+from ..saida_functions import limpa, pasta
 from tqdm import tqdm
 import os
 
+# Apenas as 7 primeiras linhas são lidas, a lotação está na linha 6.
+LINHAS_CABECALHO: int = 7
+
+
+def f08_chave(rows: list) -> str:
+    # Acessa a lotação
+    return rows[6]
+
 
 def f08() -> int:
     """
@@ -9,35 +22,26 @@ def f08() -> int:
     e separa em subarquivos, agrupados pela lotação.
     """
     # Cria a pasta de destino dos recibos
-    if not os.path.exists('Arquivos'):
-        os.mkdir('Arquivos')
+    pasta('Arquivos')
     tot_pags: int = 0
 
-    for arq in [file for file in os.listdir() if '.pdf' in file]:
-        folder_name = arq.replace('.pdf', '').replace('/', '')
-        if not os.path.exists(f'Arquivos/{folder_name}'):
-            os.mkdir(f'Arquivos/{folder_name}')
+    # Arquivos já processados por uma execução interrompida são pulados (ver diario_functions).
+    files = pendentes([file for file in os.listdir() if '.pdf' in file])
+    # Inicia a extração de texto de todos os arquivos. A chave de cada página é calculada junto da extração,
+    # nos processos do pool, inclusive nas partes de um mesmo arquivo grande (ver group_functions.classifica).
+    classificador = classifica(f08_chave)
+    prepara(files, LINHAS_CABECALHO, classificador)
+    for arq in concluindo(files):
+        # A pasta do arquivo é criada junto da primeira saída (ver saida_functions).
+        folder_name = limpa(arq.replace('.pdf', ''))
 
         with open(arq, 'rb') as file:
             # Cria um objeto PdfFileReader para ler o conteúdo do arquivo PDF
-            pdf_reader = PdfReader(file)
-            pdf_writer = PdfWriter()
-            lotacao = ''
+            with fase('abertura', arq):
+                pdf_reader = abre(file)
             tot_pags += len(pdf_reader.pages)
-            for page_pdf in tqdm(pdf_reader.pages):
-                page = page_pdf.extract_text().split('\n')
-                # Acessa a lotação
-                lotacao_nova = page[6]
-                # Verifica se a lotação é a mesma, se for, junta as páginas,
-                # caso contrário, salva o arquivo atual e cria um pdf novo.
-                if lotacao_nova != lotacao:
-                    if pdf_writer.pages:
-                        with open(f'Arquivos/{folder_name}/{lotacao}.pdf', 'wb') as output_file:
-                            pdf_writer.write(output_file)
-                        pdf_writer = PdfWriter()
-                    lotacao = lotacao_nova
-                    pdf_writer.add_page(page_pdf)
-                else:
-                    pdf_writer.add_page(page_pdf)
-            # Não é necessário salvar o último arquivo em memória, pois é apenas o resumo.
+            # Junta as páginas seguidas da mesma lotação em um arquivo.
+            # A última lotação (o resumo) também é salva.
+            separa(tqdm(paginas(arq, pdf_reader, classificador, n_linhas=LINHAS_CABECALHO), total=len(pdf_reader.pages)),
+                   f08_chave, lambda lotacao: (f'Arquivos/{folder_name}/{limpa(lotacao)}.pdf', {'lotacao': lotacao}))
     return tot_pags
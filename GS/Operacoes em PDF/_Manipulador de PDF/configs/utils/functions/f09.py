@@ -1,48 +1,70 @@
-import os
-from PyPDF2 import PdfReader, PdfWriter
+from ..backend_functions import abre
+from ..campos_functions import digitos
+from ..diario_functions import conclui, pendentes
+from ..extract_functions import paginas, prepara
+from ..perfil_functions import fase
+from ..quarentena_functions import aplica, protege
+from ..saida_functions import limpa, pasta
+from ..sink_functions import PageSink, grava
 from tqdm import tqdm
+import os
+
+# Apenas as 12 primeiras linhas são lidas: CNPJ (linha 5), lotação (linha 9) e nome (linha 11).
+LINHAS_CABECALHO: int = 12
+
 
+def f09_campos(rows: list) -> tuple:
+    # Lotação, CNPJ e nome do empregado.
+    return rows[9][:-5], digitos(rows[5].split()[1]), rows[11]
 
-def f09() -> int:
+
+# Modos de separação aceitos pela linha de comando e a escolha equivalente do menu.
+MODOS = {'funcionario': '1', 'lotacao': '2'}
+
+
+def f09(modo: str | None = None) -> int:
+    """
+    Separa os recibos de pagamento do Fortes por funcionário ou por lotação.
+    Args:
+        modo (str): 'funcionario' ou 'lotacao'. Se não for informado, a escolha é pedida ao usuário.
+    """
     tot_pags = 0
     # Cria a pasta de destino dos recibos
-    if not os.path.exists('Recibos'):
-        os.mkdir('Recibos')
+    pasta('Recibos')
 
-    escolha = ''
+    escolha = MODOS.get(modo, '')
     while escolha not in ['1', '2']:
         print('-'*50)
         escolha = input('1: Separar por funcionário.\n'
                         '2: Separar por Lotação.\n'
                         'Escolha: ')
 
-    files = [file for file in os.listdir() if '.pdf' in file]
-
+    # Arquivos já processados por uma execução interrompida são pulados (ver diario_functions).
+    files = pendentes([file for file in os.listdir() if '.pdf' in file])
+    # Inicia a extração de texto de todos os arquivos.
+    prepara(files, LINHAS_CABECALHO)
+    # Na separação por lotação, as páginas de cada lotação são acumuladas e
+    # cada arquivo de saída é salvo uma única vez no final.
+    sink = PageSink()
     for arq in files:
-        with open(arq, 'rb') as file:
-            # Cria um objeto PdfFileReader para ler o conteúdo do arquivo PDF
-            pdf = PdfReader(file)
-            tot_pags += len(pdf.pages)
-            for pag in tqdm(pdf.pages):
-                writer = PdfWriter()
-                rows = pag.extract_text().split('\n')
-                lotacao = rows[9][:-5]
-                cnpj = ''.join(char for char in rows[5].split()[1] if char.isnumeric())
+        # O documento recebe o caminho para manter o conteúdo em memória até o sink ser fechado.
+        with fase('abertura', arq):
+            pdf = abre(arq)
+        tot_pags += len(pdf.pages)
+        for pag, rows in tqdm(paginas(arq, pdf, n_linhas=LINHAS_CABECALHO), total=len(pdf.pages)):
+            with protege(pag):
+                # Se o cabeçalho não tiver as linhas esperadas, a página inteira é lida antes de ser separada.
+                lotacao, cnpj, nome = aplica(f09_campos, pag, rows)
                 if escolha == '1':
-                    # Acessa a linha que contém o nome do empregado.
-                    nome = rows[11]
-                    file_name = f'Recibos\\{lotacao}-{nome}-{cnpj}.pdf'.replace('/', '')
+                    file_name = f'Recibos\\{limpa(lotacao)}-{limpa(nome)}-{cnpj}.pdf'
+                    # Salva o arquivo
+                    grava(file_name, [pag], lotacao=lotacao, nome=nome, cnpj=cnpj)
                 else:
-                    file_name = f'Recibos\\{lotacao}-{cnpj}.pdf'.replace('/', '')
-                    # Verifica se já existe um arquivo para esta lotação.
-                    if os.path.exists(file_name):
-                        pdf_reader_temp = PdfReader(file_name)
-                        # Copia todas as páginas do documento da lotação para o writer.
-                        for page_num in range(len(pdf_reader_temp.pages)):
-                            writer.add_page(pdf_reader_temp.pages[page_num])
-                # Adiciona a página atual
-                writer.add_page(pag)
-                # Salva o arquivo
-                with open(file_name, "wb") as output_pdf:
-                    writer.write(output_pdf)
+                    file_name = f'Recibos\\{limpa(lotacao)}-{cnpj}.pdf'
+                    # Adiciona a página atual ao arquivo da lotação.
+                    sink.add(file_name, pag, lotacao=lotacao, cnpj=cnpj)
+    # Salva os arquivos de todas as lotações.
+    sink.close()
+    # Registra os arquivos somente depois que todas as saídas foram gravadas.
+    conclui(files)
     return tot_pags
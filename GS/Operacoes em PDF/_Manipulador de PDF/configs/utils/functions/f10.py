@@ -1,24 +1,36 @@
-from PyPDF2 import PdfReader, PdfWriter
+from ..backend_functions import abre
+from ..diario_functions import concluindo, pendentes
+from ..extract_functions import paginas, prepara
+from ..perfil_functions import fase
+from ..quarentena_functions import aplica, protege
+from ..saida_functions import limpa, pasta
+from ..sink_functions import grava
 from tqdm import tqdm
 import os
 
+# Apenas as 2 primeiras linhas são lidas, o nome está na linha 1.
+LINHAS_CABECALHO: int = 2
+
+
+def f10_nome(rows: list) -> str:
+    return rows[1][rows[1].find('.')+1:]
+
 
 def f10() -> int:
-    if not os.path.exists('Arquivos'):
-        os.mkdir('Arquivos')
+    pasta('Arquivos')
     tot_pags: int = 0
 
-    files = [file for file in os.listdir() if '.pdf' in file.lower()]
-
-    for file in files:
-        with open(file, 'rb') as file_b:
-            pdf = PdfReader(file)
+    # Arquivos já processados por uma execução interrompida são pulados (ver diario_functions).
+    files = pendentes([file for file in os.listdir() if '.pdf' in file.lower()])
+    # Inicia a extração de texto de todos os arquivos.
+    prepara(files, LINHAS_CABECALHO)
+    for file in concluindo(files):
+        with fase('abertura', file):
+            pdf = abre(file)
         tot_pags += len(pdf.pages)
-        for page in tqdm(pdf.pages):
-            rows = page.extract_text().split('\n')
-            nome = rows[1][rows[1].find('.')+1:]
-            writer = PdfWriter()
-            writer.add_page(page)
-            with open(f'Arquivos/RECIBO - {nome}.pdf', 'wb') as output:
-                writer.write(output)
+        for page, rows in tqdm(paginas(file, pdf, n_linhas=LINHAS_CABECALHO), total=len(pdf.pages)):
+            with protege(page):
+                # Se o cabeçalho não tiver as linhas esperadas, a página inteira é lida antes de ser separada.
+                nome = aplica(f10_nome, page, rows)
+                grava(f'Arquivos/RECIBO - {limpa(nome)}.pdf', [page], nome=nome)
     return tot_pags
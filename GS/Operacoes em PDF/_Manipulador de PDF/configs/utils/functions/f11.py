@@ -1,28 +1,41 @@
-from PyPDF2 import PdfReader, PdfWriter
+from ..backend_functions import abre
+from ..diario_functions import concluindo, pendentes
+from ..extract_functions import paginas, prepara
+from ..perfil_functions import fase
+from ..quarentena_functions import aplica, protege
+from ..saida_functions import pasta
+from ..sink_functions import grava
 from tqdm import tqdm
 import os
 
+# Apenas a primeira linha é lida, ela contém a lotação.
+LINHAS_CABECALHO: int = 1
+
+
+def f11_lotacao(rows: list) -> str:
+    return rows[0].replace('.', '').replace('/', '').replace('\\', '')[:-37]
+
 
 def f11() -> int:
     # Cria a pasta de destino dos arquivos
-    if not os.path.exists('Arquivos'):
-        os.mkdir('Arquivos')
+    pasta('Arquivos')
     tot_pags: int = 0
-    for arq in [file for file in os.listdir() if '.pdf' in file]:
+    # Arquivos já processados por uma execução interrompida são pulados (ver diario_functions).
+    files = pendentes([file for file in os.listdir() if '.pdf' in file])
+    # Inicia a extração de texto de todos os arquivos.
+    prepara(files, LINHAS_CABECALHO)
+    for arq in concluindo(files):
         with open(arq, 'rb') as file:
             # Cria um objeto PdfFileReader para ler o conteúdo do arquivo PDF
-            pdf_reader = PdfReader(file)
+            with fase('abertura', arq):
+                pdf_reader = abre(file)
             tot_pags += len(pdf_reader.pages)
             # Itera sobre todas as páginas do PDF
-            for page in tqdm(pdf_reader.pages):
-                rows = page.extract_text().split('\n')
-
-                lotacao = rows[0].replace('.', '').replace('/', '').replace('\\', '')[:-37]
+            for page, rows in tqdm(paginas(arq, pdf_reader, n_linhas=LINHAS_CABECALHO), total=len(pdf_reader.pages)):
+                with protege(page):
+                    # Se o cabeçalho não tiver as linhas esperadas, a página inteira é lida antes de ser separada.
+                    lotacao = aplica(f11_lotacao, page, rows)
 
-                pdf_writer = PdfWriter()
-                # Adiciona a página atual ao objeto PdfWriter
-                pdf_writer.add_page(page)
-                # Salva a página em um novo arquivo PDF
-                with open(f'Arquivos/{lotacao}.pdf', 'wb') as output_file:
-                    pdf_writer.write(output_file)
+                    # Salva a página em um novo arquivo PDF
+                    grava(f'Arquivos/{lotacao}.pdf', [page], lotacao=lotacao)
     return tot_pags
@@ -1,49 +1,49 @@
-from PyPDF2 import PdfReader, PdfWriter
+from ..backend_functions import abre
+from ..campos_functions import digitos
+from ..diario_functions import concluindo, pendentes
+from ..extract_functions import paginas, prepara
+from ..group_functions import CONTINUA, NaoIdentificada, classifica, separa
+from ..perfil_functions import fase
+from ..saida_functions import limpa, pasta
 from tqdm import tqdm
+import re
 import os
 
 
+# Linha da empresa: 'Empresa: <nome> - <CNPJ> Pág'. O nome vai até o primeiro ' - ' e o CNPJ é a última
+# palavra com dígitos da linha, até o último dígito.
+EMPRESA = re.compile(r'Empresa:(.*?)\s-\s.*(?<!\S)(\S*\d)')
+
+
+def f12_chave(rows: list):
+    # Acessa o nome e CNPJ da empresa
+    for row in rows:
+        if 'Empresa: ' in row:
+            match = EMPRESA.search(row)
+            if match is None:
+                return NaoIdentificada('Nome e CNPJ da empresa não encontrados')
+            return ' '.join(match.group(1).split()), digitos(match.group(2))
+    # Sem a linha da empresa, a página continua a empresa anterior.
+    return CONTINUA
+
+
 def f12() -> int:  # 12
     # Cria a pasta de destino dos recibos
-    if not os.path.exists('Arquivos'):
-        os.mkdir('Arquivos')
+    pasta('Arquivos')
     tot_pags: int = 0
-    for arq in [file for file in os.listdir() if '.pdf' in file]:
+    # Arquivos já processados por uma execução interrompida são pulados (ver diario_functions).
+    files = pendentes([file for file in os.listdir() if '.pdf' in file])
+    # Inicia a extração de texto de todos os arquivos. A chave de cada página é calculada junto da extração,
+    # nos processos do pool, inclusive nas partes de um mesmo arquivo grande (ver group_functions.classifica).
+    classificador = classifica(f12_chave)
+    prepara(files, parser=classificador)
+    for arq in concluindo(files):
         with open(arq, 'rb') as file:
             # Cria um objeto PdfFileReader para ler o conteúdo do arquivo PDF
-            pdf_reader = PdfReader(file)
-            pdf_writer = PdfWriter()
-            empresa = ''
+            with fase('abertura', arq):
+                pdf_reader = abre(file)
             tot_pags += len(pdf_reader.pages)
-            for page_pdf in tqdm(pdf_reader.pages):
-                page = page_pdf.extract_text().split('\n')
-                # Acessa o nome e CNPJ da empresa
-                for row in page:
-                    if 'Empresa: ' in row:
-                        idx = 1
-                        while not row[-idx].isnumeric():
-                            idx += 1
-                        row = row[8:1 - idx].split()
-                        cnpj = ''.join(i for i in row[-1] if i.isnumeric())
-                        idx = 0
-                        while row[idx] != '-':
-                            idx += 1
-                        empresa_nova = ' '.join(row[:idx])
-                        break
-
-                # Verifica se a empresa e a mesma, se for, junta as páginas,
-                # caso contrário, salva o arquivo atual e cria um pdf novo.
-                if empresa_nova != empresa:
-                    if pdf_writer.pages:
-                        with open(f'Arquivos/{empresa}-{cnpj}.pdf', 'wb') as output_file:
-                            pdf_writer.write(output_file)
-                        pdf_writer = PdfWriter()
-                    empresa = empresa_nova
-                    pdf_writer.add_page(page_pdf)
-                else:
-                    pdf_writer.add_page(page_pdf)
-            # Salva o último arquivo aberto
-            with open(f'Arquivos/{empresa}-{cnpj}.pdf', 'wb') as output_file:
-                pdf_writer.write(output_file)
-            pdf_writer = PdfWriter()
+            # Junta as páginas seguidas da mesma empresa em um arquivo.
+            separa(tqdm(paginas(arq, pdf_reader, classificador), total=len(pdf_reader.pages)), f12_chave,
+                   lambda chave: (f'Arquivos/{limpa(chave[0])}-{chave[1]}.pdf', {'empresa': chave[0], 'cnpj': chave[1]}))
     return tot_pags
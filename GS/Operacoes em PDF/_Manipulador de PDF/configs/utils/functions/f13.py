@@ -1,4 +1,8 @@
-from PyPDF2 import PdfReader
+from ..campos_functions import digitos
+from ..extract_functions import primeiras_paginas
+from ..quarentena_functions import nao_identificado, protege
+from ..saida_functions import limpa
+from ..sink_functions import move
 from tqdm import tqdm
 import os
 
@@ -7,33 +11,37 @@ def f13() -> int:
     tot_pags: int = 0
 
     files = [file for file in os.listdir() if '.pdf' in file.lower()]
-    for file in tqdm(files):
-        with open(file, 'rb') as file_b:
-            pdf = PdfReader(file_b).pages[0]
-            rows = pdf.extract_text().split('\n')
-            tot_pags += len(PdfReader(file_b).pages)
-        if rows[0] == 'Número da':
-            # Modelo 1
-            cnpj = ' ERRO '
-            num_nf = ''.join(i for i in rows[1].split()[0] if i.isnumeric())
-            for row in rows:
-                if 'Complemento:' in row:
-                    nome = row[12:].strip()
-                    break
-        elif rows[0] == 'Dados do Prestador de Serviços':
-            # modelo 2
-            primeiro = True
-            for i, row in enumerate(rows):
-                if row == 'NFS-e':
-                    num_nf = rows[i + 1]
-                if row == 'Razão Social/Nome':
-                    if primeiro:
-                        primeiro = False
-                    else:
-                        nome = rows[i + 1]
-                        cnpj = ''.join([char for char in rows[i + 3] if char.isnumeric()])
+    # A primeira página de cada arquivo é lida em paralelo.
+    for file, rows, n_pags in tqdm(primeiras_paginas(files), total=len(files)):
+        with protege(file=file):
+            tot_pags += n_pags
+            nome = num_nf = None
+            if rows[0] == 'Número da':
+                # Modelo 1
+                cnpj = ' ERRO '
+                num_nf = digitos(rows[1].split()[0])
+                for row in rows:
+                    if 'Complemento:' in row:
+                        nome = row[12:].strip()
                         break
-        else:
-            continue
-        os.rename(file, f'NF {nome}-{cnpj}.pdf')
+            elif rows[0] == 'Dados do Prestador de Serviços':
+                # modelo 2
+                primeiro = True
+                for i, row in enumerate(rows):
+                    if row == 'NFS-e':
+                        num_nf = rows[i + 1]
+                    if row == 'Razão Social/Nome':
+                        if primeiro:
+                            primeiro = False
+                        else:
+                            nome = rows[i + 1]
+                            cnpj = digitos(rows[i + 3])
+                            break
+            else:
+                nao_identificado(file, f'Modelo de nota fiscal não reconhecido: {rows[0]}')
+                continue
+            if nome is None or num_nf is None:
+                nao_identificado(file, 'Nome ou número da nota não encontrados')
+                continue
+            move(file, f'NF {limpa(nome)}-{cnpj}.pdf', nome=nome, cnpj=cnpj, num_nf=num_nf)
     return tot_pags
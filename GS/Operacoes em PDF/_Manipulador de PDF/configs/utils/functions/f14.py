@@ -1,31 +1,42 @@
-from PyPDF2 import PdfReader, PdfWriter
+from ..backend_functions import abre
+from ..diario_functions import concluindo, pendentes
+from ..extract_functions import paginas, prepara
+from ..perfil_functions import fase
+from ..quarentena_functions import nao_identificada, protege
+from ..saida_functions import limpa, pasta
+from ..sink_functions import grava
 from tqdm import tqdm
 import os
 
 
 def f14() -> int:
-    if not os.path.exists('Arquivos'):
-        os.mkdir('Arquivos')
+    pasta('Arquivos')
     n_pags = 0
-    files = [file for file in os.listdir() if '.pdf' in file.lower()]
-    for file in files:
-        with open(file, 'rb') as file:
-            pdf_reader = PdfReader(file)
+    # Arquivos já processados por uma execução interrompida são pulados (ver diario_functions).
+    files = pendentes([file for file in os.listdir() if '.pdf' in file.lower()])
+    # Inicia a extração de texto de todos os arquivos.
+    prepara(files)
+    for file in concluindo(files):
+        with open(file, 'rb') as file_b:
+            with fase('abertura', file):
+                pdf_reader = abre(file_b)
             n_pags = len(pdf_reader.pages)
-            for page in tqdm(pdf_reader.pages):
-                rows = page.extract_text().split()
-                start = 4
-                for i, row in enumerate(rows):
-                    if row in ['LTDA', 'S/A', 'BEM-TE-VI', 'CONDOMINIOS', 'Ltda', 'REMOTA',
-                               'EIRELI', 'ME', 'PINHO', 'EMPRESARIAL', 'S.A.']:
-                        start = i + 1
-                        break
-                for i, row in enumerate(rows):
-                    if 'DEMONSTRATIVO' in row:
-                        nome = ' '.join(rows[start:i]+[row[:-13]])
-                        break
-                pdf_writer = PdfWriter()
-                pdf_writer.add_page(page)
-                with open(f'Arquivos/{nome}.pdf', 'wb') as output:
-                    pdf_writer.write(output)
+            for page, rows in tqdm(paginas(file, pdf_reader), total=len(pdf_reader.pages)):
+                with protege(page):
+                    # Separa o texto da página em palavras.
+                    rows = '\n'.join(rows).split()
+                    start = 4
+                    for i, row in enumerate(rows):
+                        if row in ['LTDA', 'S/A', 'BEM-TE-VI', 'CONDOMINIOS', 'Ltda', 'REMOTA',
+                                   'EIRELI', 'ME', 'PINHO', 'EMPRESARIAL', 'S.A.']:
+                            start = i + 1
+                            break
+                    for i, row in enumerate(rows):
+                        if 'DEMONSTRATIVO' in row:
+                            nome = ' '.join(rows[start:i]+[row[:-13]])
+                            break
+                    else:
+                        nao_identificada(page, 'Nome não encontrado')
+                        continue
+                    grava(f'Arquivos/{limpa(nome)}.pdf', [page], nome=nome)
     return n_pags
@@ -1,4 +1,8 @@
-from PyPDF2 import PdfReader
+from ..campos_functions import digitos
+from ..extract_functions import primeiras_paginas
+from ..quarentena_functions import protege
+from ..saida_functions import limpa
+from ..sink_functions import move
 from tqdm import tqdm
 import os
 
@@ -7,13 +11,12 @@ def f15() -> int:
     n_pags = 0
     files = [file for file in os.listdir() if '.pdf' in file.lower()]
 
-    for file in tqdm(files):
-        with open(file, 'rb') as file_b:
-            pdf = PdfReader(file_b)
-            n_pags += len(pdf.pages)
-            rows = pdf.pages[0].extract_text().split('\n')
+    # A primeira página de cada arquivo é lida em paralelo.
+    for file, rows, n_pags_arq in tqdm(primeiras_paginas(files), total=len(files)):
+        with protege(file=file):
+            n_pags += n_pags_arq
             nome = rows[-3].split('Endereço')[-1]
-            cnpj = ''.join([char for char in rows[-1].split()[0] if char.isnumeric()])
-            nome_arq = f'{nome}-{cnpj}.pdf'
-        os.rename(file, nome_arq)
+            cnpj = digitos(rows[-1].split()[0])
+            nome_arq = f'{limpa(nome)}-{cnpj}.pdf'
+            move(file, nome_arq, nome=nome, cnpj=cnpj)
     return n_pags
@@ -1,27 +1,38 @@
-from PyPDF2 import PdfReader, PdfWriter
+from ..backend_functions import abre
+from ..diario_functions import concluindo, pendentes
+from ..extract_functions import paginas, prepara
+from ..group_functions import CONTINUA, Novo, classifica, separa
+from ..perfil_functions import fase
+from ..saida_functions import pasta
 from tqdm import tqdm
 import os
 
+# Apenas as 2 primeiras linhas são lidas: o início da carta (linha 0) e o nome (linha 1).
+LINHAS_CABECALHO: int = 2
+
+
+def f16_chave(rows: list):
+    # Cada carta começa com 'Prezados, ' e o nome do destinatário logo abaixo.
+    if rows[0] == 'Prezados, ':
+        return Novo(rows[1].replace('/', ''))
+    return CONTINUA
+
 
 def f16() -> int:
     n_pags = 0
-    if not os.path.exists('Cartas'):
-        os.mkdir('Cartas')
-    files = [file for file in os.listdir() if '.pdf' in file.lower()]
+    pasta('Cartas')
+    # Arquivos já processados por uma execução interrompida são pulados (ver diario_functions).
+    files = pendentes([file for file in os.listdir() if '.pdf' in file.lower()])
+    # Inicia a extração de texto de todos os arquivos. A chave de cada página é calculada junto da extração,
+    # nos processos do pool, inclusive nas partes de um mesmo arquivo grande (ver group_functions.classifica).
+    classificador = classifica(f16_chave)
+    prepara(files, LINHAS_CABECALHO, classificador)
 
-    for file in files:
-        writer = PdfWriter()
-        primeiro = True
+    for file in concluindo(files):
         with open(file, 'rb') as file_b:
-            pdf = PdfReader(file_b)
+            with fase('abertura', file):
+                pdf = abre(file_b)
             n_pags += len(pdf.pages)
-            for page in tqdm(pdf.pages):
-                rows = page.extract_text().split('\n')
-                nome = rows[1].replace('/', '')
-                if rows[0] == 'Prezados, ' and not primeiro:
-                    with open(f'Cartas/{nome}.pdf', 'wb') as output:
-                        writer.write(output)
-                    writer = PdfWriter()
-                writer.add_page(page)
-                primeiro = False
-    return n_pags
\ No newline at end of file
+            separa(tqdm(paginas(file, pdf, classificador, n_linhas=LINHAS_CABECALHO), total=len(pdf.pages)), f16_chave,
+                   lambda nome: (f'Cartas/{nome}.pdf', {'nome': nome}))
+    return n_pags
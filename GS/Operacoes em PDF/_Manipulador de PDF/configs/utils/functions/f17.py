@@ -1,20 +1,33 @@
-from PyPDF2 import PdfReader, PdfWriter
+from ..backend_functions import abre
+from ..diario_functions import conclui, pendentes
+from ..extract_functions import paginas, prepara
+from ..perfil_functions import fase
+from ..quarentena_functions import nao_identificada, protege
+from ..saida_functions import limpa, pasta
+from ..sink_functions import grava
 from tqdm import tqdm
 import os
 
 
 def f17() -> int:
     tot_pags = 0
-    files = [file for file in os.listdir() if '.pdf' in file.lower()]
-    writer = PdfWriter()
-    if not os.path.exists('Arquivos'):
-        os.mkdir('Arquivos')
+    # Arquivos já processados por uma execução interrompida são pulados (ver diario_functions).
+    files = pendentes([file for file in os.listdir() if '.pdf' in file.lower()])
+    # Inicia a extração de texto de todos os arquivos.
+    prepara(files)
+    grupo = []
+    nome = cpf = None
+    pasta('Arquivos')
+    # Um par de páginas pode começar em um arquivo e terminar no seguinte, então os arquivos só são
+    # registrados como concluídos depois da última gravação (ver diario_functions).
     for file in files:
-        with (open(file, 'rb') as file_b):
-            pdf = PdfReader(file_b)
-            tot_pags += len(pdf.pages)
-            for page in tqdm(pdf.pages):
-                rows = page.extract_text().split('\n')
+        # O documento recebe o caminho para manter o conteúdo em memória, pois as páginas
+        # de um arquivo podem ser gravadas junto das do arquivo seguinte.
+        with fase('abertura', file):
+            pdf = abre(file)
+        tot_pags += len(pdf.pages)
+        for page, rows in tqdm(paginas(file, pdf), total=len(pdf.pages)):
+            with protege(page):
                 if len(rows) == 1:
                     continue
                 for i, row in enumerate(rows):
@@ -23,10 +36,16 @@ def f17() -> int:
                         cpf = row[2]
                         nome = ' '.join(row[5:-1])
                         break
-                writer.add_page(page)
-                if len(writer.pages) == 2:
-                    file_name = f'Arquivos/{nome}-{cpf}.pdf'
-                    with open(file_name, 'wb') as output:
-                        writer.write(output)
-                    writer = PdfWriter()
+                grupo.append(page)
+                if len(grupo) == 2:
+                    if nome is None:
+                        # Nenhuma página até aqui tinha o CPF.
+                        for pagina in grupo:
+                            nao_identificada(pagina, 'Nome e CPF não encontrados')
+                    else:
+                        file_name = f'Arquivos/{limpa(nome)}-{cpf}.pdf'
+                        grava(file_name, grupo, nome=nome, cpf=cpf)
+                    grupo = []
+    # Registra os arquivos somente depois que todas as saídas foram gravadas.
+    conclui(files)
     return tot_pags
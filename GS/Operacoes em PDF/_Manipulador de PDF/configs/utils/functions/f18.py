@@ -1,51 +1,56 @@
-from PyPDF2 import PdfReader, PdfWriter
+from ..backend_functions import abre
+from ..campos_functions import digitos
+from ..diario_functions import conclui, pendentes
+from ..extract_functions import paginas, prepara
+from ..group_functions import CONTINUA, NaoIdentificada, Novo, classifica, separa
+from ..perfil_functions import fase
+from ..saida_functions import pasta
 from tqdm import tqdm
 import os
 
 
+def f18_chave(rows: list):
+    # MINISTÉRIO DA FAZENDA indica o começo de um novo funcionário, as demais páginas são do atual.
+    if rows[0] != 'MINISTÉRIO DA FAZENDA':
+        return CONTINUA
+    # Guarda o CNPJ da empresa.
+    cnpj = digitos(rows[7])
+    # Procura o nome e CPF no novo documento.
+    for i, row in enumerate(rows):
+        if 'Título de Eleitor' in row:
+            cpf = digitos(row)
+            nome = rows[i+2]
+            for char in ['|', '/', '\\']:
+                nome = nome.replace(char, '')
+            return Novo((nome, cpf, cnpj))
+    return NaoIdentificada('Nome e CPF não encontrados')
+
+
 def f18() -> int:
     tot_pags = 0
-    if not os.path.exists('Arquivos'):
-        os.mkdir('Arquivos')
-    writer = PdfWriter()
-    cpf = ''
-    nome = ''
-    files = [file for file in os.listdir() if '.pdf' in file.lower()]
-    for file in files:
-        with open(file, 'rb') as file_b:
-            pdf = PdfReader(file_b)
+    pasta('Arquivos')
+    # Arquivos já processados por uma execução interrompida são pulados (ver diario_functions).
+    files = pendentes([file for file in os.listdir() if '.pdf' in file.lower()])
+    # Inicia a extração de texto de todos os arquivos. A chave de cada página é calculada junto da extração,
+    # nos processos do pool, inclusive nas partes de um mesmo arquivo grande (ver group_functions.classifica).
+    classificador = classifica(f18_chave)
+    prepara(files, parser=classificador)
+
+    def todas_paginas():
+        nonlocal tot_pags
+        for file in files:
+            # O documento recebe o caminho para manter o conteúdo em memória, pois as páginas
+            # de um arquivo podem ser gravadas junto das do arquivo seguinte.
+            with fase('abertura', file):
+                pdf = abre(file)
             tot_pags += len(pdf.pages)
-            for page in tqdm(pdf.pages):
-                rows = page.extract_text().split('\n')
-                if rows[0] == 'MINISTÉRIO DA FAZENDA':
-                    # MINISTÉRIO DA FAZENDA indica o começo de um novo funcionário, então o
-                    # conteúdo atual é salvo, se existir.
-                    if len(writer.pages):
-                        file_name = f'Arquivos/{nome}-{cpf}-{cnpj}.pdf'
-                        with open(file_name, 'wb') as output:
-                            writer.write(output)
-                        # Inicia um novo writer
-                        writer = PdfWriter()
-                    writer.add_page(page)
-                    # Guarda o CNPJ da empresa.
-                    cnpj = ''.join(char for char in rows[7] if char.isnumeric())
-                    # Procura o nome e CPF no novo documento.
-                    for i, row in enumerate(rows):
-                        achou = False
-                        if 'Título de Eleitor' in row:
-                            achou = True
-                            cpf = ''.join(char for char in row if char.isnumeric())
-                            nome = rows[i+2]
-                            for char in ['|', '/', '\\']:
-                                nome = nome.replace(char, '')
-                            break
-                    if not achou:
-                        raise Exception(f'Nome e CPF não encontrados: {file}')
-                else:
-                    writer.add_page(page)
-            # Salva o último aberto
-            file_name = f'Arquivos/{nome}-{cpf}.pdf'
-            with open(file_name, 'wb') as output:
-                writer.write(output)
+            yield from tqdm(paginas(file, pdf, classificador), total=len(pdf.pages))
 
+    # Um funcionário pode continuar no arquivo seguinte, então as páginas de todos os arquivos
+    # são agrupadas juntas.
+    separa(todas_paginas(), f18_chave,
+           lambda chave: (f'Arquivos/{chave[0]}-{chave[1]}-{chave[2]}.pdf',
+                          {'nome': chave[0], 'cpf': chave[1], 'cnpj': chave[2]}))
+    # Registra os arquivos somente depois que todas as saídas foram gravadas.
+    conclui(files)
     return tot_pags
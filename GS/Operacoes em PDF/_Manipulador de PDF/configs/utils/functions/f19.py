@@ -1,8 +1,14 @@
-from PyPDF2 import PdfReader
+from ..backend_functions import abre
+from ..extract_functions import paginas, prepara
+from ..perfil_functions import fase
+from ..planilha_functions import Colunas, salva, valores
+from ..quarentena_functions import protege
 from tqdm import tqdm
 import pandas as pd
 import os
 
+COLUNAS = ['Empresa', 'Lotação', 'Operador', 'Plano', 'Nome', 'Dependente', 'Valor Funcionário', 'Valor Empresa']
+
 
 def eh_dependente(row: str) -> bool:
     return ',' not in row.split()[0]
@@ -10,58 +16,71 @@ def eh_dependente(row: str) -> bool:
 
 def f19() -> int:
     tot_pags = 0
-    df = pd.DataFrame(columns=['Empresa', 'Lotação', 'Operador', 'Plano', 'Nome',
-                               'Dependente', 'Valor Funcionário', 'Valor Empresa'])
+    # As linhas de todos os arquivos são acumuladas por coluna e a tabela é montada uma vez no final.
+    colunas = Colunas(COLUNAS)
     files = [file for file in os.listdir() if '.pdf' in file.lower()]
+    # Inicia a extração de texto de todos os arquivos.
+    prepara(files)
     for file in files:
         with open(file, 'rb') as file_b:
-            pdf = PdfReader(file_b)
+            with fase('abertura', file):
+                pdf = abre(file_b)
             tot_pags += len(pdf.pages)
-            for page in tqdm(pdf.pages):
-                rows = page.extract_text().split('\n')
-                empresa = ' '.join(rows[1].split()[1:])
-                operador = rows[3][10:]
-                lotacao = rows[6]
+            for page, rows in tqdm(paginas(file, pdf), total=len(pdf.pages)):
+                with protege(page):
+                    empresa = ' '.join(rows[1].split()[1:])
+                    operador = rows[3][10:]
+                    lotacao = rows[6]
 
-                for i, row in enumerate(rows[7:-1], start=7):
-                    if '-' in row:
-                        if ' Total: ' in row:
-                            continue
-                        row = row.split()
-                        plano = ' '.join(row[3:-2])
-                        ii = i - 1
-                        # Busca a linha com o nome do funcionário.
-                        while ('-' in rows[ii]) or eh_dependente(rows[ii]):
-                            ii -= 1
+                    for i, row in enumerate(rows[7:-1], start=7):
+                        if '-' in row:
+                            if ' Total: ' in row:
+                                continue
+                            row = row.split()
+                            plano = ' '.join(row[3:-2])
+                            ii = i - 1
+                            # Busca a linha com o nome do funcionário.
+                            while ('-' in rows[ii]) or eh_dependente(rows[ii]):
+                                ii -= 1
 
-                        nome = ' '.join(rows[ii].split()[3:-2])
-                        valor_fun = row[0]
-                        valor_emp = row[1]
-                        df.loc[len(df)] = [empresa, lotacao, operador, plano, nome, '', valor_fun, valor_emp]
-                        ii = i + 1
-                        while eh_dependente(rows[ii]):
-                            row = rows[ii].split()
-                            nome_dep = ' '.join(row[1:-5])
-                            valor_fun = row[-5]
-                            valor_emp = row[-4]
-                            df.loc[len(df)] = [empresa, lotacao, operador, plano, nome, nome_dep, valor_fun, valor_emp]
-                            ii += 1
-            # Cálculo dos totais.
-            df['é dependente'] = df['Dependente'].apply(lambda x: ['Não', 'Sim'][bool(x)])
-            df['Valor Funcionário'] = df['Valor Funcionário'].apply(lambda x: float(x.replace(',', '.')))
-            df['Valor Empresa'] = df['Valor Empresa'].apply(lambda x: float(x.replace(',', '.')))
-            df_totais = df.groupby(['Empresa', 'Plano', 'é dependente'])[['Valor Funcionário', 'Valor Empresa']].sum().reset_index()
-            df_totais['Total Funcionários'] = df.groupby(['Empresa', 'Plano', 'é dependente'])['Nome'].nunique().values
-            df_totais['Total Dependentes'] = df.groupby(['Empresa', 'Plano', 'é dependente'])['Dependente'].nunique().values
-            for row in range(len(df_totais)):
-                if df_totais['é dependente'].iloc[row] == 'Não':
-                    df_totais.at[row, 'Total Dependentes'] = 0
-                else:
-                    df_totais.at[row, 'Total Funcionários'] = 0
-            # Calcula a soma dos totais.
-            df_totais.loc[len(df_totais)] = ['TOTAIS', '', '',
-                                             df_totais['Valor Funcionário'].sum(), df_totais['Valor Empresa'].sum(),
-                                             df_totais['Total Funcionários'].sum(), df_totais['Total Dependentes'].sum()]
-            df.to_excel('planos.xlsx', index=False)
-            df_totais.to_excel('totais.xlsx', index=False)
+                            nome = ' '.join(rows[ii].split()[3:-2])
+                            valor_fun = row[0]
+                            valor_emp = row[1]
+                            colunas.adiciona(empresa, lotacao, operador, plano, nome, '', valor_fun, valor_emp)
+                            ii = i + 1
+                            while eh_dependente(rows[ii]):
+                                row = rows[ii].split()
+                                nome_dep = ' '.join(row[1:-5])
+                                valor_fun = row[-5]
+                                valor_emp = row[-4]
+                                colunas.adiciona(empresa, lotacao, operador, plano, nome, nome_dep, valor_fun, valor_emp)
+                                ii += 1
+    if not files:
+        return tot_pags
+    with fase('classificacao'):
+        df = colunas.tabela()
+        df['é dependente'] = df['Dependente'].ne('').map({False: 'Não', True: 'Sim'})
+        df['Valor Funcionário'] = valores(df['Valor Funcionário'])
+        df['Valor Empresa'] = valores(df['Valor Empresa'])
+        df_totais = totais(df)
+    with fase('escrita'):
+        salva(df, 'planos.xlsx')
+        salva(df_totais, 'totais.xlsx')
     return tot_pags
+
+
+def totais(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Soma os valores e conta os funcionários e dependentes de cada empresa e plano, separando as linhas
+    dos titulares das dos dependentes, e acrescenta a linha com a soma geral.
+    """
+    df_totais = df.groupby(['Empresa', 'Plano', 'é dependente'], sort=True).agg(
+        **{'Valor Funcionário': ('Valor Funcionário', 'sum'), 'Valor Empresa': ('Valor Empresa', 'sum'),
+           'Total Funcionários': ('Nome', 'nunique'), 'Total Dependentes': ('Dependente', 'nunique')}).reset_index()
+    # Nas linhas dos titulares só os funcionários são contados, e nas dos dependentes só os dependentes.
+    dependente = df_totais['é dependente'] == 'Sim'
+    df_totais['Total Funcionários'] = df_totais['Total Funcionários'].where(~dependente, 0)
+    df_totais['Total Dependentes'] = df_totais['Total Dependentes'].where(dependente, 0)
+    soma = pd.DataFrame({'Empresa': ['TOTAIS'], 'Plano': [''], 'é dependente': [''],
+                         **{coluna: [df_totais[coluna].sum()] for coluna in df_totais.columns[3:]}})
+    return pd.concat([df_totais, soma], ignore_index=True)
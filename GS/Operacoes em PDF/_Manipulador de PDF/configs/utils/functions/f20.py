@@ -1,4 +1,10 @@
-from PyPDF2 import PdfReader, PdfWriter
+from ..backend_functions import abre
+from ..diario_functions import conclui, pendentes
+from ..extract_functions import paginas, prepara
+from ..group_functions import CONTINUA, classifica, separa
+from ..perfil_functions import fase
+from ..saida_functions import pasta
+from ..tabela_functions import indexa, so_digitos
 from tqdm import tqdm
 import pandas as pd
 import os
@@ -11,52 +17,53 @@ def f20_get_tabela() -> pd.DataFrame:
     return pd.read_excel(files[0], header=2)
 
 
+def f20_chave(rows: list):
+    for row in rows:
+        if 'C Custo' in row or 'Centro Custo' in row:
+            return row.split(': ')[-1].replace('/', ''), row.split(': ')[2][:-9]
+    # Sem o centro de custo, a página continua o centro de custo anterior.
+    return CONTINUA
+
+
 def f20() -> int:
     tot_pags = 0
-    df = f20_get_tabela()
-    tem_relacao = len(df) > 0
-    centro_custo = ''
-    codigo = ''
-    novo_centro_custo = '-'
-    novo_codigo = '-'
-    writer = PdfWriter()
-    if not os.path.exists('Arquivos'):
-        os.mkdir('Arquivos')
-
-    for file in [file for file in os.listdir() if '.pdf' in file.lower()]:
-        with open(file, 'rb') as file:
-            pdf = PdfReader(file)
+    # Índice centro de custo -> CNPJ/CEI do tomador, montado uma única vez.
+    centros = indexa(f20_get_tabela(), 'Desc Moeda 1', 'CNPJ/CEI Tom')
+    centros.avisa('centros de custo')
+    tem_relacao = len(centros) > 0
+    pasta('Arquivos')
+
+    # Arquivos já processados por uma execução interrompida são pulados (ver diario_functions).
+    files = pendentes([file for file in os.listdir() if '.pdf' in file.lower()])
+    # Inicia a extração de texto de todos os arquivos. A chave de cada página é calculada junto da extração,
+    # nos processos do pool, inclusive nas partes de um mesmo arquivo grande (ver group_functions.classifica).
+    classificador = classifica(f20_chave)
+    prepara(files, parser=classificador)
+
+    def todas_paginas():
+        nonlocal tot_pags
+        for file in files:
+            # O documento recebe o caminho para manter o conteúdo em memória, pois as páginas
+            # de um arquivo podem ser gravadas junto das do arquivo seguinte.
+            with fase('abertura', file):
+                pdf = abre(file)
             tot_pags += len(pdf.pages)
-            for page in tqdm(pdf.pages):
-                rows = page.extract_text().split('\n')
-                for row in rows:
-                    if 'C Custo' in row or 'Centro Custo' in row:
-                        novo_centro_custo = row.split(': ')[-1].replace('/', '')
-                        novo_codigo = row.split(': ')[2][:-9]
-                        break
-                if novo_centro_custo != centro_custo:
-                    if len(writer.pages) > 0:
-                        cnpj = ''
-                        if tem_relacao:
-                            result = df[df['Desc Moeda 1'] == centro_custo]['CNPJ/CEI Tom'].tolist()
-                            if len(result) == 1:
-                                cnpj = ''.join(char for char in str(result[0]) if char.isnumeric())
-                        # Salva o atual
-                        with open(f'Arquivos/{codigo}-{centro_custo}-{cnpj}.pdf', 'wb') as output:
-                            writer.write(output)
-                    centro_custo = novo_centro_custo
-                    codigo = novo_codigo
-                    writer = PdfWriter()
-                    writer.add_page(page)
-                else:
-                    writer.add_page(page)
-            cnpj = ''
-            if tem_relacao:
-                result = df[df['Desc Moeda 1']==centro_custo]['CNPJ/CEI Tom'].tolist()
-                if len(result) == 1:
-                    cnpj = ''.join(char for char in result[0] if char.isnumeric())
-                    print(cnpj)
-            # Salva o atual
-            with open(f'Arquivos/{codigo}-{centro_custo}-{cnpj}.pdf', 'wb') as output:
-                writer.write(output)
+            yield from tqdm(paginas(file, pdf, classificador), total=len(pdf.pages))
+
+    def destino(chave):
+        centro_custo, codigo = chave
+        cnpj = ''
+        if tem_relacao:
+            with fase('consulta'):
+                result = centros.busca(centro_custo)
+            if result is not None:
+                cnpj = so_digitos(result)
+        return (f'Arquivos/{codigo}-{centro_custo}-{cnpj}.pdf',
+                {'codigo': codigo, 'centro_custo': centro_custo, 'cnpj': cnpj})
+
+    # Um centro de custo pode continuar no arquivo seguinte, então as páginas de todos os arquivos
+    # são agrupadas juntas.
+    separa(todas_paginas(), f20_chave, destino)
+    # Registra os arquivos somente depois que todas as saídas foram gravadas.
+    conclui(files)
     return tot_pags
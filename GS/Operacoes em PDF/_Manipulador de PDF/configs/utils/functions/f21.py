@@ -1,8 +1,28 @@
-from PyPDF2 import PdfReader, PdfWriter
-from typing import List
+from ..backend_functions import abre
+from ..diario_functions import concluindo, pendentes
+from ..extract_functions import paginas, prepara
+from ..perfil_functions import fase
+from ..quarentena_functions import aplica, protege
+from ..saida_functions import limpa, pasta
+from ..sink_functions import grava
 from tqdm import tqdm
 import os
 
+# Apenas as 4 primeiras linhas são lidas: CNPJ (linha 1), centro de custo (linha 2) e funcionário (linha 3).
+LINHAS_CABECALHO: int = 4
+
+
+def f21_campos(rows: list) -> tuple:
+    # Acessa o nome e a matrícula, que estão na terceira linha.
+    # Ao dar um split na terceira linha, os 4 primeiros e os 2 últimos itens são de cabeçalho,
+    # restando o nome entre os items 5 até o -3.
+    # Já a matrícula é o segundo item dessa linha.
+    nome = ' '.join(rows[3].split()[5:-3])
+    matricula = rows[3].split()[2]
+    centro_custo = limpa(' '.join(rows[2].split()[5:-1]))
+    cnpj = rows[1].split()[-1]
+    return nome, matricula, centro_custo, cnpj
+
 
 def f21() -> int:
     """
@@ -14,35 +34,27 @@ def f21() -> int:
     # inicia a contagem de páginas
     n_pags = 0
     # Cria a pasta de destino dos arquivos separados.
-    if not os.path.exists('Arquivos'):
-        os.mkdir('Arquivos')
+    pasta('Arquivos')
     # Lista todos os arquivos .pdf no diretório.
     # O 'file.lower()' previne casos de arquivos salvos como 'file.PDF'.
-    files = [file for file in os.listdir() if '.pdf' in file.lower()]
-    for file in files:
+    # Arquivos já processados por uma execução interrompida são pulados (ver diario_functions).
+    files = pendentes([file for file in os.listdir() if '.pdf' in file.lower()])
+    # Inicia a extração de texto de todos os arquivos.
+    prepara(files, LINHAS_CABECALHO)
+    for file in concluindo(files):
         # Abre o arquivo pdf.
         with open(file, 'rb') as file_b:
-            pdf = PdfReader(file_b)
+            with fase('abertura', file):
+                pdf = abre(file_b)
             # Soma o total das suas páginas.
             n_pags += len(pdf.pages)
             # Percorre as páginas do pdf.
-            for page in tqdm(pdf.pages):
-                # Extrai o texto do pdf na forma de uma lista de strings.
-                rows: List[str] = page.extract_text().split('\n')
-                # Acessa o nome e a matrícula, que estão na terceira linha.
-                # Ao dar um split na terceira linha, os 4 primeiros e os 2 últimos itens são de cabeçalho,
-                # restando o nome entre os items 5 até o -3.
-                # Já a matrícula é o segundo item dessa linha.
-                nome = ' '.join(rows[3].split()[5:-3])
-                matricula = rows[3].split()[2]
-                centro_custo = ' '.join(rows[2].split()[5:-1])
-                centro_custo = centro_custo.replace('/', '')
-                cnpj = rows[1].split()[-1]
-                # Formata o nome do arquivo com os dados encontrados.
-                file_name = f'Arquivos/{nome}-{matricula}-{centro_custo}-{cnpj}.pdf'
-                # Salva a página em um arquivo separado.
-                writer = PdfWriter()
-                writer.add_page(page)
-                with open(file_name, 'wb') as output:
-                    writer.write(output)
+            for page, rows in tqdm(paginas(file, pdf, n_linhas=LINHAS_CABECALHO), total=len(pdf.pages)):
+                with protege(page):
+                    # Se o cabeçalho não tiver as linhas esperadas, a página inteira é lida antes de ser separada.
+                    nome, matricula, centro_custo, cnpj = aplica(f21_campos, page, rows)
+                    # Formata o nome do arquivo com os dados encontrados.
+                    file_name = f'Arquivos/{limpa(nome)}-{matricula}-{centro_custo}-{cnpj}.pdf'
+                    # Salva a página em um arquivo separado.
+                    grava(file_name, [page], nome=nome, matricula=matricula, centro_custo=centro_custo, cnpj=cnpj)
     return n_pags
@@ -0,0 +1,43 @@
+from ..backend_functions import abre
+from ..campos_functions import RECIBO
+from ..extract_functions import paginas, prepara
+from ..perfil_functions import fase
+from ..planilha_functions import Colunas, Extrator, salva
+from tqdm import tqdm
+import os
+
+EXTRATOR = Extrator(RECIBO, ['anterior', 'empregado', 'total'])
+
+
+def f22() -> int:
+    """
+    Extrai o total de cada empregado dos recibos por contrato para uma única planilha, com o arquivo
+    de origem de cada linha.
+    """
+    tot_pags = 0
+    colunas = Colunas(['Arquivo', 'Empregado', 'Total'])
+    files = [file for file in os.listdir() if '.pdf' in file.lower()]
+    # Inicia a extração de texto de todos os arquivos. A regex é aplicada nos processos do pool.
+    prepara(files, parser=EXTRATOR)
+    for file in files:
+        with fase('abertura', file):
+            pdf = abre(file)
+        tot_pags += len(pdf.pages)
+        # Empregado cujo total ainda não apareceu, por estar na página seguinte.
+        pendente = None
+        for page, linhas in tqdm(paginas(file, pdf, EXTRATOR), total=len(pdf.pages)):
+            for anterior, empregado, total in linhas:
+                if anterior is not None:
+                    if pendente is not None:
+                        colunas.adiciona(file, pendente, anterior)
+                elif total is not None:
+                    colunas.adiciona(file, empregado or '', total)
+                else:
+                    pendente = empregado or ''
+                    continue
+                pendente = None
+    if not files:
+        return tot_pags
+    with fase('escrita'):
+        salva(colunas.tabela(), 'total_por_empregado.xlsx')
+    return tot_pags
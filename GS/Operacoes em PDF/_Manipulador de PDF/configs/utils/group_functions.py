@@ -0,0 +1,184 @@
+from .extract_functions import cabecalho, extrai_linhas
+from .quarentena_functions import ERROS, aplica, descreve, nao_identificada
+from .sink_functions import Escritor
+from PyPDF2 import PageObject
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Tuple
+import pickle
+
+
+class _Marcador:
+    """
+    Retorno especial do extrator de chave. É enviado entre os processos pelo nome, para que continue
+    sendo o mesmo objeto (comparado com `is`) quando a chave é calculada no pool.
+    """
+
+    def __init__(self, nome: str):
+        self.nome = nome
+
+    def __reduce__(self) -> str:
+        return self.nome
+
+    def __repr__(self) -> str:
+        return self.nome
+
+
+# Retornos especiais do extrator de chave.
+# A página pertence ao grupo atual.
+CONTINUA = _Marcador('CONTINUA')
+# A página não pertence a nenhum grupo e é descartada.
+IGNORA = _Marcador('IGNORA')
+
+
+class Novo(NamedTuple):
+    """
+    Retorno do extrator de chave que inicia um novo grupo mesmo que a chave seja igual à do grupo atual.
+    """
+    chave: Any
+
+
+class NaoIdentificada(NamedTuple):
+    """
+    Retorno do extrator de chave para páginas que não puderam ser identificadas. A página é separada
+    em `_Nao_Identificados` com o motivo (ver quarentena_functions), assim como as páginas seguintes
+    que apenas a continuam. O grupo atual segue aberto.
+    """
+    motivo: str
+
+
+class Grupo(NamedTuple):
+    chave: Any
+    paginas: List[PageObject]
+
+
+class Classificada(NamedTuple):
+    """
+    Resultado do extrator de chave já calculado para a página, entregue por `paginas` no lugar das linhas.
+    `falhou` indica que o extrator falhou por causa do layout da página (ver `agrupa`).
+    """
+    resultado: Any
+    falhou: bool = False
+
+
+class Classificador:
+    """
+    Executa o extrator de chave como parser de `paginas` (ver extract_functions), nos processos do pool,
+    junto da extração de cada intervalo de páginas. Um arquivo grande é assim classificado em partes
+    simultâneas, e `agrupa` apenas junta as chaves na ordem das páginas: um grupo que passa de um
+    intervalo para o seguinte fica em um único arquivo, como na execução sem o pool.
+    """
+
+    def __init__(self, chave: Callable[[Any], Any]):
+        self.chave = chave
+
+    def __call__(self, rows: List[str]) -> Classificada:
+        try:
+            return Classificada(self.chave(rows))
+        except ERROS as erro:
+            return Classificada(NaoIdentificada(descreve(erro)), True)
+
+    def __eq__(self, outro) -> bool:
+        return isinstance(outro, Classificador) and outro.chave == self.chave
+
+    def __hash__(self) -> int:
+        return hash(self.chave)
+
+
+def classifica(chave: Callable[[Any], Any]) -> Classificador | None:
+    """
+    Retorna o parser que calcula a chave das páginas no pool, a ser passado para `prepara` e `paginas`. Ex.:
+        classificador = classifica(f08_chave)
+        prepara(files, LINHAS_CABECALHO, classificador)
+        ...
+        separa(paginas(arq, pdf, classificador, n_linhas=LINHAS_CABECALHO), f08_chave, destino)
+    Retorna None se a chave não pode ser enviada aos processos (funções internas ou lambdas): nesse
+    caso, ela é calculada no processo principal, por `agrupa`.
+    """
+    try:
+        pickle.dumps(chave)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return None
+    return Classificador(chave)
+
+
+def _resultado(page: PageObject, rows: Any, chave: Callable[[Any], Any]) -> Any:
+    """
+    Calcula a chave da página, ou usa a que veio calculada do pool. Se ela falhar por causa do layout nas
+    linhas do cabeçalho, é repetida com o texto da página inteira (ver quarentena_functions.aplica).
+    """
+    try:
+        if not isinstance(rows, Classificada):
+            return aplica(chave, page, rows)
+        if not rows.falhou or not cabecalho(page):
+            return rows.resultado
+        return chave(extrai_linhas(page))
+    except ERROS as erro:
+        return NaoIdentificada(descreve(erro))
+
+
+def agrupa(itens: Iterable[Tuple[PageObject, Any]], chave: Callable[[Any], Any]) -> Iterator[Grupo]:
+    """
+    Agrupa as páginas consecutivas que têm a mesma chave. Cada grupo é entregue assim que é fechado,
+    então apenas as páginas do grupo atual ficam em memória, e o último grupo é entregue ao final.
+    Args:
+        itens: Pares (página, linhas), como os retornados por `paginas`. Se as páginas vierem com a chave
+            já calculada (ver `classifica`), ela é usada no lugar de `chave`.
+        chave: Recebe as linhas da página e retorna a sua chave, `CONTINUA`, `IGNORA`, `Novo(chave)`
+            ou `NaoIdentificada(motivo)`. Se falhar por causa do layout da página, ela é separada,
+            depois de repetida com a página inteira se a página veio só com o cabeçalho (ver `_resultado`).
+            Páginas com `CONTINUA` antes do primeiro grupo formam um grupo com chave None.
+    """
+    atual: Grupo | None = None
+    # Última página não identificada, enquanto as páginas seguintes apenas a continuam.
+    orfa: NaoIdentificada | None = None
+    for page, rows in itens:
+        resultado = _resultado(page, rows, chave)
+        if resultado is IGNORA:
+            continue
+        if isinstance(resultado, NaoIdentificada):
+            nao_identificada(page, resultado.motivo)
+            orfa = resultado
+            continue
+        if resultado is CONTINUA:
+            if orfa is not None:
+                nao_identificada(page, orfa.motivo)
+                continue
+            if atual is None:
+                atual = Grupo(None, [])
+            atual.paginas.append(page)
+            continue
+        orfa = None
+        novo = isinstance(resultado, Novo)
+        if novo:
+            resultado = resultado.chave
+        if atual is not None and not novo and resultado == atual.chave:
+            atual.paginas.append(page)
+            continue
+        if atual is not None:
+            yield atual
+        atual = Grupo(resultado, [page])
+    if atual is not None:
+        yield atual
+
+
+def separa(itens: Iterable[Tuple[PageObject, Any]], chave: Callable[[Any], Any],
+           destino: Callable[[Any], Tuple[str, Dict]]) -> int:
+    """
+    Agrupa as páginas (ver `agrupa`) e grava cada grupo assim que ele é fechado. Com o pool de
+    extração ativo, as gravações são feitas em paralelo pelos seus processos.
+    Args:
+        destino: Recebe a chave do grupo e retorna o nome do arquivo e os dados usados nele.
+            Grupos com chave None (páginas antes do primeiro grupo) são separados em `_Nao_Identificados`.
+    Returns:
+        (int): A quantidade de grupos gravados.
+    """
+    n_grupos = 0
+    with Escritor() as escritor:
+        for grupo in agrupa(itens, chave):
+            if grupo.chave is None:
+                for page in grupo.paginas:
+                    nao_identificada(page, 'Página antes do primeiro grupo')
+                continue
+            file_name, chaves = destino(grupo.chave)
+            escritor.grava(file_name, grupo.paginas, **chaves)
+            n_grupos += 1
+    return n_grupos
@@ -0,0 +1,167 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from .backend_functions import Documento, ativa, get_backend
+from .pacote_functions import get_pacote, renomeia, salva_pdf
+from .otimiza_functions import coleta, soma
+from typing import Dict, Iterator, List, Tuple
+import json
+import os
+
+VERSAO_MANIFESTO: int = 1
+
+Origem = Tuple[str, int]
+
+# Documentos já abertos em cada processo, reaproveitados entre lotes: (caminho, mtime, backend) -> documento.
+_leitores: Dict[Tuple[str, float, str], Documento] = {}
+
+
+class Manifesto:
+    """
+    Plano de saída de uma execução: para cada arquivo de saída, as páginas de origem (arquivo, índice)
+    e os dados extraídos que definiram o seu nome.
+
+    Os arquivos de origem são relativos à pasta `entrada` e os de destino à pasta `saida`. Saídas sem
+    páginas (`paginas` = None) são arquivos de entrada que apenas mudam de nome.
+    """
+
+    def __init__(self, entrada: str, saida: str | None = None):
+        self.entrada = os.path.abspath(entrada)
+        self.saida = os.path.abspath(saida or entrada)
+        self.saidas: List[Dict] = []
+
+    def adiciona(self, destino: str, paginas: List[Origem] | None, chaves: Dict | None = None,
+                 origem: str | None = None) -> None:
+        self.saidas.append({'destino': destino, 'origem': origem, 'paginas': paginas, 'chaves': chaves or {}})
+
+    def salva(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({'versao': VERSAO_MANIFESTO, 'entrada': self.entrada, 'saida': self.saida,
+                       'saidas': self.saidas}, file, ensure_ascii=False, default=str)
+
+    @classmethod
+    def le(cls, path: str) -> 'Manifesto':
+        with open(path, 'r', encoding='utf-8') as file:
+            dados = json.load(file)
+        if dados.get('versao') != VERSAO_MANIFESTO:
+            raise ValueError(f'Versão de manifesto não suportada: {dados.get("versao")}')
+        manifesto = cls(dados['entrada'], dados['saida'])
+        manifesto.saidas = [{**saida, 'paginas': [tuple(pagina) for pagina in saida['paginas']]
+                             if saida['paginas'] is not None else None} for saida in dados['saidas']]
+        return manifesto
+
+
+_manifesto: Manifesto | None = None
+
+
+def get_manifesto() -> Manifesto | None:
+    """
+    Retorna o manifesto sendo planejado, ou None se a execução grava os arquivos diretamente.
+    """
+    return _manifesto
+
+
+@contextmanager
+def planeja(entrada: str = '.', saida: str | None = None) -> Iterator[Manifesto]:
+    """
+    Durante o bloco, as saídas das funções são registradas no manifesto em vez de gravadas. Ex.:
+        with planeja() as manifesto:
+            f08()
+        manifesto.salva('manifesto.json')
+    """
+    global _manifesto
+    _manifesto = Manifesto(entrada, saida)
+    try:
+        yield _manifesto
+    finally:
+        _manifesto = None
+
+
+def destino(saida: Dict, nome: str | None = None) -> str:
+    """
+    Retorna o destino da saída. Com `nome`, o nome do arquivo é refeito a partir dos dados extraídos,
+    mantendo a pasta. Ex.: nome='{cnpj}-{lotacao}.pdf'.
+    """
+    if nome is None:
+        return saida['destino']
+    from .saida_functions import limpa
+    pasta = saida['destino'][:max(saida['destino'].rfind('/'), saida['destino'].rfind('\\')) + 1]
+    return pasta + limpa(nome.format(**saida['chaves']))
+
+
+def _leitor(path: str) -> Documento:
+    backend = get_backend()
+    chave = (path, os.path.getmtime(path), backend.nome)
+    leitor = _leitores.get(chave)
+    # Um leitor fechado no fim de uma execução anterior (ver backend_functions.fecha) é aberto de novo.
+    if leitor is None or getattr(leitor, 'arquivo', None) is not None and leitor.arquivo.closed:
+        leitor = _leitores[chave] = backend.abre(path)
+    return leitor
+
+
+def grava_lote(entrada: str, saida: str, gravacoes: List[Tuple[str, List[Origem]]]) -> int:
+    """
+    Executada nos processos do pool: grava cada arquivo de saída do lote com as suas páginas.
+    As pastas de destino já foram criadas pelo processo principal (ver saida_functions).
+    """
+    for destino_arq, paginas in gravacoes:
+        writer = get_backend().copia(_leitor(os.path.join(entrada, file)).pages[idx] for file, idx in paginas)
+        salva_pdf(os.path.join(saida, destino_arq), writer)
+    return len(gravacoes)
+
+
+def grava_lote_remoto(entrada: str, saida: str, gravacoes: List[Tuple[str, List[Origem]]],
+                      backend: str | None = None) -> Tuple[int, Dict]:
+    """
+    Versão de `grava_lote` enviada aos processos do pool: usa o backend do processo principal e retorna
+    também a economia da otimização feita no processo (ver otimiza_functions), que o processo principal
+    soma com `soma`.
+    """
+    if backend is not None:
+        ativa(backend)
+    return grava_lote(entrada, saida, gravacoes), coleta()
+
+
+def executa(manifesto: Manifesto, workers: int = 1, nome: str | None = None) -> int:
+    """
+    Grava os arquivos do manifesto, cada um uma única vez, dividindo-os entre `workers` processos.
+    Se o mesmo destino aparece mais de uma vez (ex.: ao refazer os nomes com `nome`), as repetições
+    ganham um sufixo, como na execução direta (ver saida_functions).
+    Returns:
+        (int): A quantidade de arquivos gravados.
+    """
+    from .saida_functions import Saidas
+    reservas = Saidas(manifesto.saida)
+    saidas: Dict[str, Dict] = {reservas.reserva(destino(saida, nome), cria=False): saida
+                               for saida in manifesto.saidas}
+    # Todas as pastas de destino são criadas antes de dividir as gravações entre os processos.
+    reservas.cria()
+
+    gravacoes = [(destino_arq, saida['paginas']) for destino_arq, saida in saidas.items()
+                 if saida['paginas'] is not None]
+    # Os pacotes são gravados apenas pelo processo principal.
+    n_lotes = max(1, min(workers if get_pacote() is None else 1, len(gravacoes)))
+    # Lotes contíguos, para que cada processo abra poucos arquivos de origem.
+    tam = -(-len(gravacoes) // n_lotes) if gravacoes else 1
+    lotes = [gravacoes[i:i + tam] for i in range(0, len(gravacoes), tam)]
+    if n_lotes == 1:
+        n_arquivos = sum(grava_lote(manifesto.entrada, manifesto.saida, lote) for lote in lotes)
+    else:
+        with ProcessPoolExecutor(max_workers=n_lotes) as pool:
+            n_arquivos = 0
+            for n, estatisticas in pool.map(grava_lote_remoto, [manifesto.entrada] * len(lotes),
+                                            [manifesto.saida] * len(lotes), lotes,
+                                            [get_backend().nome] * len(lotes)):
+                n_arquivos += n
+                soma(estatisticas)
+
+    # Arquivos que apenas mudam de nome. Se a saída for outra pasta, a entrada é preservada.
+    for destino_arq, saida in saidas.items():
+        if saida['paginas'] is not None:
+            continue
+        origem = os.path.join(manifesto.entrada, saida['origem'])
+        path = os.path.join(manifesto.saida, destino_arq)
+        if get_pacote() is None and manifesto.entrada == manifesto.saida and os.path.exists(path):
+            os.remove(path)
+        renomeia(origem, path, mantem=manifesto.entrada != manifesto.saida)
+        n_arquivos += 1
+    return n_arquivos
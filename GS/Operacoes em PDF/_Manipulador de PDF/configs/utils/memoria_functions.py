@@ -0,0 +1,105 @@
+from typing import Callable, List
+import gc
+import sys
+import os
+
+# Com MANIPULADOR_MEMORIA=<MB>, o processo principal procura ficar abaixo desse uso de memória (RSS): os PDFs
+# de entrada são lidos do disco à medida que as páginas são pedidas, em vez de carregados inteiros, e, quando
+# o limite é passado, as páginas que esperam para ser gravadas são despejadas em disco e os objetos já lidos
+# dos PDFs são descartados. Com 0 (o padrão), não há limite. O valor vem do ambiente para valer também nos
+# processos do pool.
+LIMITE_MB: int = int(os.environ.get('MANIPULADOR_MEMORIA') or 0)
+# A cada quantas páginas o uso de memória é conferido.
+INTERVALO_PAGINAS: int = 50
+
+# Funções que liberam memória, registradas pelos módulos que a ocupam (ver `registra`).
+_liberadores: List[Callable[[], None]] = []
+_n_paginas: int = 0
+# Uso de memória que restou após a última liberação.
+_piso: int = 0
+_avisado: bool = False
+
+
+def ativa(limite_mb: int) -> None:
+    """
+    Define o limite de memória em MB (0 desliga), inclusive nos processos do pool criados depois.
+    """
+    global LIMITE_MB, _piso
+    LIMITE_MB = limite_mb
+    _piso = 0
+    os.environ['MANIPULADOR_MEMORIA'] = str(limite_mb)
+
+
+def registra(liberador: Callable[[], None]) -> Callable[[], None]:
+    """
+    Registra uma função chamada quando o limite de memória é passado. Pode ser usada como decorador.
+    """
+    _liberadores.append(liberador)
+    return liberador
+
+
+def rss() -> int:
+    """
+    Retorna o uso de memória (RSS) do processo atual, em bytes, ou 0 se não for possível medi-lo.
+    """
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    if sys.platform == 'win32':
+        return _rss_windows()
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return 0
+
+
+def _rss_windows() -> int:
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                    ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                    ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                    ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                    ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+    contadores = PROCESS_MEMORY_COUNTERS()
+    contadores.cb = ctypes.sizeof(contadores)
+    processo = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(processo, ctypes.byref(contadores), contadores.cb):
+        return 0
+    return contadores.WorkingSetSize
+
+
+def libera() -> None:
+    """
+    Chama todas as funções registradas e coleta os objetos que ficaram sem referência.
+    """
+    for liberador in _liberadores:
+        liberador()
+    gc.collect()
+
+
+def confere() -> None:
+    """
+    Chamada a cada página percorrida: a cada `INTERVALO_PAGINAS` páginas, se o limite foi passado, libera
+    a memória. Se nem assim o uso ficar abaixo do limite, avisa uma vez e segue a execução, liberando de
+    novo só quando o uso crescer mais um quarto do limite, para não despejar as páginas a cada conferência.
+    """
+    global _n_paginas, _piso, _avisado
+    if not LIMITE_MB:
+        return
+    _n_paginas += 1
+    limite = LIMITE_MB * 2**20
+    if _n_paginas % INTERVALO_PAGINAS or rss() <= max(limite, _piso + limite // 4):
+        return
+    libera()
+    _piso = rss()
+    if not _avisado and _piso > limite:
+        _avisado = True
+        print(f'Uso de memória acima do limite de {LIMITE_MB} MB (MANIPULADOR_MEMORIA) mesmo após liberar '
+              f'as páginas lidas.', file=sys.stderr)
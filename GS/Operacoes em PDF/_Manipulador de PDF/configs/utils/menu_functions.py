@@ -1,9 +1,16 @@
-from .functions import (f01, f02, f03, f04, f05, f06, f07, f08, f09, f10,
-                        f11, f12, f13, f14, f15, f16, f17, f18, f19, f20, f21,
-                        N_FUNCTIONS, NAMES)
-from .report_functions import salva_relatorio
+from .functions import N_FUNCTIONS, NAMES, carrega
+from .perfil_functions import FASES, inicia
+from contextlib import nullcontext
 from datetime import datetime
 import time
+import os
+
+# Tempo máximo, em segundos, entre o início do programa e a exibição do menu.
+META_TEMPO_INICIO: float = 0.5
+# Formato do pacote onde as saídas são gravadas (zip ou tar). Vazio grava arquivos soltos.
+PACOTE: str = os.environ.get('MANIPULADOR_PACOTE', '')
+# Com 1, grava um pacote para cada pasta de saída.
+PACOTE_POR_PASTA: bool = os.environ.get('MANIPULADOR_PACOTE_POR_PASTA') == '1'
 
 
 def process_option(option: int) -> None:
@@ -14,20 +21,52 @@ def process_option(option: int) -> None:
     data = datetime.now().strftime("%d/%m/%Y")
 
     if 0 < option <= N_FUNCTIONS:
+        # Carregados só depois da escolha, pois levam o PyPDF2 e os módulos de extração (ver main.py).
+        from . import diario_functions, otimiza_functions, quarentena_functions, saida_functions
+        perfil = inicia()  # Mede o tempo de cada etapa da execução.
+        quarentena = quarentena_functions.inicia()  # Separa as páginas não identificadas.
+        saidas = saida_functions.inicia()  # Pastas criadas e nomes de saída usados na execução.
+        otimiza_functions.inicia()  # Economia da otimização das saídas (MANIPULADOR_OTIMIZA=1).
         st = time.time()  # Tempo de início da execução.
-        n_pags = eval(f'f{option:02}()')
+        # O módulo de pacotes só é carregado quando as saídas são compactadas.
+        if PACOTE:
+            from .pacote_functions import compacta
+        with compacta(PACOTE, PACOTE_POR_PASTA) if PACOTE else nullcontext():
+            # Retoma a execução da mesma opção que tenha sido interrompida nesta pasta.
+            diario_functions.inicia(option)
+            n_pags = carrega(option)()
+            perfil.detalhes['nao_identificados'] = quarentena.fecha()
+            perfil.detalhes['arquivos_pulados'] = diario_functions.encerra()
+            perfil.detalhes['nomes_repetidos'] = saidas.fecha()
+        if otimiza_functions.ATIVO:
+            otimizacao = perfil.detalhes['otimizacao'] = otimiza_functions.resumo()
+            print(f"Otimização: {otimizacao['bytes_economizados'] / 2**20:.1f} MB economizados "
+                  f"em {otimizacao['arquivos']} arquivo(s).")
         tipo = NAMES[option]
         exec_time = time.time() - st  # Tempo de execução.
-        values = [[data, tipo, n_pags, exec_time]]  # Valores para serem salvos no relatório.
+        # Salva localmente o tempo de cada etapa, por arquivo, e as páginas mais lentas.
+        perfil.salva(option, tipo, n_pags)
+        # Valores para serem salvos no relatório, seguidos do tempo total de cada etapa.
+        values = [[data, tipo, n_pags, exec_time, *(perfil.totais[nome] for nome in FASES)]]
+        # O cliente da API do Google só é carregado quando o relatório é enviado.
+        from .report_functions import salva_relatorio
         salva_relatorio(values)
 
 
-def main_hub():
+def main_hub(inicio: float | None = None):
+    """
+    Exibe o menu e processa a opção escolhida.
+    Args:
+        inicio (float): Instante (time.perf_counter) em que o programa começou, para medir o tempo até o menu.
+    """
     option: int = -1
     # Aguarda até que seja recebida uma opção válida.
     while option < 0 or option > N_FUNCTIONS:
         print('Digite uma opção de documento para separar.')
         print_main_msg()
+        if inicio is not None:
+            mostra_tempo_inicio(time.perf_counter() - inicio)
+            inicio = None
         try:
             option = int(input('Escolha: '))
             limpa_terminal()
@@ -41,5 +80,14 @@ def print_main_msg() -> None:
         print(f'{key}: {NAMES[key]}')
 
 
+def mostra_tempo_inicio(tempo: float) -> None:
+    """
+    Mostra o tempo até a exibição do menu quando MANIPULADOR_TEMPO_INICIO=1.
+    """
+    if os.environ.get('MANIPULADOR_TEMPO_INICIO') == '1':
+        situacao = 'OK' if tempo <= META_TEMPO_INICIO else 'ACIMA DA META'
+        print(f'Menu exibido em {tempo:.3f}s (meta: {META_TEMPO_INICIO:.1f}s) {situacao}')
+
+
 def limpa_terminal() -> None:
     print('\n' * 50)
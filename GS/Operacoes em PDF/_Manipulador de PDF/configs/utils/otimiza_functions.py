@@ -0,0 +1,197 @@
+from PyPDF2 import PdfWriter
+from PyPDF2.filters import FlateDecode
+from PyPDF2.generic import (ArrayObject, DecodedStreamObject, DictionaryObject, EncodedStreamObject, IndirectObject,
+                            NameObject, NullObject, StreamObject)
+from collections import Counter
+from typing import Dict, Set
+import re
+import os
+
+# Com MANIPULADOR_OTIMIZA=1, os arquivos de saída são otimizados antes de gravados. Fica desligado por
+# padrão, pois custa processamento. O valor vem do ambiente para valer também nos processos do pool.
+ATIVO: bool = os.environ.get('MANIPULADOR_OTIMIZA') == '1'
+# Streams menores que isso não são compactados, pois o ganho não compensa.
+MINIMO_COMPACTA: int = 64
+# Categorias de recursos referenciados pelo nome no conteúdo da página (ex.: /F1 8 Tf, /Im1 Do).
+CATEGORIAS = ('/Font', '/XObject', '/ExtGState', '/ColorSpace', '/Pattern', '/Shading', '/Properties')
+# Nomes usados no conteúdo da página.
+NOME = re.compile(rb'/([^\s/\[\]<>(){}%]*)')
+
+# Economia acumulada no processo atual.
+_estatisticas: Counter = Counter()
+
+
+def ativa(ligado: bool = True) -> None:
+    """
+    Liga ou desliga a otimização, inclusive nos processos do pool criados depois.
+    """
+    global ATIVO
+    ATIVO = ligado
+    os.environ['MANIPULADOR_OTIMIZA'] = '1' if ligado else '0'
+
+
+def inicia() -> None:
+    """
+    Zera a economia acumulada, no início de uma nova execução.
+    """
+    _estatisticas.clear()
+
+
+def coleta() -> Dict[str, int]:
+    """
+    Retorna e zera a economia acumulada no processo atual. Usada pelos processos do pool, cujo
+    resultado é somado ao do processo principal com `soma`.
+    """
+    estatisticas = dict(_estatisticas)
+    _estatisticas.clear()
+    return estatisticas
+
+
+def soma(estatisticas: Dict[str, int]) -> None:
+    _estatisticas.update(estatisticas)
+
+
+def resumo() -> Dict[str, int]:
+    """
+    Returns:
+        (Dict): Arquivos otimizados, recursos não usados removidos, streams compactados e a estimativa
+            de bytes economizados (tamanho dos streams removidos e redução dos compactados).
+    """
+    return {chave: _estatisticas[chave] for chave in ('arquivos', 'recursos', 'streams', 'bytes_economizados')}
+
+
+def _tamanho(obj) -> int:
+    return len(obj._data) if isinstance(obj, StreamObject) and obj._data is not None else 0
+
+
+def _conteudo(page: DictionaryObject) -> bytes | None:
+    """
+    Retorna o conteúdo da página, com as partes de um /Contents em array unidas.
+    """
+    contents = page.get('/Contents')
+    if contents is None:
+        return b''
+    contents = contents.get_object()
+    partes = contents if isinstance(contents, ArrayObject) else [contents]
+    try:
+        return b'\n'.join(parte.get_object().get_data() for parte in partes)
+    except Exception:
+        # Conteúdo com um filtro que o PyPDF2 não decodifica: a página fica como está.
+        return None
+
+
+def _usa_recursos_da_pagina(xobjects: DictionaryObject) -> bool:
+    """
+    Indica se algum formulário (Form XObject) não tem recursos próprios, caso em que usa os da página.
+    """
+    for xobject in xobjects.values():
+        xobject = xobject.get_object()
+        if xobject.get('/Subtype') == '/Form' and '/Resources' not in xobject:
+            return True
+    return False
+
+
+def remove_recursos(page: DictionaryObject) -> int:
+    """
+    Retira dos recursos da página as fontes, imagens, etc. que o seu conteúdo não usa. Exportações
+    como as do Protheus apontam todas as páginas para os mesmos recursos do relatório inteiro, que
+    seriam copiados para cada arquivo de uma página. A página recebe um dicionário de recursos
+    próprio, pois o original pode ser compartilhado com outras páginas.
+    Returns:
+        (int): A quantidade de recursos retirados.
+    """
+    if '/Resources' not in page:
+        return 0
+    recursos = page['/Resources'].get_object()
+    conteudo = _conteudo(page)
+    if conteudo is None:
+        return 0
+    nomes = set(NOME.findall(conteudo))
+    # Nomes com caracteres escapados (#20...) não são comparados, por segurança.
+    if any(b'#' in nome for nome in nomes):
+        return 0
+    xobjects = recursos.get('/XObject')
+    if xobjects is not None and _usa_recursos_da_pagina(xobjects.get_object()):
+        return 0
+
+    novos = DictionaryObject()
+    removidos = 0
+    for categoria, valor in recursos.items():
+        dicionario = valor.get_object()
+        if categoria not in CATEGORIAS or not isinstance(dicionario, DictionaryObject):
+            novos[NameObject(categoria)] = valor
+            continue
+        usados = DictionaryObject()
+        for chave, recurso in dicionario.items():
+            # Os espaços de cor /Default... são usados implicitamente.
+            if chave[1:].encode('latin-1', 'replace') in nomes or chave.startswith('/Default'):
+                usados[NameObject(chave)] = recurso
+        removidos += len(dicionario) - len(usados)
+        novos[NameObject(categoria)] = usados
+    if removidos:
+        page[NameObject('/Resources')] = novos
+    return removidos
+
+
+def _alcancaveis(writer: PdfWriter) -> Set[int]:
+    """
+    Retorna os números dos objetos do writer que ainda são referenciados a partir da raiz do documento.
+    """
+    vistos: Set[int] = set()
+    pilha = [writer._root, writer._info]
+    while pilha:
+        obj = pilha.pop()
+        if isinstance(obj, IndirectObject):
+            if obj.pdf is not writer or obj.idnum in vistos:
+                continue
+            vistos.add(obj.idnum)
+            obj = writer._objects[obj.idnum - 1]
+        if isinstance(obj, DictionaryObject):
+            pilha.extend(obj.values())
+        elif isinstance(obj, ArrayObject):
+            pilha.extend(obj)
+    return vistos
+
+
+def compacta(obj: DecodedStreamObject) -> EncodedStreamObject:
+    """
+    Retorna o stream compactado com Flate, mantendo as demais chaves do dicionário (ex.: /Subtype das imagens).
+    """
+    novo = EncodedStreamObject()
+    for chave, valor in obj.items():
+        if chave not in ('/Length', '/Filter', '/DecodeParms'):
+            novo[NameObject(chave)] = valor
+    novo[NameObject('/Filter')] = NameObject('/FlateDecode')
+    novo._data = FlateDecode.encode(obj._data)
+    return novo
+
+
+def otimiza(writer: PdfWriter) -> None:
+    """
+    Otimiza o PDF antes de gravá-lo: retira os recursos que as páginas não usam, descarta os objetos
+    que deixaram de ser referenciados e compacta os streams gravados sem compressão (conteúdo das
+    páginas, fontes, imagens). A economia é acumulada e informada por `resumo`.
+    """
+    removidos = sum(remove_recursos(page) for page in writer.pages)
+    economia = 0
+    n_streams = 0
+    if removidos:
+        # O PdfWriter copia todos os objetos das páginas ao adicioná-las, mesmo os que não são mais
+        # referenciados. Eles são trocados por null, pois as posições da tabela xref são sequenciais.
+        alcancaveis = _alcancaveis(writer)
+        for i, obj in enumerate(writer._objects):
+            if obj is not None and i + 1 not in alcancaveis and not isinstance(obj, NullObject):
+                economia += _tamanho(obj)
+                writer._objects[i] = NullObject()
+    for i, obj in enumerate(writer._objects):
+        if (isinstance(obj, DecodedStreamObject) and '/Filter' not in obj and obj.get('/Type') != '/Metadata'
+                and _tamanho(obj) >= MINIMO_COMPACTA):
+            novo = compacta(obj)
+            # Dados já compactados (ex.: imagens sem filtro, mas aleatórias) ficam como estão.
+            if _tamanho(novo) >= _tamanho(obj):
+                continue
+            novo.indirect_reference = obj.indirect_reference
+            economia += _tamanho(obj) - _tamanho(novo)
+            writer._objects[i] = novo
+            n_streams += 1
+    _estatisticas.update({'arquivos': 1, 'recursos': removidos, 'streams': n_streams, 'bytes_economizados': economia})
@@ -0,0 +1,219 @@
+from . import otimiza_functions
+from .backend_functions import Saida, get_backend
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, Tuple
+import tempfile
+import tarfile
+import zipfile
+import shutil
+import time
+import io
+import os
+
+# Formatos de pacote aceitos.
+FORMATOS: Tuple[str, ...] = ('zip', 'tar')
+# Nome do pacote único, ou dos arquivos que ficam na raiz da saída quando há um pacote por pasta.
+NOME_PACOTE: str = 'resultado'
+# Quantidade máxima de pacotes abertos ao mesmo tempo no modo um pacote por pasta.
+LIMITE_ABERTOS: int = 64
+
+
+class _Posicao:
+    """
+    Repassa a escrita para a entrada do zip contando os bytes, pois o PdfWriter precisa de `tell`
+    e a entrada do zip, gravada sem volta, não o oferece.
+    """
+
+    def __init__(self, destino):
+        self.destino = destino
+        self.posicao = 0
+
+    def write(self, dados: bytes) -> int:
+        self.destino.write(dados)
+        self.posicao += len(dados)
+        return len(dados)
+
+    def tell(self) -> int:
+        return self.posicao
+
+
+class Pacote:
+    """
+    Grava os arquivos de saída como entradas de um arquivo compactado, em vez de criar um arquivo
+    por documento. No zip, cada PDF é escrito direto na sua entrada, sem passar pelo disco; no tar,
+    que precisa do tamanho antes do conteúdo, cada PDF é montado em memória.
+
+    Com `por_pasta`, cada pasta de saída vira um pacote próprio (ex.: `Arquivos/Lotacao/x.pdf` vai
+    para `Arquivos/Lotacao.zip`). Os pacotes ficam em `raiz` (por padrão, a pasta atual) e as entradas
+    têm os caminhos relativos a ela.
+    """
+
+    def __init__(self, formato: str = 'zip', por_pasta: bool = False, nome: str = NOME_PACOTE,
+                 raiz: str | None = None):
+        if formato not in FORMATOS:
+            raise ValueError(f'Formato de pacote não suportado: {formato}')
+        self.formato = formato
+        self.por_pasta = por_pasta
+        self.nome = nome
+        self.raiz = os.path.abspath(raiz or '.')
+        # Pacotes abertos, do menos para o mais recentemente usado.
+        self.abertos: OrderedDict[str, zipfile.ZipFile | tarfile.TarFile] = OrderedDict()
+        # Entradas já gravadas em cada pacote, para não repetir nomes.
+        self.entradas: Dict[str, set] = {}
+        self.n_entradas: int = 0
+        self.n_bytes: int = 0
+
+    def _localiza(self, path: str) -> Tuple[str, str]:
+        """
+        Retorna o pacote e o nome da entrada de um caminho de saída.
+        """
+        # As funções usam tanto '/' quanto '\\' nos caminhos; no pacote, as pastas são sempre separadas por '/'.
+        path = os.path.relpath(os.path.join(self.raiz, path.replace('\\', '/')), self.raiz).replace('\\', '/')
+        pasta, nome = os.path.split(path)
+        if not self.por_pasta:
+            return os.path.join(self.raiz, f'{self.nome}.{self.formato}'), path
+        return os.path.join(self.raiz, f'{pasta or self.nome}.{self.formato}'), nome
+
+    def _abre(self, pacote: str):
+        if pacote in self.abertos:
+            self.abertos.move_to_end(pacote)
+            return self.abertos[pacote]
+        if len(self.abertos) >= LIMITE_ABERTOS:
+            self.abertos.popitem(last=False)[1].close()
+        # Um pacote fechado por causa do limite é reaberto para continuar recebendo entradas.
+        modo = 'a' if pacote in self.entradas else 'w'
+        os.makedirs(os.path.dirname(pacote) or '.', exist_ok=True)
+        if self.formato == 'zip':
+            arquivo = zipfile.ZipFile(pacote, modo, zipfile.ZIP_DEFLATED)
+        else:
+            arquivo = tarfile.open(pacote, modo)
+        self.entradas.setdefault(pacote, set())
+        self.abertos[pacote] = arquivo
+        return arquivo
+
+    def _entrada(self, pacote: str, nome: str) -> str:
+        """
+        Retorna um nome ainda não usado no pacote. Um destino repetido ganha um sufixo, pois não é
+        possível substituir uma entrada já gravada.
+        """
+        base, ext = os.path.splitext(nome)
+        n = 2
+        while nome in self.entradas[pacote]:
+            nome = f'{base} ({n}){ext}'
+            n += 1
+        self.entradas[pacote].add(nome)
+        return nome
+
+    def grava(self, path: str, writer: Saida) -> None:
+        pacote, nome = self._localiza(path)
+        arquivo = self._abre(pacote)
+        nome = self._entrada(pacote, nome)
+        if self.formato == 'zip':
+            with arquivo.open(nome, 'w', force_zip64=True) as entrada:
+                destino = _Posicao(entrada)
+                get_backend().grava(writer, destino)
+            self.n_bytes += destino.posicao
+        else:
+            dados = io.BytesIO()
+            get_backend().grava(writer, dados)
+            info = tarfile.TarInfo(nome)
+            info.size = dados.tell()
+            info.mtime = int(time.time())
+            dados.seek(0)
+            arquivo.addfile(info, dados)
+            self.n_bytes += info.size
+        self.n_entradas += 1
+
+    def adiciona(self, origem: str, path: str) -> None:
+        """
+        Copia um arquivo existente (ex.: um arquivo de entrada renomeado) para o pacote.
+        """
+        pacote, nome = self._localiza(path)
+        arquivo = self._abre(pacote)
+        nome = self._entrada(pacote, nome)
+        if self.formato == 'zip':
+            arquivo.write(origem, nome)
+        else:
+            arquivo.add(origem, nome)
+        self.n_entradas += 1
+        self.n_bytes += os.path.getsize(origem)
+
+    def fecha(self) -> Dict:
+        """
+        Fecha todos os pacotes.
+        Returns:
+            (Dict): Os pacotes gravados, a quantidade de entradas e o total de bytes antes da compactação.
+        """
+        for arquivo in self.abertos.values():
+            arquivo.close()
+        self.abertos.clear()
+        return {'pacotes': sorted(os.path.relpath(pacote, self.raiz) for pacote in self.entradas),
+                'entradas': self.n_entradas, 'bytes': self.n_bytes}
+
+
+_pacote: Pacote | None = None
+
+
+def get_pacote() -> Pacote | None:
+    """
+    Retorna o pacote sendo gravado, ou None se as saídas são gravadas como arquivos.
+    """
+    return _pacote
+
+
+@contextmanager
+def compacta(formato: str = 'zip', por_pasta: bool = False, nome: str = NOME_PACOTE,
+             raiz: str | None = None) -> Iterator[Pacote]:
+    """
+    Durante o bloco, os arquivos de saída são gravados em pacotes em vez de arquivos soltos. Ex.:
+        with compacta('zip', por_pasta=True) as pacote:
+            f21()
+        resumo = pacote.fecha()
+    """
+    global _pacote
+    _pacote = Pacote(formato, por_pasta, nome, raiz)
+    try:
+        yield _pacote
+    finally:
+        _pacote.fecha()
+        _pacote = None
+
+
+def salva_pdf(path: str, writer: Saida) -> None:
+    """
+    Grava o PDF montado pelo backend (ver backend_functions) no caminho ou, com um pacote ativo,
+    como uma entrada do pacote. Com a otimização ligada, o PDF é otimizado antes (ver otimiza_functions).
+
+    O arquivo é gravado em um temporário na mesma pasta e só então renomeado, para que uma interrupção
+    nunca deixe um PDF pela metade no lugar da saída (ou da versão anterior dela).
+    """
+    backend = get_backend()
+    if otimiza_functions.ATIVO:
+        backend.otimiza(writer)
+    if _pacote is not None:
+        _pacote.grava(path, writer)
+        return
+    descritor, temporario = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(path) or '.')
+    os.close(descritor)
+    try:
+        backend.salva(writer, temporario)
+        os.replace(temporario, path)
+    except BaseException:
+        os.remove(temporario)
+        raise
+
+
+def renomeia(origem: str, path: str, mantem: bool = False) -> None:
+    """
+    Renomeia um arquivo ou, com um pacote ativo, o adiciona ao pacote e remove o original.
+    Com `mantem`, o original é preservado (a saída é copiada).
+    """
+    if _pacote is not None:
+        _pacote.adiciona(origem, path)
+        if not mantem:
+            os.remove(origem)
+    elif mantem:
+        shutil.copy2(origem, path)
+    else:
+        os.rename(origem, path)
@@ -0,0 +1,141 @@
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+import heapq
+import json
+import time
+import os
+
+# Etapas medidas em cada execução.
+FASES: Tuple[str, ...] = ('abertura', 'extracao', 'classificacao', 'consulta', 'escrita')
+# Etapas medidas explicitamente com `fase`. O restante do tempo gasto com cada página é classificação.
+EXPLICITAS: Tuple[str, ...] = ('abertura', 'consulta', 'escrita')
+# Pasta onde os relatórios de tempo de cada execução são salvos.
+RELATORIO_PATH: str = 'configs/relatorios'
+# Quantidade de páginas mais lentas listadas no relatório.
+N_LENTAS: int = 20
+
+
+class Perfil:
+    """
+    Acumula o tempo gasto em cada etapa de uma execução, no total, por arquivo e por página.
+    """
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.totais: Dict[str, float] = dict.fromkeys(FASES, 0.0)
+        self.arquivos: Dict[str, Dict[str, float]] = {}
+        # Heap com as páginas mais lentas: (tempo, arquivo, página).
+        self.lentas: List[Tuple[float, str, int]] = []
+        # Arquivo sendo percorrido, a quem são atribuídas as etapas medidas sem arquivo.
+        self.atual: str | None = None
+        # Dados adicionais de cada função, incluídos no relatório (ex.: acertos das regras de classificação).
+        self.detalhes: Dict[str, Any] = {}
+
+    def adiciona(self, nome: str, tempo: float, file: str | None = None) -> None:
+        self.totais[nome] += tempo
+        file = file if file is not None else self.atual
+        if file is not None:
+            self.arquivos.setdefault(file, dict.fromkeys(FASES, 0.0))[nome] += tempo
+
+    def pagina(self, file: str, idx: int, tempo: float) -> None:
+        if len(self.lentas) < N_LENTAS:
+            heapq.heappush(self.lentas, (tempo, file, idx))
+        else:
+            heapq.heappushpop(self.lentas, (tempo, file, idx))
+
+    def explicitas(self) -> float:
+        return sum(self.totais[nome] for nome in EXPLICITAS)
+
+    @contextmanager
+    def fase(self, nome: str, file: str | None = None) -> Iterator[None]:
+        st = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.adiciona(nome, time.perf_counter() - st, file)
+
+    def resumo(self) -> Dict[str, Any]:
+        return {
+            'total': time.perf_counter() - self.inicio,
+            'fases': dict(self.totais),
+            'arquivos': self.arquivos,
+            'paginas_lentas': [{'arquivo': file, 'pagina': idx + 1, 'tempo': tempo}
+                               for tempo, file, idx in sorted(self.lentas, reverse=True)],
+            'detalhes': self.detalhes,
+        }
+
+    def salva(self, option: int, nome: str, n_pags: int) -> str | None:
+        """
+        Salva o resumo da execução em um JSON na pasta de relatórios.
+        Returns:
+            (str): O caminho do relatório, ou None se não foi possível salvá-lo.
+        """
+        path = os.path.join(RELATORIO_PATH, f'f{option:02}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json')
+        relatorio = {'option': option, 'nome': nome, 'n_pags': n_pags, **self.resumo()}
+        try:
+            os.makedirs(RELATORIO_PATH, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump(relatorio, file, ensure_ascii=False, indent=2)
+        except OSError:
+            return None
+        return path
+
+
+_perfil: Perfil = Perfil()
+
+
+def inicia() -> Perfil:
+    """
+    Inicia a medição de uma nova execução.
+    """
+    global _perfil
+    _perfil = Perfil()
+    return _perfil
+
+
+def get_perfil() -> Perfil:
+    return _perfil
+
+
+def fase(nome: str, file: str | None = None):
+    """
+    Mede o bloco como uma das etapas da execução atual. Ex.:
+        with fase('escrita'):
+            writer.write(output)
+    """
+    return _perfil.fase(nome, file)
+
+
+def percorre(itens: Iterable, file: str | None = None) -> Iterator:
+    """
+    Repassa os itens de um iterador de páginas, medindo o tempo para produzir cada item como extração
+    e o tempo gasto por quem consome o item como classificação, descontadas as etapas medidas com `fase`.
+    Sem `file`, cada item é a primeira página de um arquivo e o seu primeiro elemento é o nome do arquivo.
+    """
+    perfil = get_perfil()
+    itens = iter(itens)
+    idx = 0
+    try:
+        while True:
+            st = time.perf_counter()
+            try:
+                item = next(itens)
+            except StopIteration:
+                return
+            extracao = time.perf_counter() - st
+            arquivo = file if file is not None else item[0]
+            perfil.atual = arquivo
+            perfil.adiciona('extracao', extracao)
+            explicitas = perfil.explicitas()
+            st = time.perf_counter()
+            yield item
+            consumo = time.perf_counter() - st
+            perfil.adiciona('classificacao', max(0.0, consumo - (perfil.explicitas() - explicitas)))
+            perfil.pagina(arquivo, idx if file is not None else 0, extracao + consumo)
+            idx += 1
+    finally:
+        perfil.atual = None
+        # Fecha o iterador original, para que ele conclua o que faz ao final (ex.: gravar o cache).
+        if hasattr(itens, 'close'):
+            itens.close()
@@ -0,0 +1,119 @@
+from typing import Any, Dict, List, Sequence, Tuple
+import pandas as pd
+import tempfile
+import re
+import sys
+import os
+
+# Com MANIPULADOR_PARQUET=1, as planilhas geradas pelas opções que extraem tabelas (ex.: a 19) também
+# são gravadas em Parquet, ao lado do Excel, para serem lidas por outras ferramentas sem o limite de
+# linhas do Excel. Precisa do pyarrow instalado.
+PARQUET: bool = os.environ.get('MANIPULADOR_PARQUET') == '1'
+
+
+def ativa(ligado: bool = True) -> None:
+    """
+    Liga ou desliga a gravação em Parquet, inclusive nos processos criados depois.
+    """
+    global PARQUET
+    PARQUET = ligado
+    os.environ['MANIPULADOR_PARQUET'] = '1' if ligado else '0'
+
+
+class Colunas:
+    """
+    Acumula as linhas de uma tabela em uma lista por coluna, e só monta o DataFrame no final.
+    Inserir linha a linha em um DataFrame (`df.loc[len(df)] = ...`) copia a tabela a cada linha,
+    o que fica quadrático nos relatórios grandes. Ex.:
+        colunas = Colunas(['Nome', 'Valor'])
+        colunas.adiciona('Fulano', '1,50')
+        df = colunas.tabela()
+    """
+
+    def __init__(self, nomes: Sequence[str]):
+        self.dados: Dict[str, List[Any]] = {nome: [] for nome in nomes}
+        self._listas = list(self.dados.values())
+
+    def adiciona(self, *valores: Any) -> None:
+        for lista, valor in zip(self._listas, valores):
+            lista.append(valor)
+
+    def __len__(self) -> int:
+        return len(self._listas[0]) if self._listas else 0
+
+    def tabela(self) -> pd.DataFrame:
+        return pd.DataFrame(self.dados, columns=list(self.dados))
+
+
+class Extrator:
+    """
+    Extrai as linhas de uma tabela do texto de uma página com uma regex compilada: cada ocorrência
+    vira uma linha, com os grupos nomeados de `colunas` (por padrão, todos), e None nos grupos que
+    não participaram da ocorrência.
+
+    A regex é aplicada ao texto inteiro da página, precedido de uma quebra, de modo que toda linha,
+    inclusive a primeira, começa com '\\n'. Pode ser passado como parser de `paginas` (ver
+    extract_functions), que o executa nos processos do pool, junto da extração. Ex.:
+        extrator = Extrator(re.compile(r'\\nNome: (?P<nome>[^\\n]*)'))
+        for page, linhas in paginas(file, pdf, extrator):
+            ...
+    """
+
+    def __init__(self, regex: re.Pattern, colunas: Sequence[str] | None = None):
+        self.regex = regex
+        self.colunas = tuple(colunas if colunas is not None else regex.groupindex)
+
+    def __call__(self, rows: List[str]) -> List[Tuple[str | None, ...]]:
+        texto = '\n' + '\n'.join(rows)
+        return [tuple(match.group(coluna) for coluna in self.colunas) for match in self.regex.finditer(texto)]
+
+
+def valores(serie: pd.Series) -> pd.Series:
+    """
+    Converte de uma vez uma coluna de valores com vírgula decimal (ex.: '1,50' ou '1.234,56') em float,
+    como `converte` de campos_functions. O ponto só é tirado quando separa milhares, antes de outro
+    separador, para que valores já com ponto decimal (ex.: '1.50') continuem iguais.
+    """
+    return (serie.astype(str).str.replace(r'\.(?=\d{3}[.,])', '', regex=True)
+            .str.replace(',', '.', regex=False).astype(float))
+
+
+def _pyarrow() -> bool:
+    """
+    Indica se o pyarrow, usado pelo pandas para gravar o Parquet, está instalado.
+    """
+    from importlib.util import find_spec
+    return find_spec('pyarrow') is not None
+
+
+def _substitui(path: str, grava) -> None:
+    """
+    Grava em um temporário na mesma pasta e só então renomeia, como os PDFs (ver pacote_functions.salva_pdf).
+    """
+    descritor, temporario = tempfile.mkstemp(suffix=os.path.splitext(path)[1], dir=os.path.dirname(path) or '.')
+    os.close(descritor)
+    try:
+        grava(temporario)
+        os.replace(temporario, path)
+    except BaseException:
+        os.remove(temporario)
+        raise
+
+
+def salva(df: pd.DataFrame, path: str) -> List[str]:
+    """
+    Grava a tabela em Excel e, com a gravação em Parquet ligada, também em Parquet, com o mesmo nome.
+    Sem o pyarrow, avisa e grava apenas o Excel.
+    Returns:
+        (List[str]): Os arquivos gravados.
+    """
+    _substitui(path, lambda destino: df.to_excel(destino, index=False))
+    gravados = [path]
+    if PARQUET:
+        if _pyarrow():
+            parquet = os.path.splitext(path)[0] + '.parquet'
+            _substitui(parquet, lambda destino: df.to_parquet(destino, index=False))
+            gravados.append(parquet)
+        else:
+            print('pyarrow não instalado (pip install pyarrow), gravando apenas o Excel.', file=sys.stderr)
+    return gravados
@@ -0,0 +1,158 @@
+from .extract_functions import cabecalho, extrai_linhas, origem
+from .manifest_functions import Origem, get_manifesto, grava_lote
+from .perfil_functions import fase
+from .sink_functions import move
+from contextlib import contextmanager
+from collections import Counter
+from PyPDF2 import PageObject
+from typing import Any, Callable, Dict, Iterator, List
+import csv
+import sys
+import os
+
+# Pasta onde ficam as páginas e arquivos que não puderam ser identificados.
+PASTA: str = '_Nao_Identificados'
+# Registro de cada página ou arquivo separado, com o motivo.
+MOTIVOS_PATH: str = os.path.join(PASTA, 'motivos.csv')
+# Erros causados por páginas com um layout diferente do esperado (linha inexistente, texto não encontrado...).
+# Outros erros (ex.: AttributeError) indicam um erro no código e interrompem a execução.
+ERROS: tuple = (IndexError, KeyError, ValueError)
+
+
+class Quarentena:
+    """
+    Separa as páginas que uma função não conseguiu identificar, para que a execução continue sem
+    perguntar nada ao usuário. Ao final, as páginas são gravadas em `_Nao_Identificados`, um arquivo
+    por arquivo de origem, junto de um registro com o motivo de cada uma.
+    """
+
+    def __init__(self):
+        # Páginas separadas de cada arquivo de origem, na ordem em que foram encontradas.
+        self.paginas: Dict[str, List[Origem]] = {}
+        # Um registro por página (ou arquivo inteiro): arquivo, página (1, 2, ...) e motivo.
+        self.registros: List[Dict] = []
+
+    def pagina(self, page: PageObject, motivo: str) -> None:
+        self.adiciona(*origem(page), motivo)
+
+    def adiciona(self, file: str, idx: int, motivo: str) -> None:
+        """
+        Separa a página de índice `idx` do arquivo. Usada também para as páginas de arquivos pulados
+        ao retomar uma execução interrompida (ver diario_functions).
+        """
+        self.paginas.setdefault(file, []).append((file, idx))
+        self.registros.append({'arquivo': file, 'pagina': idx + 1, 'motivo': motivo})
+
+    def arquivo(self, file: str, motivo: str) -> None:
+        """
+        Separa o arquivo inteiro, usado pelas opções que apenas renomeiam os arquivos.
+        """
+        move(file, os.path.join(PASTA, file), motivo=motivo)
+        self.registros.append({'arquivo': file, 'pagina': '', 'motivo': motivo})
+
+    def resumo(self) -> Dict:
+        return {
+            'paginas': sum(len(paginas) for paginas in self.paginas.values()),
+            'arquivos': sum(1 for registro in self.registros if registro['pagina'] == ''),
+            'motivos': dict(Counter(registro['motivo'] for registro in self.registros).most_common()),
+        }
+
+    def fecha(self) -> Dict:
+        """
+        Grava as páginas separadas e o registro dos motivos, e mostra um resumo.
+        Returns:
+            (Dict): A quantidade de páginas e arquivos separados e quantas vezes cada motivo ocorreu.
+        """
+        resumo = self.resumo()
+        if not self.registros:
+            return resumo
+        os.makedirs(PASTA, exist_ok=True)
+        gravacoes = [(os.path.join(PASTA, os.path.splitext(os.path.basename(file))[0] + '.pdf'), paginas)
+                     for file, paginas in self.paginas.items()]
+        manifesto = get_manifesto()
+        if manifesto is not None:
+            for destino, paginas in gravacoes:
+                manifesto.adiciona(destino, paginas)
+        elif gravacoes:
+            with fase('escrita'):
+                grava_lote(os.getcwd(), os.getcwd(), gravacoes)
+        with open(MOTIVOS_PATH, 'w', newline='', encoding='utf-8-sig') as file:
+            writer = csv.DictWriter(file, fieldnames=['arquivo', 'pagina', 'motivo'], delimiter=';')
+            writer.writeheader()
+            writer.writerows(self.registros)
+
+        # O resumo vai para a saída de erro, que a linha de comando não usa para o JSON.
+        print(f'{resumo["paginas"]} página(s) e {resumo["arquivos"]} arquivo(s) não identificados, '
+              f'separados em {PASTA} (motivos em {MOTIVOS_PATH}):', file=sys.stderr)
+        for motivo, n in list(resumo['motivos'].items())[:10]:
+            print(f'{n:>6}  {motivo}', file=sys.stderr)
+        return resumo
+
+
+_quarentena: Quarentena = Quarentena()
+
+
+def inicia() -> Quarentena:
+    """
+    Inicia a separação de páginas não identificadas de uma nova execução.
+    """
+    global _quarentena
+    _quarentena = Quarentena()
+    return _quarentena
+
+
+def get_quarentena() -> Quarentena:
+    return _quarentena
+
+
+def nao_identificada(page: PageObject, motivo: str) -> None:
+    """
+    Separa uma página entregue por `paginas` que não pôde ser identificada.
+    """
+    _quarentena.pagina(page, motivo)
+
+
+def nao_identificado(file: str, motivo: str) -> None:
+    """
+    Separa um arquivo inteiro que não pôde ser identificado.
+    """
+    _quarentena.arquivo(file, motivo)
+
+
+def descreve(erro: BaseException) -> str:
+    return f'{type(erro).__name__}: {erro}'
+
+
+def aplica(regra: Callable[[List[str]], Any], page: PageObject, rows: List[str]) -> Any:
+    """
+    Aplica a regra às linhas da página. Se a página veio apenas com as linhas do cabeçalho (ver
+    extract_functions.cabecalho) e a regra falhar por causa do layout (ver `ERROS`), por exemplo porque o
+    texto extraído até ali não é igual ao início da página inteira, a página inteira é extraída e a regra é
+    repetida. Se falhar de novo, o erro segue para `protege`, que separa a página.
+    """
+    try:
+        return regra(rows)
+    except ERROS:
+        if not cabecalho(page):
+            raise
+    return regra(extrai_linhas(page))
+
+
+@contextmanager
+def protege(page: PageObject | None = None, file: str | None = None) -> Iterator[None]:
+    """
+    Se o bloco falhar por causa do layout da página (ver `ERROS`), a página (ou, com `file`, o arquivo)
+    é separada e a execução continua. Com as linhas do cabeçalho, a regra que lê a página deve ser aplicada
+    com `aplica`, para que seja repetida com a página inteira antes de a página ser separada. Ex.:
+        for page, rows in paginas(file, pdf, n_linhas=12):
+            with protege(page):
+                nome = aplica(lambda rows: rows[11], page, rows)
+                ...
+    """
+    try:
+        yield
+    except ERROS as erro:
+        if file is not None:
+            nao_identificado(file, descreve(erro))
+        else:
+            nao_identificada(page, descreve(erro))
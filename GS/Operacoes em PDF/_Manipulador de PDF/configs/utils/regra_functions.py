@@ -0,0 +1,133 @@
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+import time
+import re
+
+
+class Campo(NamedTuple):
+    """
+    Onde está um dado da página, a partir das linhas do texto extraído.
+    A linha é a de índice `linha` ou a primeira que contém `contem`, somada de `deslocamento`.
+    Com `regex`, o valor é o primeiro grupo encontrado na linha. Em seguida os caracteres de
+    `remove` são retirados e, com `espacos`, os espaços repetidos e das pontas.
+    """
+    linha: int | None = None
+    contem: str | None = None
+    deslocamento: int = 0
+    regex: str | None = None
+    remove: str = ''
+    espacos: bool = False
+
+
+class Regra(NamedTuple):
+    """
+    Um tipo de documento: o título que o identifica (ou o seu início, com `prefixo`) e onde está o nome.
+    """
+    titulo: str
+    nome: Campo
+    prefixo: bool = False
+
+
+# Tipos de documento da admissão: o título e onde está o nome do funcionário. Usados pela opção 1 e pelo
+# script Admissoes, para que os dois identifiquem os mesmos documentos.
+# No TERMO LDPD e na CTPS DIGITAL o nome vai até a primeira vírgula da linha. Sem a vírgula, ele vai até o
+# fim da linha; o recorte anterior (`row[35:row.find(',', 35)]`) perdia o último caractere nesse caso. No
+# TERMO LDPD, uma linha com menos de 35 caracteres não tem nome, e a página é separada como não identificada
+# em vez de gerar um arquivo sem nome.
+ADMISSAO: Tuple[Regra, ...] = (
+    Regra('DECLARAÇÃO DE DEPENDENTES PARA FINS DE IMPOSTO DE RENDA', Campo(linha=2)),
+    Regra('TERMO LDPD', Campo(linha=3, regex=r'^.{35}([^,]*)', remove='_')),
+    Regra('R E C I B O D E E N T R E G A D A C A R T E I R A D E T R A B A L H O',
+          Campo(contem='(Carimbo e visto da empresa)', regex=r'^.{28}(.*).{12}$')),
+    Regra('CTPS DIGITAL', Campo(linha=3, regex=r'^[^ ]*([^,]*)', espacos=True)),
+    Regra('TERMO DE COMPROMISSO DE VALE-TRANSPORTE', Campo(contem='SSPNome', deslocamento=1)),
+    Regra('TERMO COLETIVO DE CESSÃO GRATUITA DE USO DE IMAGEM PARA DIVULGAÇÃO',
+          Campo(contem='Empregado: ', regex=r'^.{11}(.*)')),
+    Regra('REGISTRO DE EMPREGADONúmero:', Campo(linha=19, regex=r'^(.*).{14}$')),
+    Regra('Termo de Responsabilidade', Campo(linha=6, regex=r'^(.*).{10}$')),
+    Regra('Contrato de Experiência de Trabalho', Campo(linha=2, regex=r',([^,]*?) p[^,]*$', espacos=True)),
+    Regra('A Controladora fica ', Campo(linha=30), prefixo=True),
+    Regra('AUTODECLARAÇÃO ÉTNICO-RACIAL', Campo(linha=13)),
+    # No Termo LGPD o nome fica na primeira página; as cláusulas seguintes também têm o nome em linhas fixas.
+    Regra('TERMO LGPD', Campo(linha=3, regex=r', eu\s*([^,]*?)\s*(?:,|$)')),
+    Regra('" CLÁUSULA TERCEIRA: COMPARTILHAMENTO DE DADOS.', Campo(linha=31)),
+    Regra('" CLÁUSULA QUARTA: RESPONSABILIDADE PELA SEGURANÇA DOS DADOS.', Campo(linha=29)),
+    Regra('" CLÁUSULA QUINTA: TÉRMINO DO TRATAMENTO DOS DADOS.', Campo(linha=23)),
+)
+
+
+def titulo(rows: Sequence[str]) -> str:
+    """
+    Retorna a primeira linha não vazia da página, sem espaços repetidos.
+    """
+    for row in rows:
+        if row.strip():
+            return ' '.join(row.split())
+    return ''
+
+
+def extrai(campo: Campo, rows: Sequence[str], regex: re.Pattern | None = None) -> str | None:
+    """
+    Retorna o valor do campo na página, ou None se a linha ou o padrão não forem encontrados.
+    """
+    idx = campo.linha
+    if campo.contem is not None:
+        idx = next((i for i, row in enumerate(rows) if campo.contem in row), None)
+    if idx is None or not 0 <= idx + campo.deslocamento < len(rows):
+        return None
+    valor = rows[idx + campo.deslocamento]
+    if campo.regex is not None:
+        encontrado = (regex or re.compile(campo.regex)).search(valor)
+        if encontrado is None:
+            return None
+        valor = encontrado.group(1)
+    for char in campo.remove:
+        valor = valor.replace(char, '')
+    if campo.espacos:
+        valor = ' '.join(valor.split())
+    return valor
+
+
+class TabelaTitulos:
+    """
+    Identifica o tipo de documento de cada página comparando o título com todas as regras de uma vez,
+    em uma única expressão regular compilada, e extrai o nome conforme a regra encontrada. Não confundir
+    com group_functions.Classificador, que calcula a chave de agrupamento das páginas.
+
+    Conta quantas páginas cada regra identificou e o tempo gasto, que são incluídos no relatório da execução.
+    """
+
+    def __init__(self, regras: Sequence[Regra]):
+        self.regras = list(regras)
+        # Cada regra é um grupo nomeado (r0, r1, ...); o grupo que casar indica a regra.
+        self.padrao = re.compile('|'.join(f'(?P<r{i}>{re.escape(regra.titulo)}{"" if regra.prefixo else "$"})'
+                                          for i, regra in enumerate(self.regras)))
+        self.regexes = [re.compile(regra.nome.regex) if regra.nome.regex else None for regra in self.regras]
+        self.acertos: List[int] = [0] * len(self.regras)
+        self.nao_reconhecidos: int = 0
+        self.tempo: float = 0.0
+
+    def classifica(self, rows: Sequence[str]) -> Tuple[Regra | None, str, str | None]:
+        """
+        Returns:
+            (Regra | None, str, str | None): A regra do documento (None se nenhuma reconhece o título),
+                o título e o nome extraído (None se não foi encontrado).
+        """
+        st = time.perf_counter()
+        texto = titulo(rows)
+        encontrado = self.padrao.match(texto)
+        if encontrado is None:
+            self.nao_reconhecidos += 1
+            self.tempo += time.perf_counter() - st
+            return None, texto, None
+        i = int(encontrado.lastgroup[1:])
+        self.acertos[i] += 1
+        nome = extrai(self.regras[i].nome, rows, self.regexes[i])
+        self.tempo += time.perf_counter() - st
+        return self.regras[i], texto, nome
+
+    def resumo(self) -> Dict:
+        return {
+            'acertos': {regra.titulo: n for regra, n in zip(self.regras, self.acertos)},
+            'nao_reconhecidos': self.nao_reconhecidos,
+            'tempo': self.tempo,
+        }
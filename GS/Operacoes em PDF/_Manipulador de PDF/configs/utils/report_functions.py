@@ -10,7 +10,9 @@ import os
 def salva_relatorio(row: List[List]):
     SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
     SAMPLE_SPREADSHEET_ID = "15gGHm67_W5maIas-4_YPSzE6R5f_CNJGcza_BJFlNBk"  # Código da planilha
-    SAMPLE_RANGE_NAME = "Página1!A{}:D1000"  # Intervalo que será lido
+    # Colunas: data, tipo, páginas, tempo total e o tempo de cada etapa (abertura, extração,
+    # classificação, consulta e escrita).
+    SAMPLE_RANGE_NAME = "Página1!A{}:I1000"  # Intervalo que será lido
     creds = None
     if os.path.exists("configs/creds/token.json"):
         creds = Credentials.from_authorized_user_file("configs/creds/token.json", SCOPES)
@@ -0,0 +1,159 @@
+from .manifest_functions import get_manifesto
+from .pacote_functions import get_pacote
+from functools import lru_cache
+from typing import Dict, Iterable, Set, Tuple
+import re
+import sys
+import os
+
+# Caracteres que o Windows não aceita em nomes de arquivo, inclusive os separadores de pasta.
+_PROIBIDOS = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+
+@lru_cache(maxsize=None)
+def limpa(nome: str) -> str:
+    """
+    Remove do nome os caracteres que não podem fazer parte de um nome de arquivo, inclusive '/' e '\\'.
+    Usada nos dados extraídos que viram parte do nome de uma saída. Ex.:
+        grava(f'Arquivos/{limpa(lotacao)}.pdf', [page], lotacao=lotacao)
+    """
+    return _PROIBIDOS.sub('', nome)
+
+
+def _grava_arquivos() -> bool:
+    """
+    Indica se as saídas são gravadas como arquivos, e não planejadas ou gravadas em um pacote.
+    """
+    return get_manifesto() is None and get_pacote() is None
+
+
+def _divide(path: str) -> Tuple[str, str]:
+    """
+    Separa a pasta (com o separador final) e o nome do arquivo. As funções usam tanto '/' quanto '\\'
+    nos caminhos; as pastas passam a ser separadas por '/', aceito também no Windows.
+    """
+    pasta, separador, nome = path.replace('\\', '/').rpartition('/')
+    return pasta + separador, nome
+
+
+class Saidas:
+    """
+    Índice em memória das saídas de uma execução: as pastas já criadas e os nomes de arquivo já usados.
+
+    Cada pasta é criada uma única vez, na primeira saída gravada nela, e as seguintes não consultam o
+    disco. Um nome já usado na execução ganha um sufixo, como as entradas repetidas de um pacote (ver
+    pacote_functions): a segunda saída `Arquivos/Fulano.pdf` vira `Arquivos/Fulano (2).pdf`, em vez de
+    substituir a primeira. Os sufixos seguem a ordem das saídas, então a mesma entrada gera sempre os
+    mesmos arquivos. Arquivos de execuções anteriores não contam, e são substituídos.
+
+    No modo de planejamento (ver manifest_functions) e gravando em um pacote, os nomes são reservados,
+    mas nenhuma pasta é criada. As pastas são relativas a `raiz` (por padrão, a pasta atual).
+    """
+
+    def __init__(self, raiz: str | None = None):
+        self.raiz = raiz
+        # Pastas já criadas e nomes já usados, comparados como o sistema compara (sem maiúsculas no Windows).
+        self.pastas: Dict[str, str] = {}
+        self.nomes: Set[str] = set()
+        # Próximo sufixo a tentar para cada nome repetido.
+        self.sufixos: Dict[str, int] = {}
+        self.n_repetidos: int = 0
+
+    @staticmethod
+    def _chave(path: str) -> str:
+        return os.path.normcase(os.path.normpath(path))
+
+    def pasta(self, path: str, cria: bool = True) -> str:
+        """
+        Cria a pasta, se ainda não foi criada nesta execução. Com `cria` False, no modo de planejamento
+        ou gravando em um pacote, apenas a registra.
+        """
+        path = path.replace('\\', '/')
+        chave = self._chave(path)
+        if chave not in self.pastas:
+            self.pastas[chave] = path
+            if cria and _grava_arquivos():
+                os.makedirs(os.path.join(self.raiz or '', path), exist_ok=True)
+        return path
+
+    def reserva(self, path: str, cria: bool = True) -> str:
+        """
+        Reserva o nome de uma saída e cria a sua pasta (ver `pasta`).
+        Returns:
+            (str): O caminho a ser gravado: o próprio `path`, sem os caracteres proibidos no nome do
+                arquivo, ou, se ele já foi usado nesta execução, com o próximo sufixo livre.
+        """
+        pasta, nome = _divide(path)
+        path = pasta + limpa(nome)
+        chave = self._chave(path)
+        if chave in self.nomes:
+            base, ext = os.path.splitext(path)
+            n = self.sufixos.get(chave, 2)
+            while self._chave(f'{base} ({n}){ext}') in self.nomes:
+                n += 1
+            self.sufixos[chave] = n + 1
+            self.n_repetidos += 1
+            path = f'{base} ({n}){ext}'
+            chave = self._chave(path)
+        self.nomes.add(chave)
+        if pasta:
+            self.pasta(pasta, cria)
+        return path
+
+    def marca(self, paths: Iterable[str]) -> None:
+        """
+        Registra como usados os nomes de saídas gravadas fora desta execução (ex.: as dos arquivos pulados
+        ao retomar uma execução interrompida, ver diario_functions), sem sufixo.
+        """
+        self.nomes.update(self._chave(path) for path in paths)
+
+    def cria(self) -> None:
+        """
+        Cria de uma vez as pastas registradas sem criar (ex.: as de um manifesto, antes de gravá-lo).
+        """
+        if not _grava_arquivos():
+            return
+        for pasta in self.pastas.values():
+            os.makedirs(os.path.join(self.raiz or '', pasta), exist_ok=True)
+
+    def fecha(self) -> int:
+        """
+        Avisa quantas saídas tiveram o nome repetido.
+        Returns:
+            (int): A quantidade de saídas gravadas com sufixo.
+        """
+        if self.n_repetidos:
+            print(f'{self.n_repetidos} saída(s) com nome repetido gravada(s) com sufixo (ex.: "Fulano (2).pdf").',
+                  file=sys.stderr)
+        return self.n_repetidos
+
+
+_saidas: Saidas = Saidas()
+
+
+def inicia() -> Saidas:
+    """
+    Inicia o índice de saídas de uma nova execução.
+    """
+    global _saidas
+    _saidas = Saidas()
+    return _saidas
+
+
+def get_saidas() -> Saidas:
+    return _saidas
+
+
+def pasta(path: str) -> str:
+    """
+    Cria a pasta de destino das saídas uma única vez por execução. Ex.:
+        pasta('Arquivos')
+    """
+    return _saidas.pasta(path)
+
+
+def reserva(path: str) -> str:
+    """
+    Reserva o nome de uma saída da execução atual (ver `Saidas.reserva`).
+    """
+    return _saidas.reserva(path)
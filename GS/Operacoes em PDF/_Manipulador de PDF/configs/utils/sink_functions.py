@@ -0,0 +1,220 @@
+from . import memoria_functions
+from .manifest_functions import get_manifesto, grava_lote_remoto
+from .otimiza_functions import soma
+from .diario_functions import registra
+from .extract_functions import origem, pool_ativo
+from .pacote_functions import get_pacote, renomeia, salva_pdf
+from .saida_functions import reserva
+from .perfil_functions import fase
+from .backend_functions import Pagina, get_backend
+from concurrent.futures import Future
+from contextlib import ExitStack
+from typing import Dict, List
+import tempfile
+import weakref
+import shutil
+import os
+
+# Quantidade máxima de páginas mantidas em memória antes de despejar em disco.
+LIMITE_PAGINAS: int = 2000
+
+
+class PageSink:
+    """
+    Acumula as páginas de cada arquivo de saída e grava cada arquivo uma única vez, no fechamento.
+
+    Substitui o padrão de abrir o arquivo já salvo, copiar todas as suas páginas e regravá-lo
+    a cada nova página do mesmo funcionário/tomador. Quando o total de páginas em memória
+    passa de `limite`, ou o uso de memória passa do limite de memoria_functions, as páginas
+    pendentes são gravadas em arquivos parciais temporários, que são unidos na ordem correta ao fechar.
+
+    No modo de planejamento (ver manifest_functions), apenas a origem de cada página é guardada
+    e, ao fechar, os arquivos de saída são registrados no manifesto.
+
+    Uso:
+        with PageSink() as sink:
+            sink.add('Arquivos/Fulano.pdf', page)
+    """
+
+    def __init__(self, limite: int = LIMITE_PAGINAS):
+        self.limite = limite
+        self.manifesto = get_manifesto()
+        # Dados extraídos que definiram o nome de cada arquivo de saída.
+        self.chaves: Dict[str, Dict] = {}
+        # Páginas em memória de cada arquivo de saída, na ordem de chegada.
+        self.paginas: Dict[str, List[Pagina]] = {}
+        # Arquivos parciais já despejados em disco para cada arquivo de saída.
+        self.parciais: Dict[str, List[str]] = {}
+        self.n_memoria: int = 0
+        self.n_parciais: int = 0
+        self.tmp_dir: str | None = None
+        _sinks.add(self)
+
+    def __enter__(self) -> 'PageSink':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.descarta()
+
+    def add(self, file_name: str, page: Pagina, **chaves) -> None:
+        """
+        Adiciona uma página ao final do arquivo de saída `file_name`.
+        Os argumentos nomeados são os dados usados no nome do arquivo, registrados no manifesto.
+        """
+        self.chaves.setdefault(file_name, chaves)
+        if self.manifesto is not None:
+            self.paginas.setdefault(file_name, []).append(origem(page))
+            return
+        self.paginas.setdefault(file_name, []).append(page)
+        self.n_memoria += 1
+        if self.limite and self.n_memoria >= self.limite:
+            self.despeja()
+
+    def despeja(self) -> None:
+        """
+        Grava as páginas em memória em arquivos parciais temporários e as libera.
+        """
+        if self.tmp_dir is None:
+            self.tmp_dir = tempfile.mkdtemp(prefix='manipulador_')
+        for file_name, pages in self.paginas.items():
+            if not pages:
+                continue
+            parciais = self.parciais.setdefault(file_name, [])
+            parcial = os.path.join(self.tmp_dir, f'{self.n_parciais}.pdf')
+            self.n_parciais += 1
+            backend = get_backend()
+            with fase('escrita'), open(parcial, 'wb') as output:
+                backend.grava(backend.copia(pages), output)
+            parciais.append(parcial)
+        self.paginas = {file_name: [] for file_name in self.paginas}
+        self.n_memoria = 0
+
+    def close(self) -> int:
+        """
+        Grava todos os arquivos de saída e remove os parciais.
+        Returns:
+            (int): A quantidade de arquivos gravados.
+        """
+        n_arquivos = 0
+        if self.manifesto is not None:
+            for file_name, origens in self.paginas.items():
+                self.manifesto.adiciona(reserva(file_name), origens, self.chaves[file_name])
+            n_arquivos = len(self.paginas)
+            self.descarta()
+            return n_arquivos
+        # O dicionário de páginas mantém a ordem em que cada arquivo apareceu pela primeira vez.
+        backend = get_backend()
+        for file_name in self.paginas:
+            # Os parciais ficam abertos só até a gravação, para que possam ser removidos em seguida.
+            with fase('escrita'), ExitStack() as abertos:
+                writer = backend.copia([page for parcial in self.parciais.get(file_name, [])
+                                        for page in backend.abre(abertos.enter_context(open(parcial, 'rb'))).pages]
+                                       + self.paginas.get(file_name, []))
+                if not writer.pages:
+                    continue
+                path = reserva(file_name)
+                salva_pdf(path, writer)
+            registra(path)
+            n_arquivos += 1
+        self.descarta()
+        return n_arquivos
+
+    def descarta(self) -> None:
+        """
+        Libera as páginas em memória e apaga os arquivos parciais sem gravar as saídas.
+        """
+        self.paginas = {}
+        self.parciais = {}
+        self.chaves = {}
+        self.n_memoria = 0
+        if self.tmp_dir is not None:
+            shutil.rmtree(self.tmp_dir, ignore_errors=True)
+            self.tmp_dir = None
+
+
+# Sinks em uso, despejados quando o limite de memória é passado.
+_sinks: 'weakref.WeakSet[PageSink]' = weakref.WeakSet()
+
+
+@memoria_functions.registra
+def libera() -> None:
+    for sink in list(_sinks):
+        if sink.n_memoria:
+            sink.despeja()
+
+
+def grava(file_name: str, pages: List[Pagina], **chaves) -> None:
+    """
+    Grava as páginas em um arquivo de saída. No modo de planejamento, apenas registra a saída no manifesto.
+    Os argumentos nomeados são os dados usados no nome do arquivo. Um nome já usado na execução ganha
+    um sufixo (ver saida_functions).
+    """
+    file_name = reserva(file_name)
+    manifesto = get_manifesto()
+    if manifesto is not None:
+        manifesto.adiciona(file_name, [origem(page) for page in pages], chaves)
+        return
+    with fase('escrita'):
+        salva_pdf(file_name, get_backend().copia(pages))
+    registra(file_name)
+
+
+def move(file: str, file_name: str, **chaves) -> None:
+    """
+    Renomeia um arquivo de entrada (ou o move para o pacote, ver pacote_functions). No modo de
+    planejamento, apenas registra a saída no manifesto.
+    """
+    file_name = reserva(file_name)
+    manifesto = get_manifesto()
+    if manifesto is not None:
+        manifesto.adiciona(file_name, None, chaves, origem=file)
+        return
+    with fase('escrita'):
+        renomeia(file, file_name)
+
+
+class Escritor:
+    """
+    Grava os arquivos de saída à medida que ficam prontos. Se o pool de extração estiver ativo, cada
+    gravação é enviada a um dos seus processos, que lê as páginas do arquivo de origem, e o processo
+    principal segue para as próximas páginas. Caso contrário, no modo de planejamento ou gravando em um
+    pacote, equivale a `grava`.
+
+    Uso:
+        with Escritor() as escritor:
+            escritor.grava('Arquivos/Lotacao.pdf', pages, lotacao='Lotacao')
+    """
+
+    def __init__(self):
+        # Os pacotes são gravados apenas pelo processo principal.
+        self.pool = pool_ativo() if get_manifesto() is None and get_pacote() is None else None
+        self.pendentes: List[Future] = []
+
+    def __enter__(self) -> 'Escritor':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def grava(self, file_name: str, pages: List[Pagina], **chaves) -> None:
+        if self.pool is None:
+            grava(file_name, pages, **chaves)
+            return
+        # O nome é reservado (e a pasta criada) antes do envio, então as gravações nunca disputam um destino.
+        file_name = reserva(file_name)
+        self.pendentes.append(self.pool.submit(grava_lote_remoto, os.getcwd(), os.getcwd(),
+                                               [(file_name, [origem(page) for page in pages])],
+                                               get_backend().nome))
+        registra(file_name)
+
+    def close(self) -> None:
+        """
+        Aguarda as gravações enviadas ao pool.
+        """
+        with fase('escrita'):
+            for future in self.pendentes:
+                soma(future.result()[1])
+        self.pendentes = []
@@ -0,0 +1,86 @@
+from .campos_functions import digitos
+from typing import Any, Callable, Dict, Iterable, List, Set, Tuple
+import pandas as pd
+import sys
+
+
+def so_digitos(valor: Any) -> str:
+    """
+    Normaliza um CNPJ/CPF/CEI mantendo apenas os dígitos. Ex.: '12.345.678/0001-90' -> '12345678000190'.
+    Números lidos do Excel como float (ex.: 12345678000190.0) são convertidos sem o '.0'.
+    """
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    return digitos(str(valor))
+
+
+def normaliza_nome(valor: Any) -> str:
+    """
+    Normaliza um nome (lotação, centro de custo, empresa) ignorando maiúsculas e espaços repetidos.
+    Ex.: ' Obra  Centro ' -> 'OBRA CENTRO'.
+    """
+    return ' '.join(str(valor).upper().split())
+
+
+class Indice:
+    """
+    Índice chave -> valor de uma tabela de relação (de-para), montado uma única vez por execução.
+
+    As chaves são normalizadas com `normaliza`, tanto na montagem quanto na busca. Linhas repetidas
+    com o mesmo valor são aceitas (`duplicadas`); chaves com valores diferentes são ambíguas e não
+    retornam nenhum valor (`ambiguas`), como acontecia com a busca pela tabela inteira.
+    """
+
+    def __init__(self, pares: Iterable[Tuple[Any, Any]], normaliza: Callable[[Any], str]):
+        self.normaliza = normaliza
+        self.valores: Dict[str, Any] = {}
+        self.duplicadas: Set[str] = set()
+        self.ambiguas: Dict[str, List[Any]] = {}
+        for chave, valor in pares:
+            if pd.isna(chave) or pd.isna(valor):
+                continue
+            chave = normaliza(chave)
+            if not chave:
+                continue
+            if chave in self.ambiguas:
+                if valor not in self.ambiguas[chave]:
+                    self.ambiguas[chave].append(valor)
+            elif chave not in self.valores:
+                self.valores[chave] = valor
+            elif self.valores[chave] == valor:
+                self.duplicadas.add(chave)
+            else:
+                self.ambiguas[chave] = [self.valores.pop(chave), valor]
+
+    def __len__(self) -> int:
+        return len(self.valores) + len(self.ambiguas)
+
+    def busca(self, chave: Any) -> Any | None:
+        """
+        Retorna o valor da chave, ou None se ela não está na tabela ou é ambígua.
+        """
+        return self.valores.get(self.normaliza(chave))
+
+    def avisa(self, descricao: str) -> None:
+        """
+        Informa as chaves ambíguas da tabela, que ficarão sem valor.
+        """
+        if not self.ambiguas:
+            return
+        print(f'{len(self.ambiguas)} {descricao} com mais de um valor na tabela de relação serão ignorados:',
+              file=sys.stderr)
+        for chave, valores in list(self.ambiguas.items())[:10]:
+            print(f'  {chave}: {", ".join(str(valor) for valor in valores)}', file=sys.stderr)
+
+
+def indexa(df: pd.DataFrame | None, coluna_chave: str, coluna_valor: str,
+           normaliza: Callable[[Any], str] = normaliza_nome) -> Indice:
+    """
+    Monta o índice de `coluna_chave` -> `coluna_valor` do DataFrame. Sem tabela, ou sem as colunas,
+    retorna um índice vazio. Ex.:
+        indice = indexa(df, 'nome', 'cnpj')
+        cnpj = indice.busca(lotacao) or ''
+    """
+    if df is None or coluna_chave not in df.columns or coluna_valor not in df.columns:
+        return Indice([], normaliza)
+    return Indice(zip(df[coluna_chave], df[coluna_valor]), normaliza)
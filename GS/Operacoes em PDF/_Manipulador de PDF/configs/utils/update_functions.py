@@ -1,23 +1,79 @@
-import requests
+from threading import Thread
+import json
+import time
+import os
 
+# Tempo máximo de espera pela resposta da API do GitHub, em segundos.
+TIMEOUT: float = 3
+# Por quanto tempo a última versão consultada é reaproveitada sem nova consulta, em segundos.
+TTL: float = float(os.environ.get('MANIPULADOR_TTL_VERSAO', 12 * 60 * 60))
+# Arquivo onde a última versão consultada é guardada.
+CACHE_PATH: str = 'configs/cache/versao.json'
 
-def check_update(VERSION: str):
+
+def check_update(VERSION: str) -> Thread:
+    """
+    Inicia a verificação de atualização em segundo plano, sem atrasar a exibição do menu.
+    O aviso de nova versão é exibido quando a verificação termina.
+    Returns:
+        (Thread): A thread da verificação, para quem precisar aguardar o resultado.
+    """
+    thread = Thread(target=_verifica, args=(VERSION,), daemon=True)
+    thread.start()
+    return thread
+
+
+def _verifica(VERSION: str) -> None:
     last_version = get_last_version()
-    if type(last_version) == str:
-        if VERSION != get_last_version():
-            print('Nova versão disponível!')
-            print(
-                'Para baixar a nova versão, feche e exclua este arquivo (main.py) e execute o arquivo "download_last_version" dentro da pasta "configs".')
-            input('Para continuar utilizando esta versão, pressione Enter')
-
-def get_last_version():
+    if type(last_version) == str and VERSION != last_version:
+        print('\nNova versão disponível!')
+        print(
+            'Para baixar a nova versão, feche e exclua este arquivo (main.py) e execute o arquivo "download_last_version" dentro da pasta "configs".')
+
+
+def get_last_version() -> str | None:
+    """
+    Retorna a última versão publicada, reaproveitando a consulta guardada em disco por até TTL segundos.
+    """
+    cached = _le_cache()
+    if cached is not None:
+        return cached
+    last_version = _consulta_versao()
+    if last_version is not None:
+        _salva_cache(last_version)
+    return last_version
+
+
+def _le_cache() -> str | None:
+    try:
+        with open(CACHE_PATH, 'r', encoding='utf-8') as file:
+            cache = json.load(file)
+        if time.time() - cache['data'] <= TTL:
+            return cache['versao']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def _salva_cache(versao: str) -> None:
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        with open(CACHE_PATH, 'w', encoding='utf-8') as file:
+            json.dump({'versao': versao, 'data': time.time()}, file)
+    except OSError:
+        pass
+
+
+def _consulta_versao() -> str | None:
+    # Importado aqui para não pesar na abertura do programa.
+    import requests
     # Endpoint da API para buscar o histórico de commits de um arquivo específico.
     url = f"https://api.github.com/repos/LuizGusQueiroz/Automacoes/commits"
     # Parâmetros da consulta, para buscar commits de um arquivo específico
-    params = {'path': "GS/Operacoes em PDF/_Manipulador de PDF/main.exe"}
+    params = {'path': "GS/Operacoes em PDF/_Manipulador de PDF/main.exe", 'per_page': 1}
     try:
         # Envia a requisição GET para a API do GitHub
-        response = requests.get(url, params=params)
+        response = requests.get(url, params=params, timeout=TIMEOUT)
         response.raise_for_status()  # Levanta uma exceção se houver um erro na requisição
         # Extrai o JSON da resposta
         commits_data = response.json()
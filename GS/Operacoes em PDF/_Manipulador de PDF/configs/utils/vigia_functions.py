@@ -0,0 +1,256 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from .backend_functions import BACKENDS
+from .functions import OPCOES
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Tuple
+import signal
+import shutil
+import json
+import time
+import sys
+import os
+
+# Intervalo, em segundos, entre as verificações das pastas de entrada.
+INTERVALO: float = 5.0
+# Quantidade de verificações seguidas em que o arquivo precisa manter o tamanho para ser processado.
+VERIFICACOES: int = 2
+# Arquivos temporários de programas que ainda estão gravando ou copiando (Office, navegadores...).
+TEMPORARIOS: Tuple[str, ...] = ('.tmp', '.part', '.crdownload', '.partial')
+# Resumo de cada lote, gravado na sua pasta de saída.
+RESUMO: str = 'resumo.json'
+
+
+class Pasta(NamedTuple):
+    """
+    Uma pasta de entrada vigiada e a opção aplicada aos arquivos que chegam nela.
+    Os resultados de cada lote vão para uma subpasta de `saida`, os arquivos originais para uma
+    subpasta de `processados` e, se a execução falhar, para uma subpasta de `erros`.
+    """
+    entrada: str
+    opcao: int
+    saida: str
+    processados: str
+    erros: str
+    modo: str | None = None
+    optimize: bool = False
+    archive: str | None = None
+    per_folder: bool = False
+    backend: str | None = None
+    parquet: bool = False
+
+    @property
+    def tipos(self) -> Tuple[List[str], List[str]]:
+        """
+        Tipos de arquivo da opção: os que iniciam um lote e os opcionais (entre colchetes), como as
+        tabelas de relação, que ficam na pasta de entrada e são copiados para todos os lotes.
+        """
+        entradas = OPCOES[self.opcao].entradas
+        return ([tipo for tipo in entradas if not tipo.startswith('[')],
+                [tipo.strip('[]') for tipo in entradas if tipo.startswith('[')])
+
+
+def le_configuracao(path: str) -> Tuple[List[Pasta], Dict]:
+    """
+    Lê a configuração das pastas vigiadas. Ex.:
+        {
+            "intervalo": 5, "verificacoes": 2, "jobs": 2,
+            "pastas": [
+                {"entrada": "C:/Entrada/Recibos", "opcao": 21, "saida": "C:/Saida/Recibos"},
+                {"entrada": "C:/Entrada/Fortes", "opcao": 9, "modo": "lotacao", "optimize": true},
+                {"entrada": "C:/Entrada/Folha", "opcao": 8, "backend": "pymupdf"},
+                {"entrada": "C:/Entrada/Planos", "opcao": 19, "parquet": true}
+            ]
+        }
+    Sem `saida`, `processados` e `erros`, são usadas as pastas _Saida, _Processados e _Erros dentro da entrada.
+    Raises:
+        ValueError: Se uma pasta usa uma opção, um modo ou um backend inexistente.
+    """
+    with open(path, 'r', encoding='utf-8') as file:
+        configuracao = json.load(file)
+    pastas = []
+    for pasta in configuracao.get('pastas', []):
+        entrada = os.path.abspath(pasta['entrada'])
+        opcao = int(pasta['opcao'])
+        if opcao not in OPCOES:
+            raise ValueError(f'Opção inválida para {entrada}: {opcao}')
+        modo = pasta.get('modo')
+        if modo is not None and modo not in OPCOES[opcao].modos:
+            raise ValueError(f'Modo inválido para {entrada}: {modo}')
+        backend = pasta.get('backend')
+        if backend is not None and backend not in BACKENDS:
+            raise ValueError(f'Backend inválido para {entrada}: {backend}')
+        pastas.append(Pasta(entrada, opcao,
+                            os.path.abspath(pasta.get('saida') or os.path.join(entrada, '_Saida')),
+                            os.path.abspath(pasta.get('processados') or os.path.join(entrada, '_Processados')),
+                            os.path.abspath(pasta.get('erros') or os.path.join(entrada, '_Erros')),
+                            modo, bool(pasta.get('optimize')), pasta.get('archive'), bool(pasta.get('per_folder')),
+                            backend, bool(pasta.get('parquet'))))
+    return pastas, configuracao
+
+
+def livre(path: str) -> bool:
+    """
+    Indica se nenhum outro programa está gravando o arquivo. No Windows, um arquivo sendo copiado não
+    pode ser aberto para escrita.
+    """
+    try:
+        with open(path, 'ab'):
+            return True
+    except OSError:
+        return False
+
+
+def _ignora_interrupcao() -> None:
+    """
+    Executada em cada processo do pool: o Ctrl+C chega a todos os processos do terminal, mas só o
+    principal o trata, deixando os lotes em andamento terminarem.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _interrompe(signum, frame) -> None:
+    raise KeyboardInterrupt
+
+
+class Vigia:
+    """
+    Vigia as pastas de entrada e processa os arquivos à medida que chegam, em vez de acumulá-los para
+    uma execução manual.
+
+    A cada verificação, os arquivos que mantiveram o tamanho por `verificacoes` verificações seguidas
+    (e que nenhum programa está gravando) são movidos para um novo lote em `processados` e enviados ao
+    pool, que executa a opção da pasta como o comando run (ver cli_functions.executa). Ao fim, o
+    resultado fica em `saida/<lote>` e, se a execução falhar, os originais vão para `erros/<lote>`.
+    """
+
+    def __init__(self, pastas: List[Pasta], jobs: int = 1, intervalo: float = INTERVALO,
+                 verificacoes: int = VERIFICACOES):
+        self.pastas = pastas
+        self.jobs = max(1, jobs)
+        self.intervalo = intervalo
+        self.verificacoes = verificacoes
+        # Tamanho e data de modificação de cada arquivo visto e há quantas verificações estão iguais.
+        self.vistos: Dict[str, Tuple[Tuple[int, int], int]] = {}
+        self.pendentes: Dict[Future, Tuple[Pasta, str]] = {}
+        self.n_lotes: int = 0
+        self.resultados: List[Dict] = []
+
+    def prontos(self, pasta: Pasta) -> Tuple[List[str], List[str]]:
+        """
+        Returns:
+            (List[str], List[str]): Os arquivos da pasta que pararam de crescer e os arquivos opcionais
+                (tabelas) presentes, que acompanham o lote.
+        """
+        tipos, opcionais = pasta.tipos
+        prontos, anexos = [], []
+        for file in sorted(os.listdir(pasta.entrada)):
+            path = os.path.join(pasta.entrada, file)
+            ext = os.path.splitext(file)[1].lower()
+            if (not os.path.isfile(path) or file.startswith(('.', '~$')) or ext in TEMPORARIOS
+                    or ext not in tipos + opcionais):
+                continue
+            if ext in opcionais:
+                anexos.append(file)
+                continue
+            stat = os.stat(path)
+            assinatura = (stat.st_size, stat.st_mtime_ns)
+            anterior, iguais = self.vistos.get(path, (None, 0))
+            iguais = iguais + 1 if assinatura == anterior else 0
+            self.vistos[path] = (assinatura, iguais)
+            if iguais >= self.verificacoes and stat.st_size > 0 and livre(path):
+                prontos.append(file)
+        return prontos, anexos
+
+    def envia(self, pool: ProcessPoolExecutor, pasta: Pasta, files: List[str], anexos: List[str]) -> None:
+        """
+        Move os arquivos prontos para um novo lote em `processados` e envia a sua execução ao pool.
+        """
+        from .cli_functions import monta_job, executa
+        self.n_lotes += 1
+        lote = f'{datetime.now():%Y%m%d-%H%M%S}-{self.n_lotes:04}'
+        destino = os.path.join(pasta.processados, lote)
+        os.makedirs(destino, exist_ok=True)
+        for file in files:
+            shutil.move(os.path.join(pasta.entrada, file), os.path.join(destino, file))
+            self.vistos.pop(os.path.join(pasta.entrada, file), None)
+        # As tabelas continuam na entrada, para os próximos lotes.
+        for file in anexos:
+            shutil.copy2(os.path.join(pasta.entrada, file), os.path.join(destino, file))
+        job = monta_job(pasta.opcao, destino, os.path.join(pasta.saida, lote), pasta.modo,
+                        archive=pasta.archive, per_folder=pasta.per_folder, optimize=pasta.optimize,
+                        n_jobs=self.jobs, backend=pasta.backend, parquet=pasta.parquet)
+        print(f'[lote] {lote}: {len(files)} arquivo(s) de {pasta.entrada} -> {OPCOES[pasta.opcao].nome}',
+              file=sys.stderr)
+        self.pendentes[pool.submit(executa, job)] = (pasta, lote)
+
+    def conclui(self, future: Future) -> None:
+        """
+        Registra o resultado de um lote e, se ele falhou, move os originais para `erros`.
+        """
+        pasta, lote = self.pendentes.pop(future)
+        try:
+            resultado = future.result()
+        except Exception as e:
+            resultado = {'status': 'erro', 'erro': f'{type(e).__name__}: {e}'}
+        resultado['lote'] = lote
+        saida = os.path.join(pasta.saida, lote)
+        os.makedirs(saida, exist_ok=True)
+        if resultado['status'] != 'ok':
+            os.makedirs(pasta.erros, exist_ok=True)
+            shutil.move(os.path.join(pasta.processados, lote), os.path.join(pasta.erros, lote))
+        with open(os.path.join(saida, RESUMO), 'w', encoding='utf-8') as file:
+            json.dump(resultado, file, ensure_ascii=False, indent=2, default=str)
+        print(f"[{resultado['status']}] {lote}: {resultado.get('n_pags', 0)} página(s)"
+              f"{' - ' + resultado['erro'] if resultado.get('erro') else ''}", file=sys.stderr)
+        self.resultados.append(resultado)
+
+    def verifica(self, pool: ProcessPoolExecutor) -> int:
+        """
+        Conclui os lotes terminados e envia os arquivos prontos de cada pasta.
+        Returns:
+            (int): A quantidade de lotes enviados.
+        """
+        for future in [future for future in self.pendentes if future.done()]:
+            self.conclui(future)
+        enviados = 0
+        for pasta in self.pastas:
+            if not os.path.isdir(pasta.entrada):
+                continue
+            files, anexos = self.prontos(pasta)
+            if files:
+                self.envia(pool, pasta, files, anexos)
+                enviados += 1
+        return enviados
+
+    def executa(self, uma_vez: bool = False) -> List[Dict]:
+        """
+        Vigia as pastas até ser interrompido (Ctrl+C). Os lotes em andamento são concluídos antes de sair.
+        Com `uma_vez`, processa os arquivos já presentes e termina.
+        Returns:
+            (List[Dict]): O resultado de cada lote.
+        """
+        for pasta in self.pastas:
+            os.makedirs(pasta.entrada, exist_ok=True)
+        print(f'Vigiando {len(self.pastas)} pasta(s) a cada {self.intervalo} s. Ctrl+C para encerrar.', file=sys.stderr)
+        # Encerrar o serviço (SIGTERM) equivale ao Ctrl+C.
+        signal.signal(signal.SIGTERM, _interrompe)
+        with ProcessPoolExecutor(max_workers=self.jobs, initializer=_ignora_interrupcao) as pool:
+            try:
+                while True:
+                    self.verifica(pool)
+                    # Sem esperar novos arquivos, termina quando nada mais muda nas pastas.
+                    if uma_vez and not self.pendentes and not self._aguardando():
+                        break
+                    time.sleep(self.intervalo)
+            except KeyboardInterrupt:
+                print('Encerrando após os lotes em andamento...', file=sys.stderr)
+            for future in list(self.pendentes):
+                self.conclui(future)
+        return self.resultados
+
+    def _aguardando(self) -> bool:
+        """
+        Indica se algum arquivo ainda está sendo verificado, ou seja, ainda não parou de crescer.
+        Arquivos vazios não são aguardados.
+        """
+        return any(os.path.isfile(path) and assinatura[0] > 0 for path, (assinatura, _) in self.vistos.items())
@@ -1,5 +1,9 @@
+import time
+INICIO: float = time.perf_counter()  # Medido antes dos demais imports, para o tempo até o menu.
 from configs.utils.update_functions import check_update
 from configs.utils.menu_functions import main_hub
+from multiprocessing import freeze_support
+import sys
 
 VERSION: str = '1.0.1'
 
@@ -8,10 +12,16 @@ def run():
     print('Manipulador de PDFs')
     print('V: ', VERSION)
     check_update(VERSION)  # Verifica se há atualizações.
-    main_hub()  # inicia o menu.
+    main_hub(INICIO)  # inicia o menu.
 
 
 if __name__ == '__main__':
+    # Necessário para que o pool de processos funcione no executável (main.exe).
+    freeze_support()
+    # Com argumentos (ex.: main.exe run --option 6 --input Pasta --output Saida), executa sem menu.
+    if len(sys.argv) > 1:
+        from configs.utils.cli_functions import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
     try:
         run()
     except Exception as e: